@@ -651,7 +651,8 @@ class IntelligentChatbot {
                     session_id: this.sessionId,
                     source_click: true,
                     clicked_resource_id: resource.id,
-                    clicked_resource_type: resource.type
+                    clicked_resource_type: resource.type,
+                    clicked_resource_url: resource.url
                 })
             });
 
@@ -6,6 +6,6 @@ class ChatbotConfig(AppConfig):
     name = 'chatbot'
 
     def ready(self):
-        import chatbot.signals 
-        from .spell_corrector import get_spell_corrector
-        get_spell_corrector()
\ No newline at end of file
+        # Signal registration only - models and the spell corrector are warmed up
+        # by web workers (chatbot.warmup), not by every manage.py command
+        import chatbot.signals
@@ -0,0 +1,442 @@
+"""
+Build-time artifacts that live next to knowledge_base.json.
+
+The embedding matrix, the FAISS index and the fitted TF-IDF model are
+produced once by ``python manage.py build_knowledge_base`` and loaded at
+runtime (memory-mapped where possible), so every gunicorn worker shares the
+same pages instead of re-encoding or re-fitting the whole corpus on boot.
+
+The FAISS index is exact (Flat) for small corpora and approximate (IVF or
+HNSW) for large ones; ``python manage.py benchmark_faiss_index`` reports
+the recall/latency trade-off of each mode.
+"""
+
+import os
+import json
+import hashlib
+import importlib.util
+from contextlib import contextmanager
+import numpy as np
+
+# faiss, scipy and scikit-learn are imported inside the functions that need them
+FAISS_AVAILABLE = importlib.util.find_spec('faiss') is not None
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+FAISS_INDEX_MODES = ('flat', 'ivf', 'hnsw')
+# FAISS warns below ~39 training points per IVF list
+IVF_MIN_POINTS_PER_LIST = 39
+IVF_MAX_TRAINING_POINTS_PER_LIST = 256
+
+
+def get_artifact_paths(json_path):
+    """Return artifact file paths derived from the knowledge base JSON path"""
+    base_path = os.path.splitext(str(json_path))[0]
+    return {
+        'embeddings': f"{base_path}.embeddings.npy",
+        'faiss_index': f"{base_path}.faiss",
+        'tfidf_matrix': f"{base_path}.tfidf.npz",
+        'tfidf_vocabulary': f"{base_path}.tfidf.json",
+        'bm25_counts': f"{base_path}.bm25.npz",
+        'bm25_vocabulary': f"{base_path}.bm25.json",
+        'lock': f"{base_path}.lock",
+        'pending': f"{base_path}.pending.json",
+    }
+
+
+def make_tfidf_vectorizer(stopwords, vocabulary=None):
+    """TF-IDF vectorizer used for the cosine fallback - same settings at build and runtime"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(
+        max_features=10000,
+        stop_words=sorted(stopwords),
+        ngram_range=(1, 3),
+        min_df=1,
+        max_df=0.8,
+        sublinear_tf=True,
+        vocabulary=vocabulary
+    )
+
+
+def documents_fingerprint(document_texts):
+    """Stable fingerprint of the document texts the artifacts were built from"""
+    digest = hashlib.sha1()
+    for text in document_texts:
+        digest.update((text or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _atomic_write(path, writer):
+    """Write through a temp file so running workers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    writer(tmp_path)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def knowledge_base_lock(json_path):
+    """
+    Exclusive cross-process lock around rewriting knowledge_base.json and its
+    artifacts, so files written by different processes never end up mixed
+    """
+    import fcntl
+
+    with open(get_artifact_paths(json_path)['lock'], 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def encode_documents(document_texts, model=None, batch_size=64):
+    """Encode documents into L2-normalized float32 embeddings"""
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+    embeddings = model.encode(
+        document_texts,
+        batch_size=batch_size,
+        show_progress_bar=True,
+        convert_to_numpy=True
+    )
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def get_faiss_index_options():
+    """Index factory settings (see CHATBOT_FAISS_* in settings.py)"""
+    from django.conf import settings
+    return {
+        'mode': getattr(settings, 'CHATBOT_FAISS_INDEX_MODE', 'auto'),
+        'flat_max': getattr(settings, 'CHATBOT_FAISS_AUTO_FLAT_MAX', 50000),
+        'nlist': getattr(settings, 'CHATBOT_FAISS_IVF_NLIST', None),
+        'nprobe': getattr(settings, 'CHATBOT_FAISS_IVF_NPROBE', None),
+        'hnsw_m': getattr(settings, 'CHATBOT_FAISS_HNSW_M', 32),
+        'ef_search': getattr(settings, 'CHATBOT_FAISS_HNSW_EF_SEARCH', None),
+    }
+
+
+def choose_faiss_index_mode(document_count, mode='auto', flat_max=50000):
+    """Resolve 'auto' by corpus size: exact search while it is cheap, IVF beyond that"""
+    if mode in FAISS_INDEX_MODES:
+        return mode
+    if mode != 'auto':
+        raise ValueError(f"Unknown FAISS index mode '{mode}' - expected auto, {', '.join(FAISS_INDEX_MODES)}")
+    # IVF rather than HNSW: it supports removals, which incremental updates need
+    return 'flat' if document_count <= flat_max else 'ivf'
+
+
+def make_faiss_index(embeddings, mode='auto', flat_max=50000, nlist=None, nprobe=None,
+                     hnsw_m=32, ef_search=None, ef_construction=200, trained_from=None):
+    """
+    Build an inner-product FAISS index over L2-normalized embeddings.
+
+    ``trained_from`` is an existing IVF index whose coarse quantizer is reused
+    instead of running k-means again.
+    """
+    import faiss
+
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+    count, dimension = embeddings.shape
+    mode = choose_faiss_index_mode(count, mode, flat_max)
+
+    if mode == 'flat':
+        index = faiss.IndexFlatIP(dimension)
+        index.add(embeddings)
+        return index
+
+    if mode == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, int(hnsw_m), faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = int(ef_construction)
+        index.add(embeddings)
+        index.hnsw.efSearch = int(ef_search or 64)
+        return index
+
+    trained_ivf = faiss.try_extract_index_ivf(trained_from) if trained_from is not None else None
+    if trained_ivf is not None:
+        quantizer = faiss.clone_index(trained_ivf.quantizer)
+        nlist = trained_ivf.nlist
+        nprobe = nprobe or trained_ivf.nprobe
+    else:
+        quantizer = faiss.IndexFlatIP(dimension)
+        if not nlist:
+            nlist = int(4 * np.sqrt(count))
+        nlist = int(max(1, min(nlist, count // IVF_MIN_POINTS_PER_LIST)))
+
+    index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+    if trained_ivf is not None:
+        index.is_trained = True
+    else:
+        sample_size = min(count, nlist * IVF_MAX_TRAINING_POINTS_PER_LIST)
+        sample = embeddings
+        if sample_size < count:
+            sample = embeddings[np.random.default_rng(0).choice(count, sample_size, replace=False)]
+        index.train(sample)
+
+    index.add(embeddings)
+    index.nprobe = int(min(nlist, nprobe or max(8, nlist // 20)))
+    return index
+
+
+def describe_faiss_index(index):
+    """'flat', 'ivf' or 'hnsw' for an index built by make_faiss_index (optionally behind an id map)"""
+    import faiss
+
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    if faiss.try_extract_index_ivf(index) is not None:
+        return 'ivf'
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    return 'flat'
+
+
+def faiss_index_params(index):
+    """Search parameters recorded in the manifest next to the index file"""
+    import faiss
+
+    mode = describe_faiss_index(index)
+    params = {'faiss_index_mode': mode}
+    if mode == 'ivf':
+        ivf = faiss.extract_index_ivf(index)
+        params.update({'faiss_nlist': int(ivf.nlist), 'faiss_nprobe': int(ivf.nprobe)})
+    elif mode == 'hnsw':
+        params['faiss_ef_search'] = int(faiss.downcast_index(index).hnsw.efSearch)
+    return params
+
+
+def configure_faiss_search(index, nprobe=None, ef_search=None):
+    """Apply runtime overrides of the persisted search parameters"""
+    import faiss
+
+    mode = describe_faiss_index(index)
+    if mode == 'ivf' and nprobe:
+        ivf = faiss.extract_index_ivf(index)
+        ivf.nprobe = int(min(ivf.nlist, nprobe))
+    elif mode == 'hnsw' and ef_search:
+        faiss.downcast_index(index).hnsw.efSearch = int(ef_search)
+    return index
+
+
+def save_embedding_artifacts(json_path, document_texts, embeddings, faiss_index=None, index_options=None):
+    """
+    Persist the embedding matrix and a serialized FAISS index next to the JSON.
+
+    ``faiss_index`` is written as-is when given (its labels must be document
+    positions); otherwise one is built with ``index_options`` (see
+    make_faiss_index).
+    """
+    paths = get_artifact_paths(json_path)
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+
+    # np.save appends .npy to names that lack it, so hand it a file object
+    def write_embeddings(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            np.save(f, embeddings)
+
+    _atomic_write(paths['embeddings'], write_embeddings)
+
+    manifest = {
+        'embedding_model': EMBEDDING_MODEL_NAME,
+        'embeddings_file': os.path.basename(paths['embeddings']),
+        'faiss_index_file': None,
+        'document_count': int(embeddings.shape[0]),
+        'dimension': int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+        'documents_sha1': documents_fingerprint(document_texts),
+    }
+
+    if FAISS_AVAILABLE and embeddings.shape[0] > 0:
+        import faiss
+        index = faiss_index
+        if index is None:
+            index = make_faiss_index(embeddings, **(index_options or {}))
+        _atomic_write(paths['faiss_index'], lambda tmp_path: faiss.write_index(index, tmp_path))
+        manifest['faiss_index_file'] = os.path.basename(paths['faiss_index'])
+        manifest.update(faiss_index_params(index))
+
+    return manifest
+
+
+def load_embedding_artifacts(json_path, document_texts, manifest, load_index=True):
+    """
+    Memory-map persisted embeddings and FAISS index.
+
+    Returns (embeddings, faiss_index) or (None, None) when the artifacts are
+    missing or were built from different documents. ``load_index=False``
+    skips the FAISS index (returned as None).
+    """
+    if not manifest:
+        return None, None
+
+    paths = get_artifact_paths(json_path)
+    if not os.path.exists(paths['embeddings']):
+        return None, None
+
+    if manifest.get('document_count') != len(document_texts):
+        print("⚠️ Embedding artifacts are stale (document count changed) - rebuild the knowledge base")
+        return None, None
+
+    if manifest.get('documents_sha1') != documents_fingerprint(document_texts):
+        print("⚠️ Embedding artifacts are stale (documents changed) - rebuild the knowledge base")
+        return None, None
+
+    embeddings = np.load(paths['embeddings'], mmap_mode='r')
+
+    faiss_index = None
+    if load_index and FAISS_AVAILABLE and manifest.get('faiss_index_file') and os.path.exists(paths['faiss_index']):
+        import faiss
+        io_flags = getattr(faiss, 'IO_FLAG_MMAP', 0) | getattr(faiss, 'IO_FLAG_READ_ONLY', 0)
+        try:
+            faiss_index = faiss.read_index(paths['faiss_index'], io_flags)
+        except RuntimeError:
+            # Older FAISS builds cannot mmap flat codes; read normally instead
+            faiss_index = faiss.read_index(paths['faiss_index'])
+        # nprobe is not stored by every FAISS version - restore it from the manifest
+        configure_faiss_search(faiss_index, nprobe=manifest.get('faiss_nprobe'), ef_search=manifest.get('faiss_ef_search'))
+
+    return embeddings, faiss_index
+
+
+def save_tfidf_artifacts(json_path, document_texts, stopwords):
+    """Fit TF-IDF on the corpus and persist the vocabulary/idf and document-term matrix"""
+    vectorizer = make_tfidf_vectorizer(stopwords)
+    matrix = vectorizer.fit_transform(document_texts).tocsr().astype('float32')
+    return write_tfidf_artifacts(json_path, document_texts, vectorizer, matrix)
+
+
+def write_tfidf_artifacts(json_path, document_texts, vectorizer, matrix):
+    """Persist an already fitted TF-IDF model and its document-term matrix"""
+    paths = get_artifact_paths(json_path)
+    matrix = matrix.tocsr()
+
+    _atomic_write(paths['tfidf_matrix'], lambda tmp_path: _save_npz(tmp_path, matrix))
+
+    # A vectorizer restored from artifacts only sets vocabulary_ once it has transformed something
+    fitted_vocabulary = getattr(vectorizer, 'vocabulary_', None) or vectorizer.vocabulary
+    vocabulary = {term: int(column) for term, column in fitted_vocabulary.items()}
+    payload = {'vocabulary': vocabulary, 'idf': vectorizer.idf_.tolist()}
+
+    def write_vocabulary(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+
+    _atomic_write(paths['tfidf_vocabulary'], write_vocabulary)
+
+    return {
+        'tfidf_matrix_file': os.path.basename(paths['tfidf_matrix']),
+        'tfidf_vocabulary_file': os.path.basename(paths['tfidf_vocabulary']),
+        'tfidf_features': len(vocabulary),
+        'documents_sha1': documents_fingerprint(document_texts),
+    }
+
+
+def save_bm25_artifacts(json_path, document_texts, stopwords):
+    """Count terms for BM25 and persist the counts plus vocabulary"""
+    from .bm25 import BM25Index
+
+    return write_bm25_artifacts(json_path, document_texts, BM25Index.build(document_texts, stopwords))
+
+
+def write_bm25_artifacts(json_path, document_texts, bm25_index):
+    """Persist a BM25 index as its raw count matrix and ordered term list - weights are derived at load"""
+    paths = get_artifact_paths(json_path)
+    terms = bm25_index.terms()
+
+    _atomic_write(paths['bm25_counts'], lambda tmp_path: _save_npz(tmp_path, bm25_index.counts.tocsr()))
+
+    def write_vocabulary(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'terms': terms}, f, ensure_ascii=False)
+
+    _atomic_write(paths['bm25_vocabulary'], write_vocabulary)
+
+    return {
+        'bm25_counts_file': os.path.basename(paths['bm25_counts']),
+        'bm25_vocabulary_file': os.path.basename(paths['bm25_vocabulary']),
+        'bm25_terms': len(terms),
+        'documents_sha1': documents_fingerprint(document_texts),
+    }
+
+
+def write_knowledge_base_json(json_path, json_data):
+    """Atomically rewrite knowledge_base.json - readers see the old or the new file, never a partial one"""
+    def write_json(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(json_data, f, ensure_ascii=False, indent=2, default=str)
+
+    _atomic_write(json_path, write_json)
+
+
+def _save_npz(path, matrix):
+    from scipy import sparse
+
+    # save_npz appends .npz to names that lack it, so hand it a file object
+    with open(path, 'wb') as f:
+        sparse.save_npz(f, matrix)
+
+
+def load_tfidf_artifacts(json_path, document_texts, manifest, stopwords):
+    """
+    Load the persisted TF-IDF model.
+
+    Returns (vectorizer, document_term_matrix) or (None, None) when the
+    artifacts are missing or were built from different documents.
+    """
+    if not manifest or not manifest.get('tfidf_matrix_file'):
+        return None, None
+
+    paths = get_artifact_paths(json_path)
+    if not (os.path.exists(paths['tfidf_matrix']) and os.path.exists(paths['tfidf_vocabulary'])):
+        return None, None
+
+    if manifest.get('documents_sha1') != documents_fingerprint(document_texts):
+        print("⚠️ TF-IDF artifacts are stale (documents changed) - rebuild the knowledge base")
+        return None, None
+
+    from scipy import sparse
+
+    with open(paths['tfidf_vocabulary'], 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+
+    matrix = sparse.load_npz(paths['tfidf_matrix']).tocsr()
+    if matrix.shape[0] != len(document_texts):
+        return None, None
+
+    vectorizer = make_tfidf_vectorizer(stopwords, vocabulary=payload['vocabulary'])
+    vectorizer.idf_ = np.asarray(payload['idf'], dtype='float64')
+
+    return vectorizer, matrix
+
+
+def load_bm25_artifacts(json_path, document_texts, manifest):
+    """
+    Load persisted BM25 term counts.
+
+    Returns (count_matrix, vocabulary) or (None, None) when the artifacts are
+    missing or were built from different documents.
+    """
+    if not manifest or not manifest.get('bm25_counts_file'):
+        return None, None
+
+    paths = get_artifact_paths(json_path)
+    if not (os.path.exists(paths['bm25_counts']) and os.path.exists(paths['bm25_vocabulary'])):
+        return None, None
+
+    if manifest.get('documents_sha1') != documents_fingerprint(document_texts):
+        return None, None
+
+    from scipy import sparse
+
+    with open(paths['bm25_vocabulary'], 'r', encoding='utf-8') as f:
+        terms = json.load(f)['terms']
+
+    counts = sparse.load_npz(paths['bm25_counts']).tocsr()
+    if counts.shape[0] != len(document_texts):
+        return None, None
+
+    return counts, {term: column for column, term in enumerate(terms)}
@@ -0,0 +1,172 @@
+"""
+BM25 sparse retrieval and reciprocal-rank fusion.
+
+The BM25 index keeps the raw document-term counts as a scipy CSR matrix and
+derives the per-posting BM25 weights from them in one vectorized pass, so
+incremental updates only need to stack count rows. Terms are the same
+normalized, stopword-filtered unigrams KnowledgeIndex uses, with no
+vocabulary cap, so rare exact terms (commodity names, acronyms) stay
+searchable.
+"""
+
+import numpy as np
+
+from .knowledge_index import normalize_text
+
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+RRF_K = 60
+
+
+def document_terms(text, stopwords=frozenset()):
+    """Token list of a document or query, in order and with repeats"""
+    return [word for word in normalize_text(text).split() if word not in stopwords and len(word) > 1]
+
+
+def count_terms(texts, vocabulary, stopwords=frozenset()):
+    """
+    Document-term count matrix for ``texts``.
+
+    New terms are appended to ``vocabulary`` (term -> column) in place; the
+    matrix has one column per vocabulary entry.
+    """
+    from scipy import sparse
+
+    indices = []
+    indptr = [0]
+    for text in texts:
+        indices.extend(vocabulary.setdefault(term, len(vocabulary)) for term in document_terms(text, stopwords))
+        indptr.append(len(indices))
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), len(vocabulary))
+    )
+    counts.sum_duplicates()
+    return counts
+
+
+class BM25Index:
+    """Okapi BM25 over a document-term count matrix, aligned with knowledge_data positions"""
+
+    def __init__(self, counts, vocabulary, stopwords=frozenset(), k1=DEFAULT_K1, b=DEFAULT_B):
+        from scipy import sparse
+
+        self.vocabulary = vocabulary
+        self.stopwords = frozenset(stopwords)
+        self.k1 = k1
+        self.b = b
+
+        counts = sparse.csr_matrix(counts, dtype=np.float32)
+        if counts.shape[1] < len(vocabulary):
+            counts = sparse.csr_matrix((counts.data, counts.indices, counts.indptr), shape=(counts.shape[0], len(vocabulary)))
+        self.counts = counts
+        self.term_weights = self._weigh(counts)
+
+    @classmethod
+    def build(cls, document_texts, stopwords=frozenset(), k1=DEFAULT_K1, b=DEFAULT_B):
+        vocabulary = {}
+        counts = count_terms(document_texts, vocabulary, stopwords)
+        return cls(counts, vocabulary, stopwords, k1, b)
+
+    def _weigh(self, counts):
+        """BM25 weight of every posting, stored column-major for per-term lookups"""
+        from scipy import sparse
+
+        document_count = counts.shape[0]
+        if document_count == 0 or counts.nnz == 0:
+            return sparse.csc_matrix(counts.shape, dtype=np.float32)
+
+        document_lengths = np.asarray(counts.sum(axis=1), dtype=np.float32).ravel()
+        average_length = float(document_lengths.mean()) or 1.0
+        document_frequency = np.bincount(counts.indices, minlength=counts.shape[1]).astype(np.float32)
+        idf = np.log1p((document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        rows = np.repeat(np.arange(document_count), np.diff(counts.indptr))
+        term_frequency = counts.data
+        length_norm = self.k1 * (1.0 - self.b + self.b * document_lengths[rows] / average_length)
+        weights = idf[counts.indices] * term_frequency * (self.k1 + 1.0) / (term_frequency + length_norm)
+
+        return sparse.csr_matrix((weights.astype(np.float32), counts.indices, counts.indptr), shape=counts.shape).tocsc()
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def with_rows(self, new_texts, select):
+        """
+        New index over ``vstack([counts, count_terms(new_texts)])[select]``
+        - the same row selection incremental.py applies to the TF-IDF matrix.
+        """
+        from scipy import sparse
+
+        vocabulary = dict(self.vocabulary)
+        new_counts = count_terms(new_texts, vocabulary, self.stopwords)
+        old_counts = sparse.csr_matrix(
+            (self.counts.data, self.counts.indices, self.counts.indptr),
+            shape=(self.counts.shape[0], len(vocabulary))
+        )
+        counts = sparse.vstack([old_counts, new_counts], format='csr')[select]
+        return BM25Index(counts, vocabulary, self.stopwords, self.k1, self.b)
+
+    def query_columns(self, query):
+        """Distinct vocabulary columns of the query terms"""
+        columns = {self.vocabulary.get(term) for term in document_terms(query, self.stopwords)}
+        columns.discard(None)
+        return sorted(columns)
+
+    def scores(self, query):
+        """BM25 score of every document - accumulated from the query terms' posting columns only"""
+        weights = self.term_weights
+        columns = self.query_columns(query)
+        if not columns:
+            return np.zeros(len(self), dtype=np.float32)
+
+        spans = [slice(weights.indptr[column], weights.indptr[column + 1]) for column in columns]
+        rows = np.concatenate([weights.indices[span] for span in spans])
+        values = np.concatenate([weights.data[span] for span in spans])
+        return np.bincount(rows, weights=values, minlength=len(self)).astype(np.float32)
+
+    def search(self, query, top_k=10):
+        """(scores, positions) of the best ``top_k`` documents with a positive score"""
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched) or top_k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        matched = matched[np.argsort(-scores[matched], kind='stable')]
+        return scores[matched], matched.astype(np.int64)
+
+    def terms(self):
+        """Vocabulary as a list ordered by column - the persisted form"""
+        terms = [None] * len(self.vocabulary)
+        for term, column in self.vocabulary.items():
+            terms[column] = term
+        return terms
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K, weights=None):
+    """
+    Fuse ranked position lists: score(d) = sum_i w_i / (k + rank_i(d)).
+
+    ``rankings`` are arrays of positions, best first (negative positions are
+    ignored). Returns (fused_scores, positions) sorted best first.
+    """
+    weights = weights or [1.0] * len(rankings)
+    position_parts = []
+    contribution_parts = []
+    for ranking, weight in zip(rankings, weights):
+        ranking = np.asarray(ranking, dtype=np.int64)
+        ranks = np.arange(1, len(ranking) + 1, dtype=np.float64)
+        valid = ranking >= 0
+        position_parts.append(ranking[valid])
+        contribution_parts.append(weight / (k + ranks[valid]))
+
+    if not position_parts or not sum(len(part) for part in position_parts):
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+
+    positions, inverse = np.unique(np.concatenate(position_parts), return_inverse=True)
+    fused = np.bincount(inverse, weights=np.concatenate(contribution_parts))
+    order = np.argsort(-fused, kind='stable')
+    return fused[order], positions[order]
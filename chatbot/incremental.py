@@ -0,0 +1,656 @@
+"""
+Incremental knowledge base updates driven by model signals.
+
+Saving or deleting a resource, FAQ, forum post, commodity or CMI entry
+rebuilds only the affected knowledge items and patches the live snapshot:
+the item list, their TF-IDF rows (transformed with the persisted
+vocabulary) and their vectors in a FAISS IndexIDMap2 keyed by stable ids.
+The patched snapshot is swapped in copy-on-write, so in-flight requests keep
+the one they started with, and is written back to knowledge_base.json and
+its artifacts so the other workers reload it without re-embedding anything.
+
+``python manage.py build_knowledge_base`` is still the way to re-fit the
+TF-IDF vocabulary; terms that first appear in an incremental update only
+reach the dense index until the next full build.
+
+Only web workers patch snapshots. Saves made from manage.py shell or other
+commands are recorded in knowledge_base.pending.json and refreshed by the
+first worker whose reload check finds them.
+
+With a sidecar (CHATBOT_SIDECAR_SOCKET) the changed documents are encoded
+by the sidecar and patched into the persisted embeddings; the sidecar
+picks up the rewritten artifacts when it next checks knowledge_base.json.
+"""
+
+import os
+import json
+import threading
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections
+
+# Imported from signals.py in every process (migrate included), so numpy, scipy,
+# faiss and the artifact helpers are only imported once an update actually runs
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_UPDATES_ENABLED = getattr(settings, 'CHATBOT_INCREMENTAL_UPDATES', True)
+# Bursts of saves (bulk admin edits) are written to disk once
+PERSIST_DELAY_SECONDS = getattr(settings, 'CHATBOT_INCREMENTAL_PERSIST_DELAY', 5)
+
+# ResourceMetadata related_names of the typed subrecords built from it
+TYPED_RESOURCE_RELATIONS = (
+    'event', 'information_system', 'map', 'media', 'news', 'policy', 'project',
+    'publication', 'technology', 'training_seminar', 'webinar', 'product',
+)
+
+_tracked_models = None
+_pending = {}
+_update_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_persist_timer = None
+# Item id -> item (None for removals) applied here but not yet written to knowledge_base.json
+_unpersisted = {}
+
+
+def get_tracked_models():
+    """
+    Models that map one row to one knowledge item.
+
+    Returns {model: (item id prefix, item builder, filter for rows that belong
+    in the knowledge base)} - the same filters build_knowledge_base uses.
+    """
+    global _tracked_models
+    if _tracked_models is not None:
+        return _tracked_models
+
+    from appAdmin.models import (
+        ResourceMetadata, Commodity, Event, InformationSystem, Map, Media,
+        News, Policy, Project, Publication, Technology, TrainingSeminar,
+        Webinar, Product, CMI
+    )
+    from appCmi.models import Forum, FAQ
+    from chatbot.management.modules import database_loader as loader
+
+    approved = {'metadata__is_approved': True}
+    _tracked_models = {
+        ResourceMetadata: ('resource', loader.build_resource_item, {'is_approved': True}),
+        Commodity: ('commodity', loader.build_commodity_item, {'status': 'active'}),
+        Event: ('event', loader.build_event_item, approved),
+        InformationSystem: ('info_system', loader.build_info_system_item, approved),
+        Map: ('map', loader.build_map_item, approved),
+        Media: ('media', loader.build_media_item, approved),
+        News: ('news', loader.build_news_item, approved),
+        Policy: ('policy', loader.build_policy_item, approved),
+        Project: ('project', loader.build_project_item, approved),
+        Publication: ('publication', loader.build_publication_item, approved),
+        Technology: ('technology', loader.build_technology_item, approved),
+        TrainingSeminar: ('training', loader.build_training_item, approved),
+        Webinar: ('webinar', loader.build_webinar_item, approved),
+        Product: ('product', loader.build_product_item, approved),
+        Forum: ('forum', loader.build_forum_item, {}),
+        CMI: ('cmi', loader.build_cmi_item, {'status': 'active'}),
+        FAQ: ('faq', loader.build_faq_item, {'is_active': True}),
+    }
+    return _tracked_models
+
+
+def get_tracked_relations():
+    """Many-to-many through models whose changes alter an item's text"""
+    from appAdmin.models import ResourceMetadata
+    from appCmi.models import Forum
+
+    return [
+        ResourceMetadata.tags.through,
+        ResourceMetadata.commodities.through,
+        Forum.commodity_id.through,
+    ]
+
+
+def get_dependent_relations():
+    """
+    Models whose name is copied into other items' text.
+
+    Returns {model: [(dependent model, lookup from the dependent to the row)]} -
+    renaming a commodity or tag has to rebuild every item that lists it.
+    """
+    from appAdmin.models import ResourceMetadata, Commodity, Tag
+    from appCmi.models import Forum
+
+    return {
+        Commodity: [(ResourceMetadata, 'commodities'), (Forum, 'commodity_id')],
+        Tag: [(ResourceMetadata, 'tags')],
+    }
+
+
+def get_dependent_rows(model, pk):
+    """(model, pk) rows whose knowledge item mentions the given commodity/tag"""
+    rows = []
+    for dependent, lookup in get_dependent_relations().get(model, ()):
+        for dependent_pk in dependent._default_manager.filter(**{lookup: pk}).values_list('pk', flat=True):
+            rows.append((dependent, dependent_pk))
+    return rows
+
+
+def queue_knowledge_refresh(model, pk):
+    """
+    Schedule a refresh of the knowledge item for one row.
+
+    Saves and deletes are handled the same way: the row is re-read after
+    commit, and an item that no longer exists or is no longer published is
+    removed.
+    """
+    from .warmup import is_serving_process
+
+    if pk is None or (model not in get_tracked_models() and model not in get_dependent_relations()):
+        return
+
+    if not is_serving_process():
+        # manage.py shell, data-fix commands: no snapshot here is served, and the process
+        # may exit before a persist - leave the row for the web workers instead
+        record_pending_refresh(model, pk)
+        return
+
+    with _executor_lock:
+        first = not _pending
+        _pending[(model, pk)] = True
+
+    # Only the first row of a burst submits a job; it drains everything queued meanwhile
+    if first:
+        _submit(_apply_pending)
+
+
+def _pending_refresh_path():
+    from . import services
+    from .artifacts import get_artifact_paths
+
+    return get_artifact_paths(services.get_knowledge_base_json_path())['pending']
+
+
+def record_pending_refresh(model, pk):
+    """Append a row to knowledge_base.pending.json for the web workers to refresh"""
+    from . import services
+    from .artifacts import knowledge_base_lock
+
+    path = _pending_refresh_path()
+    with knowledge_base_lock(services.get_knowledge_base_json_path()):
+        rows = []
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                rows = json.load(f)
+        rows.append([model._meta.label, pk])
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, default=str)
+        os.replace(tmp_path, path)
+
+    print(f"📝 Queued knowledge base refresh of {model._meta.label} {pk} for the web workers")
+
+
+def claim_pending_refreshes():
+    """
+    Take over rows recorded by non-serving processes and refresh them here.
+
+    Called from the knowledge base reload check; the file is removed under
+    the lock, so exactly one worker claims each row and persists it for the
+    others.
+    """
+    from django.apps import apps
+    from . import services
+    from .artifacts import knowledge_base_lock
+    from .warmup import is_serving_process
+
+    path = _pending_refresh_path()
+    if not INCREMENTAL_UPDATES_ENABLED or not is_serving_process() or not os.path.exists(path):
+        return 0
+
+    with knowledge_base_lock(services.get_knowledge_base_json_path()):
+        try:
+            with open(path, encoding='utf-8') as f:
+                rows = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read pending knowledge base refreshes: {e}")
+            rows = []
+        if os.path.exists(path):
+            os.remove(path)
+
+    for label, pk in rows:
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            continue
+        queue_knowledge_refresh(model, pk)
+    return len(rows)
+
+
+def _submit(fn, *args):
+    """Run fn on the single update thread - recreated after a fork"""
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kb-incremental')
+            _executor_pid = os.getpid()
+        executor = _executor
+
+    return executor.submit(_run_job, fn, *args)
+
+
+def _run_job(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        logger.exception("Incremental knowledge base update failed")
+        print(f"❌ Incremental knowledge base update failed: {e}")
+    finally:
+        # This thread's DB connection would otherwise stay open forever
+        connections.close_all()
+
+
+def _apply_pending():
+    with _executor_lock:
+        rows = list(_pending)
+        _pending.clear()
+
+    if rows:
+        refresh_knowledge_items(rows)
+
+
+def _expand_dependents(rows):
+    """A commodity/tag edit also changes the text of the items that reference it"""
+    expanded = list(rows)
+    for model, pk in rows:
+        expanded.extend(get_dependent_rows(model, pk))
+    return list(dict.fromkeys(expanded))
+
+
+def _expand_typed_resources(rows):
+    """A ResourceMetadata edit also changes the title/description of its typed subrecord"""
+    from appAdmin.models import ResourceMetadata
+
+    expanded = list(rows)
+    for model, pk in rows:
+        if model is not ResourceMetadata:
+            continue
+        for relation in TYPED_RESOURCE_RELATIONS:
+            typed_model = ResourceMetadata._meta.get_field(relation).related_model
+            for typed_pk in typed_model._default_manager.filter(metadata_id=pk).values_list('pk', flat=True):
+                expanded.append((typed_model, typed_pk))
+
+    return list(dict.fromkeys(expanded))
+
+
+def refresh_knowledge_items(rows):
+    """Rebuild the knowledge items for (model, pk) rows and patch them into the live snapshot"""
+    tracked = get_tracked_models()
+    upserts = []
+    removals = []
+
+    for model, pk in _expand_typed_resources(_expand_dependents(rows)):
+        if model not in tracked:
+            # Tags only exist inside other items
+            continue
+        prefix, builder, published = tracked[model]
+        instance = model._default_manager.filter(pk=pk, **published).first()
+        if instance is None:
+            removals.append(f"{prefix}_{pk}")
+            continue
+
+        try:
+            upserts.append(builder(instance))
+        except Exception as e:
+            print(f"⚠️ Error rebuilding knowledge item {prefix}_{pk}: {e}")
+
+    return apply_knowledge_updates(upserts, removals)
+
+
+def apply_knowledge_updates(upserts=(), removals=()):
+    """
+    Upsert items (by their 'id') and remove item ids in the live snapshot.
+
+    Only the changed documents are transformed and embedded; unchanged rows of
+    the TF-IDF and BM25 count matrices and the embedding matrix are reused as
+    they are.
+    Returns True when the snapshot changed.
+    """
+    from . import services
+
+    upserts = {item['id']: item for item in upserts}
+    removals = [item_id for item_id in removals if item_id not in upserts]
+
+    with _update_lock:
+        patched = patch_snapshot(_live_snapshot(), upserts, removals)
+        if patched is None:
+            return False
+        new_snapshot, summary = patched
+        services.install_knowledge_base_snapshot(new_snapshot)
+
+        # Re-applied on top of knowledge_base.json if another process persists first
+        _unpersisted.update(upserts)
+        _unpersisted.update((item_id, None) for item_id in removals)
+
+    print(
+        f"🔁 Knowledge base updated incrementally: {summary['updated']} updated, "
+        f"{summary['added']} added, {summary['removed']} removed"
+    )
+    _schedule_persist()
+    return True
+
+
+def _live_snapshot():
+    """This process's current snapshot, with the embeddings the update should patch"""
+    from . import services
+
+    if services.get_sidecar_client() is not None:
+        # The sidecar owns the model and FAISS index - patch the persisted embeddings
+        # with sidecar encodes and let it reload them from disk
+        return _with_persisted_embeddings(services.get_knowledge_base_cache())
+    if services.TRANSFORMERS_AVAILABLE:
+        return services.get_or_create_ai_cache()
+    return services.get_knowledge_base_cache()
+
+
+def patch_snapshot(snapshot, upserts, removals):
+    """
+    New snapshot with ``upserts`` ({item id: item}) and ``removals`` (item ids)
+    applied, or None when nothing changes.
+
+    Returns (new_snapshot, {'updated', 'added', 'removed'} counts); the
+    original snapshot is left untouched.
+    """
+    import numpy as np
+    from scipy import sparse
+    from .knowledge_index import KnowledgeIndex, load_stopwords
+
+    knowledge_data = snapshot['knowledge_data']
+    document_texts = snapshot['document_texts']
+    if not knowledge_data:
+        # No knowledge_base.json yet - nothing to patch until the first full build
+        return None
+
+    count = len(knowledge_data)
+    positions = {item.get('id'): position for position, item in enumerate(knowledge_data)}
+
+    removed = {positions[item_id] for item_id in removals if item_id in positions and item_id not in upserts}
+    replaced = {}
+    appended = []
+    for item_id, item in upserts.items():
+        position = positions.get(item_id)
+        if position is None:
+            appended.append(item)
+        else:
+            replaced[position] = item
+
+    if not (removed or replaced or appended):
+        return None
+
+    changed_items = list(replaced.values()) + appended
+    changed_texts = [item['raw_text'] for item in changed_items]
+
+    # Rows of the new snapshot as indexes into [old rows; changed rows]
+    kept = [position for position in range(count) if position not in removed]
+    replaced_rows = {position: count + offset for offset, position in enumerate(replaced)}
+    select = np.array(
+        [replaced_rows.get(position, position) for position in kept]
+        + list(range(count + len(replaced), count + len(changed_items))),
+        dtype=np.int64
+    )
+
+    new_snapshot = dict(snapshot)
+    new_snapshot['knowledge_data'] = [replaced.get(position, knowledge_data[position]) for position in kept] + appended
+    new_snapshot['document_texts'] = [
+        replaced[position]['raw_text'] if position in replaced else document_texts[position]
+        for position in kept
+    ] + [item['raw_text'] for item in appended]
+
+    vectorizer = snapshot.get('tfidf_vectorizer')
+    knowledge_vectors = snapshot.get('knowledge_vectors')
+    if vectorizer is not None and knowledge_vectors is not None:
+        if changed_texts:
+            new_rows = vectorizer.transform(changed_texts).astype(knowledge_vectors.dtype)
+        else:
+            new_rows = sparse.csr_matrix((0, knowledge_vectors.shape[1]), dtype=knowledge_vectors.dtype)
+        new_snapshot['knowledge_vectors'] = sparse.vstack([knowledge_vectors, new_rows], format='csr')[select]
+
+    if snapshot.get('bm25_index') is not None:
+        new_snapshot['bm25_index'] = snapshot['bm25_index'].with_rows(changed_texts, select)
+
+    if snapshot.get('knowledge_embeddings') is not None:
+        _patch_embeddings(snapshot, new_snapshot, replaced, removed, changed_texts, select)
+
+    new_snapshot['knowledge_index'] = KnowledgeIndex(new_snapshot['knowledge_data'], load_stopwords())
+
+    return new_snapshot, {'updated': len(replaced), 'added': len(appended), 'removed': len(removed)}
+
+
+def _with_persisted_embeddings(snapshot):
+    """Snapshot with the memory-mapped embedding artifacts attached (no model, no FAISS index)"""
+    from . import services
+    from .artifacts import load_embedding_artifacts
+
+    if snapshot.get('knowledge_embeddings') is not None or not snapshot['document_texts']:
+        return snapshot
+
+    manifest = services.get_knowledge_base_metadata().get('artifacts', {})
+    try:
+        embeddings, _ = load_embedding_artifacts(
+            services.get_knowledge_base_json_path(), snapshot['document_texts'], manifest, load_index=False
+        )
+    except Exception as e:
+        print(f"⚠️ Could not load persisted embeddings: {e}")
+        return snapshot
+
+    if embeddings is None:
+        # The sidecar re-encodes everything when it reloads the patched knowledge base
+        return snapshot
+    return dict(snapshot, knowledge_embeddings=embeddings)
+
+
+def _encode_texts(texts):
+    """Encode through the sidecar when one is configured, so web workers never load the model"""
+    from . import services
+
+    sidecar = services.get_sidecar_client()
+    if sidecar is not None:
+        return sidecar.encode(texts)
+    return services._encode_texts(texts)
+
+
+def _patch_embeddings(snapshot, new_snapshot, replaced, removed, changed_texts, select):
+    """Embed only the changed documents and move their vectors in the FAISS id map"""
+    import numpy as np
+    from .artifacts import FAISS_AVAILABLE, describe_faiss_index, make_faiss_index
+
+    embeddings = snapshot['knowledge_embeddings']
+    count = len(snapshot['knowledge_data'])
+    dimension = embeddings.shape[1]
+
+    if changed_texts:
+        changed_embeddings = np.ascontiguousarray(_encode_texts(changed_texts), dtype='float32')
+        norms = np.linalg.norm(changed_embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        changed_embeddings /= norms
+    else:
+        changed_embeddings = np.empty((0, dimension), dtype='float32')
+
+    new_embeddings = np.vstack([np.asarray(embeddings), changed_embeddings])[select]
+    norms = np.linalg.norm(new_embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    new_embeddings /= norms
+    new_snapshot['knowledge_embeddings'] = new_embeddings
+
+    faiss_index = snapshot.get('faiss_index')
+    if FAISS_AVAILABLE and faiss_index is not None and describe_faiss_index(faiss_index) == 'hnsw':
+        import faiss
+
+        # HNSW graphs cannot drop vectors - rebuild over the patched matrix, labelled by position again
+        new_snapshot['faiss_index'] = make_faiss_index(
+            new_embeddings, mode='hnsw',
+            hnsw_m=faiss.downcast_index(faiss_index).hnsw.nb_neighbors(1),
+            ef_search=faiss.downcast_index(faiss_index).hnsw.efSearch
+        )
+        for key in ('vector_ids', 'vector_positions', 'next_vector_id'):
+            new_snapshot.pop(key, None)
+        return
+
+    # Vector ids start out equal to positions (the persisted index) and never get reused
+    vector_ids = snapshot.get('vector_ids')
+    if vector_ids is None:
+        vector_ids = np.arange(count, dtype=np.int64)
+    next_vector_id = snapshot.get('next_vector_id', count)
+
+    appended_count = len(changed_texts) - len(replaced)
+    changed_ids = np.concatenate([
+        vector_ids[list(replaced)] if replaced else np.empty(0, dtype=np.int64),
+        np.arange(next_vector_id, next_vector_id + appended_count, dtype=np.int64),
+    ])
+    next_vector_id += appended_count
+
+    new_vector_ids = np.concatenate([vector_ids, changed_ids])[select]
+    vector_positions = np.full(next_vector_id, -1, dtype=np.int64)
+    vector_positions[new_vector_ids] = np.arange(len(new_vector_ids), dtype=np.int64)
+
+    new_snapshot['vector_ids'] = new_vector_ids
+    new_snapshot['vector_positions'] = vector_positions
+    new_snapshot['next_vector_id'] = next_vector_id
+
+    if not FAISS_AVAILABLE or faiss_index is None:
+        return
+
+    id_index = _writable_id_index(faiss_index, embeddings, vector_ids)
+    stale_ids = vector_ids[sorted(removed | set(replaced))]
+    if len(stale_ids):
+        id_index.remove_ids(np.ascontiguousarray(stale_ids, dtype=np.int64))
+    if len(changed_ids):
+        id_index.add_with_ids(changed_embeddings, changed_ids)
+
+    new_snapshot['faiss_index'] = id_index
+
+
+def _writable_id_index(faiss_index, embeddings, vector_ids):
+    """Private, writable copy that accepts add_with_ids/remove_ids - searches keep using the index they hold"""
+    import faiss
+    import numpy as np
+
+    if isinstance(faiss_index, faiss.IndexIDMap2):
+        return faiss.clone_index(faiss_index)
+
+    ivf = faiss.try_extract_index_ivf(faiss_index)
+    if ivf is not None:
+        # IVF lists store ids themselves; the memory-mapped lists cannot be cloned, so copy them over
+        try:
+            return faiss.clone_index(faiss_index)
+        except RuntimeError:
+            copy = faiss.IndexIVFFlat(faiss.clone_index(ivf.quantizer), ivf.d, ivf.nlist, ivf.metric_type)
+            copy.is_trained = True
+            copy.nprobe = ivf.nprobe
+            ivf.copy_subset_to(copy, 0, 0, ivf.ntotal)
+            return copy
+
+    # The persisted flat index is memory-mapped, read-only and labelled by position
+    vectors = np.array(embeddings, dtype='float32')
+    faiss.normalize_L2(vectors)
+    id_index = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+    id_index.add_with_ids(vectors, vector_ids)
+    return id_index
+
+
+def _schedule_persist():
+    """Write the patched snapshot to disk once saves have been quiet for a few seconds"""
+    global _persist_timer
+
+    with _executor_lock:
+        if _persist_timer is not None:
+            _persist_timer.cancel()
+        _persist_timer = threading.Timer(PERSIST_DELAY_SECONDS, _submit, args=(persist_knowledge_base,))
+        _persist_timer.daemon = True
+        _persist_timer.start()
+
+
+def persist_knowledge_base():
+    """Rewrite knowledge_base.json and its artifacts from the live snapshot"""
+    from . import services
+    from .artifacts import (
+        describe_faiss_index,
+        get_faiss_index_options,
+        knowledge_base_lock,
+        save_embedding_artifacts,
+        write_bm25_artifacts,
+        write_tfidf_artifacts,
+        write_knowledge_base_json
+    )
+
+    json_path = services.get_knowledge_base_json_path()
+
+    # Every worker persists its own snapshot: the file lock serializes them, and a worker
+    # whose copy is outdated merges its changes into the newer file instead of overwriting it
+    with _update_lock, knowledge_base_lock(json_path):
+        if not _unpersisted:
+            return
+
+        if services.knowledge_base_json_stale():
+            print("🔄 knowledge_base.json was rewritten by another process - re-applying local changes on top")
+            services.reload_knowledge_base_cache()
+            patched = patch_snapshot(
+                _live_snapshot(),
+                {item_id: item for item_id, item in _unpersisted.items() if item is not None},
+                [item_id for item_id, item in _unpersisted.items() if item is None]
+            )
+            if patched is not None:
+                services.install_knowledge_base_snapshot(patched[0])
+
+        snapshot = services.get_knowledge_base_cache()
+        knowledge_data = snapshot['knowledge_data']
+        document_texts = snapshot['document_texts']
+        if not knowledge_data:
+            return
+
+        artifacts = {}
+
+        embeddings = snapshot.get('knowledge_embeddings')
+        if embeddings is not None:
+            faiss_index = snapshot.get('faiss_index')
+            if faiss_index is not None and snapshot.get('vector_positions') is None:
+                # Still labelled by position - write it as it is
+                artifacts.update(save_embedding_artifacts(json_path, document_texts, embeddings, faiss_index=faiss_index))
+            else:
+                # Relabel by position for the next loader, reusing the trained IVF quantizer if there is one
+                index_options = get_faiss_index_options()
+                if faiss_index is not None:
+                    index_options.update(mode=describe_faiss_index(faiss_index), trained_from=faiss_index)
+                artifacts.update(save_embedding_artifacts(
+                    json_path, document_texts, embeddings, index_options=index_options
+                ))
+
+        if snapshot.get('tfidf_vectorizer') is not None and snapshot.get('knowledge_vectors') is not None:
+            artifacts.update(write_tfidf_artifacts(
+                json_path, document_texts, snapshot['tfidf_vectorizer'], snapshot['knowledge_vectors']
+            ))
+
+        if snapshot.get('bm25_index') is not None:
+            artifacts.update(write_bm25_artifacts(json_path, document_texts, snapshot['bm25_index']))
+
+        metadata = dict(services.get_knowledge_base_metadata())
+        metadata.update({
+            'total_items': len(knowledge_data),
+            'document_count': len(document_texts),
+            'updated_at': datetime.now().isoformat(),
+            'artifacts': artifacts,
+        })
+        json_data = {
+            'metadata': metadata,
+            'knowledge_data': knowledge_data,
+            'document_texts': document_texts,
+        }
+
+        # JSON last: other workers reload on its mtime and find matching artifacts
+        write_knowledge_base_json(json_path, json_data)
+        services.remember_knowledge_base_json(json_data, os.path.getmtime(json_path))
+        _unpersisted.clear()
+
+    print(f"💾 Persisted incremental knowledge base update ({len(knowledge_data)} items)")
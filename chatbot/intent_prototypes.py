@@ -0,0 +1,88 @@
+"""
+Embedding-prototype intent and content-type classification.
+
+Example phrases for every label live in chatbot/data/intent-prototypes.json.
+Their sentence embeddings are averaged into one unit-length prototype per
+label, and all prototypes are stacked into a single matrix, so classifying
+a query embedding is one matrix-vector product.
+"""
+
+import os
+import json
+import numpy as np
+from django.conf import settings
+
+
+def get_prototype_path():
+    return os.path.join(settings.BASE_DIR, 'chatbot', 'data', 'intent-prototypes.json')
+
+
+def load_prototype_examples(path=None):
+    """{group: {label: [example phrases]}} from the prototype data file"""
+    with open(path or get_prototype_path(), 'r', encoding='utf-8') as f:
+        groups = json.load(f)
+
+    return {
+        group: {label: examples for label, examples in labels.items() if examples}
+        for group, labels in groups.items()
+    }
+
+
+def _normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype='float32')
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class PrototypeClassifier:
+    """
+    Nearest-prototype classifier over sentence embeddings.
+
+    ``classify`` returns ``{group: (label, score)}`` per label group, with
+    None for a group whose best cosine score is below ``threshold`` or not
+    at least ``min_margin`` ahead of the runner-up - callers then fall back
+    to keyword matching.
+    """
+
+    def __init__(self, groups, encode, threshold=0.45, min_margin=0.02):
+        self.threshold = threshold
+        self.min_margin = min_margin
+
+        texts = []
+        example_spans = []
+        self.labels = []
+        self.group_slices = {}
+        for group, labels in groups.items():
+            group_start = len(self.labels)
+            for label, examples in labels.items():
+                example_spans.append((len(texts), len(texts) + len(examples)))
+                texts.extend(examples)
+                self.labels.append(label)
+            self.group_slices[group] = slice(group_start, len(self.labels))
+
+        example_embeddings = _normalize_rows(encode(texts))
+        self.prototypes = _normalize_rows(np.vstack([
+            example_embeddings[start:end].mean(axis=0) for start, end in example_spans
+        ]))
+
+    def scores(self, query_embedding):
+        """Cosine similarity of the query to every prototype"""
+        return self.prototypes @ _normalize_rows(np.reshape(query_embedding, -1))
+
+    def classify(self, query_embedding):
+        scores = self.scores(query_embedding)
+
+        predictions = {}
+        for group, group_slice in self.group_slices.items():
+            group_scores = scores[group_slice]
+            best = int(np.argmax(group_scores))
+            best_score = float(group_scores[best])
+            runner_up = float(np.partition(group_scores, -2)[-2]) if len(group_scores) > 1 else -1.0
+
+            if best_score >= self.threshold and best_score - runner_up >= self.min_margin:
+                predictions[group] = (self.labels[group_slice.start + best], best_score)
+            else:
+                predictions[group] = None
+
+        return predictions
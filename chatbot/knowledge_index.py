@@ -0,0 +1,491 @@
+"""
+Lexical lookup structures built once per knowledge base snapshot.
+
+The chatbot used to scan every knowledge item with substring checks on each
+request. KnowledgeIndex maps tokens and phrases to item positions so topic
+extraction and specific-match lookups only touch the items that can match.
+It also keeps per-item feature columns (type ids, title/description token
+incidence) so search candidates can be rescored as one NumPy batch, and an
+AboutIndex over the about/rationale/objective/timeline/team items.
+"""
+
+import os
+import re
+import numpy as np
+from collections import defaultdict
+from django.conf import settings
+from fuzzywuzzy import fuzz
+
+_stopwords = None
+
+_NON_WORD_RE = re.compile(r'[^\w\s\-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+ABOUT_TYPES = (
+    'about', 'rationale', 'objective', 'activity', 'timeline', 'team_member',
+    'sub_project', 'sub_rationale', 'sub_objective', 'sub_timeline', 'sub_team_member'
+)
+
+ABOUT_KEYWORDS = (
+    'mission', 'vision', 'goal', 'objective', 'feature', 'purpose',
+    'history', 'background', 'overview', 'introduction', 'description',
+    'what is', 'who are', 'how does', 'aanr', 'knowledge hub', 'km hub',
+    'agriculture', 'aquaculture', 'fisheries', 'research', 'innovation',
+    'team', 'member', 'project', 'activity', 'timeline', 'rationale',
+    'about us', 'contact', 'organization', 'structure', 'management'
+)
+
+# Item types that get a bonus when a keyword containing one of the cue words is asked about
+_ABOUT_TYPE_CUES = (
+    (('team_member',), ('team', 'member', 'who')),
+    (('timeline',), ('when', 'history', 'timeline')),
+    (('objective', 'sub_objective'), ('goal', 'objective', 'aim')),
+    (('rationale', 'sub_rationale'), ('why', 'reason', 'purpose')),
+)
+
+# Distinct query words whose fuzzy expansions are cached per about index
+FUZZY_WORD_CACHE_SIZE = 4096
+
+
+def load_stopwords():
+    """Load custom stopwords from stopwords.txt file - cached globally"""
+    global _stopwords
+    if _stopwords is not None:
+        return _stopwords
+    
+    _stopwords = set()
+    
+    try:
+        stopwords_path = os.path.join(settings.BASE_DIR, 'utils', 'stopwords', 'stopwords.txt')
+        with open(stopwords_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                word = line.strip().lower()
+                if word and not word.startswith('//'):
+                    _stopwords.add(word)
+        print(f"✅ Loaded {len(_stopwords)} custom stopwords")
+    except FileNotFoundError:
+        print("⚠️ Custom stopwords file not found, using default English stopwords")
+        _stopwords = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+    
+    return _stopwords
+
+
+def normalize_text(text):
+    """Lowercase and strip punctuation the same way preprocess_text does, keeping stopwords"""
+    if not text:
+        return ""
+    text = _NON_WORD_RE.sub(' ', text.lower())
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+class TokenIncidence:
+    """
+    Binary item x token incidence, stored row-major (per-item token column
+    arrays) so rescoring only reads the rows of its candidates.
+    """
+
+    def __init__(self, token_sets, token_columns):
+        columns = []
+        lengths = []
+        for tokens in token_sets:
+            columns.extend(token_columns[token] for token in tokens)
+            lengths.append(len(tokens))
+
+        self.row_count = len(token_sets)
+        self.indices = np.asarray(columns, dtype=np.int64)
+        self.indptr = np.zeros(self.row_count + 1, dtype=np.int64)
+        np.cumsum(np.asarray(lengths, dtype=np.int64), out=self.indptr[1:])
+
+    def overlap(self, query_columns, positions):
+        """Number of the query's tokens present in each of the items at ``positions``"""
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.indptr[positions]
+        lengths = self.indptr[positions + 1] - starts
+        total = int(lengths.sum())
+        if not query_columns or not total:
+            return np.zeros(len(positions), dtype=np.float32)
+
+        # Flat indexes of the candidates' rows, and which candidate each belongs to
+        row_offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        owners = np.repeat(np.arange(len(positions)), lengths)
+        hits = np.isin(self.indices[np.arange(total) + row_offsets], np.asarray(query_columns, dtype=np.int64))
+        return np.bincount(owners[hits], minlength=len(positions)).astype(np.float32)
+
+
+def tokenize(text, stopwords=frozenset()):
+    """Token set equivalent to preprocess_text(text).split()"""
+    return frozenset(
+        word for word in normalize_text(text).split()
+        if word not in stopwords and len(word) > 1
+    )
+
+
+class KnowledgeIndex:
+    """Inverted token/phrase index over a list of knowledge items"""
+
+    def __init__(self, knowledge_data, stopwords=frozenset()):
+        self.knowledge_data = knowledge_data
+        self.stopwords = frozenset(stopwords)
+
+        # Stopword-filtered token sets per item, aligned with knowledge_data
+        self.title_tokens = []
+        self.description_tokens = []
+        # title + content (or description), as used by the about-query scoring
+        self.text_tokens = []
+
+        # Lowercased fields, kept for exact scoring of the few candidates found
+        self.titles_lower = []
+        self.descriptions_lower = []
+
+        # Space-padded normalized title/description text for phrase verification
+        self._normalized_texts = []
+
+        # normalized token -> positions of items containing it in title or description
+        self.token_postings = defaultdict(set)
+        # normalized title token -> positions (a superset of raw title word matches)
+        self.title_word_postings = defaultdict(set)
+        # character trigram of the lowercased title -> positions, for query-in-title substrings
+        self.title_trigrams = defaultdict(set)
+        # exact lowercased title -> positions, and the distinct title lengths, for title-in-query
+        self.title_postings = defaultdict(set)
+        self.title_lengths = set()
+
+        # Source-click lookups - the first item wins on collisions, like the old linear scan
+        # (type, str(actual_id)) -> position
+        self.source_positions = {}
+        # str(actual_id) -> positions, for callers that don't send the type
+        self.actual_id_positions = defaultdict(list)
+        # item id ("resource_12") and url -> position; slug -> positions (slugs repeat across types)
+        self.id_positions = {}
+        self.slug_positions = defaultdict(list)
+        self.url_positions = {}
+
+        for position, item in enumerate(knowledge_data):
+            self._add_item(position, item)
+
+        self._build_feature_columns()
+        self.about_index = AboutIndex(knowledge_data, self.text_tokens)
+
+    def _add_item(self, position, item):
+        actual_id = item.get('actual_id')
+        if actual_id is not None:
+            self.source_positions.setdefault((item.get('type'), str(actual_id)), position)
+            self.actual_id_positions[str(actual_id)].append(position)
+        if item.get('id') is not None:
+            self.id_positions.setdefault(str(item['id']), position)
+        if item.get('slug'):
+            self.slug_positions[item['slug']].append(position)
+        if item.get('url') or item.get('link'):
+            self.url_positions.setdefault(item.get('url') or item.get('link'), position)
+
+        title_lower = (item.get('title') or '').lower()
+        desc_lower = (item.get('description') or '').lower()
+        self.titles_lower.append(title_lower)
+        self.descriptions_lower.append(desc_lower)
+
+        self.title_postings[title_lower].add(position)
+        self.title_lengths.add(len(title_lower))
+        for i in range(len(title_lower) - 2):
+            self.title_trigrams[title_lower[i:i + 3]].add(position)
+
+        normalized_title = normalize_text(title_lower)
+        for token in normalized_title.split():
+            self.title_word_postings[token].add(position)
+        normalized_desc = normalize_text(desc_lower)
+        self._normalized_texts.append((f" {normalized_title} ", f" {normalized_desc} "))
+
+        for token in normalized_title.split():
+            self.token_postings[token].add(position)
+        for token in normalized_desc.split():
+            self.token_postings[token].add(position)
+
+        title_tokens = tokenize(normalized_title, self.stopwords)
+        self.title_tokens.append(title_tokens)
+        self.description_tokens.append(tokenize(normalized_desc, self.stopwords))
+        self.text_tokens.append(
+            title_tokens | tokenize(item.get('content', item.get('description', '')), self.stopwords)
+        )
+
+    def _build_feature_columns(self):
+        """Arrays aligned with knowledge_data for vectorized candidate rescoring"""
+        self.type_codes = {}
+        self.type_ids = np.fromiter(
+            (self.type_codes.setdefault(item.get('type'), len(self.type_codes)) for item in self.knowledge_data),
+            dtype=np.int32, count=len(self.knowledge_data)
+        )
+
+        self.token_columns = {}
+        for tokens in self.title_tokens + self.description_tokens:
+            for token in tokens:
+                self.token_columns.setdefault(token, len(self.token_columns))
+
+        self.title_incidence = TokenIncidence(self.title_tokens, self.token_columns)
+        self.description_incidence = TokenIncidence(self.description_tokens, self.token_columns)
+
+    def query_columns(self, query_tokens):
+        """Incidence columns of the query tokens that occur in any title or description"""
+        return [self.token_columns[token] for token in query_tokens if token in self.token_columns]
+
+    def type_matches(self, item_type, positions):
+        """True for each of the items at ``positions`` that has the given type"""
+        type_id = self.type_codes.get(item_type)
+        if type_id is None:
+            return np.zeros(len(positions), dtype=bool)
+        return self.type_ids[positions] == type_id
+
+    def topic_matches(self, topic, positions):
+        """True for each of the items at ``positions`` whose lowercased title contains the topic"""
+        topic_lower = topic.lower()
+        return np.fromiter(
+            (topic_lower in self.titles_lower[position] for position in positions),
+            dtype=bool, count=len(positions)
+        )
+
+    def __len__(self):
+        return len(self.knowledge_data)
+
+    def tokenize(self, text):
+        """Tokenize a query with the same normalization and stopwords as the items"""
+        return tokenize(text, self.stopwords)
+
+    def find_source(self, source_id=None, source_type=None, source_title=None, slug=None, url=None):
+        """
+        Position of a clicked source, or None.
+
+        ``(source_type, source_id)`` is the unambiguous key; without a type the
+        id may also be an item id, and ``source_title`` breaks ties between
+        items sharing an actual_id. Slug and url are secondary keys.
+        """
+        if source_id is not None:
+            source_id = str(source_id)
+            if source_type:
+                position = self.source_positions.get((source_type, source_id))
+                if position is not None:
+                    return position
+            else:
+                position = self.id_positions.get(source_id)
+                if position is not None:
+                    return position
+                candidates = self.actual_id_positions.get(source_id, ())
+                if source_title is not None:
+                    candidates = [position for position in candidates if self.knowledge_data[position].get('title') == source_title]
+                if candidates:
+                    return candidates[0]
+
+        if slug:
+            for position in self.slug_positions.get(slug, ()):
+                if not source_type or self.knowledge_data[position].get('type') == source_type:
+                    return position
+        if url and url in self.url_positions:
+            return self.url_positions[url]
+        return None
+
+    def find_phrase(self, phrase):
+        """
+        Positions of items whose title or description contains the phrase as a
+        whole-word sequence, in knowledge base order.
+        """
+        tokens = normalize_text(phrase).split()
+        if not tokens:
+            return []
+
+        postings = [self.token_postings.get(token) for token in tokens]
+        if not all(postings):
+            return []
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+
+        if len(tokens) == 1:
+            return sorted(candidates)
+
+        padded_phrase = f" {' '.join(tokens)} "
+        return sorted(
+            position for position in candidates
+            if padded_phrase in self._normalized_texts[position][0]
+            or padded_phrase in self._normalized_texts[position][1]
+        )
+
+    def title_candidates(self, query_lower):
+        """
+        Positions of items sharing a title word with the query, whose title
+        contains the query, or whose title the query contains - every item
+        _find_specific_matches could score.
+        """
+        candidates = set()
+
+        for token in normalize_text(query_lower).split():
+            candidates.update(self.title_word_postings.get(token, ()))
+
+        # Query inside a title: intersect the trigram postings, then verify the substring
+        if len(query_lower) >= 3:
+            postings = sorted(
+                (self.title_trigrams.get(query_lower[i:i + 3], set()) for i in range(len(query_lower) - 2)),
+                key=len
+            )
+            if postings[0]:
+                matches = set(postings[0]).intersection(*postings[1:])
+                candidates.update(position for position in matches if query_lower in self.titles_lower[position])
+        else:
+            candidates.update(position for position, title in enumerate(self.titles_lower) if query_lower in title)
+
+        # Titles inside the query: look up every query substring of a length some title has
+        for length in self.title_lengths:
+            for start in range(len(query_lower) - length + 1):
+                candidates.update(self.title_postings.get(query_lower[start:start + length], ()))
+
+        return candidates
+
+
+def _fuzzy_length_compatible(length, other_length, threshold):
+    """fuzz.ratio can only reach the threshold if the lengths are close enough"""
+    return 200.0 * min(length, other_length) / (length + other_length) >= threshold - 0.5
+
+
+class AboutIndex:
+    """
+    Precomputed lookups for the "about" query path.
+
+    Built once per snapshot over the ABOUT_TYPES items: cleaned display
+    copies, keyword -> position sets for titles and content, type/field
+    postings and a token inverted index, so scoring a query is lookups and
+    set operations. Fuzzy keyword and word matches are computed on first
+    use and cached.
+    """
+
+    def __init__(self, knowledge_data, text_tokens):
+        self.positions = []
+        self.titles = {}
+        self.cleaned_items = {}
+        self.titles_lower = {}
+        self.contents_lower = {}
+        self.text_tokens = {}
+        self.positions_by_type = defaultdict(set)
+        self.with_name = set()
+        self.with_date = set()
+        self.with_role = set()
+        self.token_postings = defaultdict(set)
+
+        for position, item in enumerate(knowledge_data):
+            if item.get('type') not in ABOUT_TYPES:
+                continue
+            self.positions.append(position)
+            self.titles[position] = item.get('title')
+            self.titles_lower[position] = (item.get('title') or '').lower()
+            self.contents_lower[position] = (item.get('content', item.get('description', '')) or '').lower()
+            self.text_tokens[position] = text_tokens[position]
+            self.positions_by_type[item['type']].add(position)
+
+            if 'name' in item:
+                self.with_name.add(position)
+            if 'date' in item:
+                self.with_date.add(position)
+            if 'role' in item:
+                self.with_role.add(position)
+
+            for token in text_tokens[position]:
+                self.token_postings[token].add(position)
+
+            clean_content = _WHITESPACE_RE.sub(' ', _HTML_TAG_RE.sub('', item.get('description', '') or '')).strip()
+            self.cleaned_items[position] = {
+                **item,
+                'description': clean_content[:500] + ('...' if len(clean_content) > 500 else '')
+            }
+
+        self.title_keyword_hits = {
+            keyword: {position for position in self.positions if keyword in self.titles_lower[position]}
+            for keyword in ABOUT_KEYWORDS
+        }
+        self.content_keyword_hits = {
+            keyword: {position for position in self.positions if keyword in self.contents_lower[position]}
+            for keyword in ABOUT_KEYWORDS
+        }
+        self.keyword_type_bonus = {}
+        for keyword in ABOUT_KEYWORDS:
+            bonus = set()
+            for types, cues in _ABOUT_TYPE_CUES:
+                if any(cue in keyword for cue in cues):
+                    for item_type in types:
+                        bonus |= self.positions_by_type.get(item_type, set())
+            self.keyword_type_bonus[keyword] = bonus
+
+        self._vocabulary_by_length = defaultdict(list)
+        for token in self.token_postings:
+            self._vocabulary_by_length[len(token)].append(token)
+
+        self._fuzzy_title_hits = {}
+        self._fuzzy_content_hits = {}
+        self._similar_words = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def fuzzy_title_hits(self, keyword, threshold=75):
+        """Positions whose title partially matches the keyword (fuzz.partial_ratio)"""
+        return self._fuzzy_hits(keyword, threshold, self.titles_lower, self._fuzzy_title_hits)
+
+    def fuzzy_content_hits(self, keyword, threshold=75):
+        """Positions whose content partially matches the keyword (fuzz.partial_ratio)"""
+        return self._fuzzy_hits(keyword, threshold, self.contents_lower, self._fuzzy_content_hits)
+
+    def _fuzzy_hits(self, keyword, threshold, texts, cache):
+        key = (keyword, threshold)
+        hits = cache.get(key)
+        if hits is None:
+            # An exact substring is a partial_ratio of 100 - no need to score it
+            hits = {
+                position for position in self.positions
+                if keyword in texts[position] or fuzz.partial_ratio(keyword, texts[position]) >= threshold
+            }
+            cache[key] = hits
+        return hits
+
+    def similar_words(self, word, threshold=80):
+        """Indexed tokens with fuzz.ratio(word, token) >= threshold"""
+        similar = self._similar_words.get(word)
+        if similar is None:
+            similar = set()
+            for length, tokens in self._vocabulary_by_length.items():
+                if not _fuzzy_length_compatible(len(word), length, threshold):
+                    continue
+                similar.update(token for token in tokens if fuzz.ratio(word, token) >= threshold)
+            if len(self._similar_words) >= FUZZY_WORD_CACHE_SIZE:
+                self._similar_words.clear()
+            self._similar_words[word] = similar
+        return similar
+
+    def semantic_similarities(self, query_tokens):
+        """
+        {position: similarity} for items sharing an exact or fuzzy word with
+        the query - the mean of token Jaccard and the share of query words
+        matched exactly or with fuzz.ratio >= 80.
+        """
+        if not query_tokens:
+            return {}
+
+        exact_counts = defaultdict(int)
+        fuzzy_counts = defaultdict(int)
+        for word in query_tokens:
+            exact = self.token_postings.get(word, set())
+            for position in exact:
+                exact_counts[position] += 1
+
+            matched = set(exact)
+            for similar_word in self.similar_words(word):
+                matched |= self.token_postings[similar_word]
+            for position in matched:
+                fuzzy_counts[position] += 1
+
+        similarities = {}
+        for position, fuzzy_count in fuzzy_counts.items():
+            intersection = exact_counts.get(position, 0)
+            union = len(query_tokens) + len(self.text_tokens[position]) - intersection
+            jaccard = intersection / union if union > 0 else 0
+            similarities[position] = (jaccard + fuzzy_count / len(query_tokens)) / 2
+        return similarities
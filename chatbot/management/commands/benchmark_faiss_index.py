@@ -0,0 +1,198 @@
+import os
+import time
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from chatbot.artifacts import (
+    FAISS_AVAILABLE,
+    FAISS_INDEX_MODES,
+    describe_faiss_index,
+    get_artifact_paths,
+    get_faiss_index_options,
+    make_faiss_index
+)
+
+class Command(BaseCommand):
+    help = 'Compare FAISS index modes (flat/ivf/hnsw): recall@k against exact search and per-query latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            type=str,
+            default=','.join(FAISS_INDEX_MODES),
+            help='Comma-separated index modes to benchmark',
+        )
+        parser.add_argument(
+            '-k', '--top-k',
+            type=int,
+            default=10,
+            help='Neighbours per query used for recall@k',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=500,
+            help='Number of benchmark queries',
+        )
+        parser.add_argument(
+            '--nprobe',
+            type=str,
+            default=None,
+            help='Comma-separated IVF nprobe values to sweep (default: the configured/automatic value)',
+        )
+        parser.add_argument(
+            '--ef-search',
+            type=str,
+            default=None,
+            help='Comma-separated HNSW efSearch values to sweep',
+        )
+        parser.add_argument(
+            '--synthetic',
+            type=int,
+            default=None,
+            help='Benchmark a synthetic clustered corpus of this many vectors instead of the built knowledge base',
+        )
+        parser.add_argument(
+            '--input',
+            type=str,
+            default=None,
+            help='Knowledge base JSON whose embedding artifacts should be used',
+        )
+
+    def handle(self, *args, **options):
+        if not FAISS_AVAILABLE:
+            raise CommandError("FAISS is not installed - pip install faiss-cpu")
+
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = [mode for mode in modes if mode not in FAISS_INDEX_MODES]
+        if unknown:
+            raise CommandError(f"Unknown index mode(s): {', '.join(unknown)}")
+
+        embeddings = self.load_embeddings(options)
+        top_k = min(options['top_k'], len(embeddings))
+        queries = self.make_queries(embeddings, options['queries'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🔬 Benchmarking {len(embeddings)} vectors of dimension {embeddings.shape[1]} "
+            f"with {len(queries)} queries, recall@{top_k}"
+        ))
+
+        # Exact neighbours are the ground truth for every approximate mode
+        exact_index = make_faiss_index(embeddings, mode='flat')
+        _, exact_ids = exact_index.search(queries, top_k)
+
+        index_options = get_faiss_index_options()
+        rows = []
+        for mode in modes:
+            build_start = time.perf_counter()
+            index = make_faiss_index(
+                embeddings, mode=mode, nlist=index_options['nlist'], nprobe=index_options['nprobe'],
+                hnsw_m=index_options['hnsw_m'], ef_search=index_options['ef_search']
+            )
+            build_seconds = time.perf_counter() - build_start
+
+            for label in self.search_settings(index, mode, options):
+                rows.append(self.measure(index, label, queries, exact_ids, top_k, build_seconds))
+
+        self.show_results(rows, top_k)
+
+    def load_embeddings(self, options):
+        """Embedding matrix from the build artifacts, or a synthetic corpus"""
+        if options['synthetic']:
+            return self.synthetic_embeddings(options['synthetic'])
+
+        json_path = options['input'] or os.path.join(settings.BASE_DIR, 'chatbot', 'data', 'knowledge_base.json')
+        embeddings_path = get_artifact_paths(json_path)['embeddings']
+        if not os.path.exists(embeddings_path):
+            raise CommandError(
+                f"No embedding artifacts at {embeddings_path} - run: python manage.py build_knowledge_base --force "
+                f"(or use --synthetic N)"
+            )
+
+        embeddings = np.load(embeddings_path, mmap_mode='r')
+        return np.ascontiguousarray(embeddings, dtype='float32')
+
+    def synthetic_embeddings(self, count, dimension=384):
+        """Clustered unit vectors - uniform random data would understate IVF/HNSW recall"""
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(max(1, int(np.sqrt(count))), dimension)).astype('float32')
+        assignments = rng.integers(0, len(centers), size=count)
+        embeddings = centers[assignments] + 0.5 * rng.normal(size=(count, dimension)).astype('float32')
+        return self.normalize(embeddings)
+
+    def make_queries(self, embeddings, query_count):
+        """Perturbed copies of random documents, so queries are near - not identical to - indexed vectors"""
+        rng = np.random.default_rng(1)
+        sample = rng.choice(len(embeddings), size=min(query_count, len(embeddings)), replace=False)
+        queries = embeddings[sample] + 0.05 * rng.normal(size=(len(sample), embeddings.shape[1])).astype('float32')
+        return self.normalize(queries)
+
+    def normalize(self, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def search_settings(self, index, mode, options):
+        """Apply each requested nprobe/efSearch value in turn and yield a label for it"""
+        import faiss
+
+        if mode == 'ivf' and options['nprobe']:
+            ivf = faiss.extract_index_ivf(index)
+            for value in options['nprobe'].split(','):
+                ivf.nprobe = min(int(value), ivf.nlist)
+                yield f"ivf nlist={ivf.nlist} nprobe={ivf.nprobe}"
+        elif mode == 'hnsw' and options['ef_search']:
+            hnsw = faiss.downcast_index(index).hnsw
+            for value in options['ef_search'].split(','):
+                hnsw.efSearch = int(value)
+                yield f"hnsw efSearch={hnsw.efSearch}"
+        elif mode == 'ivf':
+            ivf = faiss.extract_index_ivf(index)
+            yield f"ivf nlist={ivf.nlist} nprobe={ivf.nprobe}"
+        elif mode == 'hnsw':
+            yield f"hnsw efSearch={faiss.downcast_index(index).hnsw.efSearch}"
+        else:
+            yield describe_faiss_index(index)
+
+    def measure(self, index, label, queries, exact_ids, top_k, build_seconds):
+        """Recall@k and single-query latency - the chatbot searches one query at a time"""
+        latencies = []
+        found_ids = np.empty((len(queries), top_k), dtype=np.int64)
+
+        for row, query in enumerate(queries):
+            start = time.perf_counter()
+            _, ids = index.search(query.reshape(1, -1), top_k)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            found_ids[row] = ids[0]
+
+        recall = np.mean([
+            len(set(found[found >= 0]) & set(exact)) / top_k
+            for found, exact in zip(found_ids, exact_ids)
+        ])
+
+        return {
+            'label': label,
+            'recall': float(recall),
+            'mean_ms': float(np.mean(latencies)),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'build_s': build_seconds,
+        }
+
+    def show_results(self, rows, top_k):
+        """Print one line per index mode/setting"""
+        header = f"{'index':<32} {'recall@' + str(top_k):>10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'build s':>9}"
+        self.stdout.write(f"\n{header}\n{'-' * len(header)}")
+
+        for row in rows:
+            self.stdout.write(
+                f"{row['label']:<32} {row['recall']:>10.3f} {row['mean_ms']:>9.3f} "
+                f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['build_s']:>9.2f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            "\n💡 Set CHATBOT_FAISS_INDEX_MODE (and CHATBOT_FAISS_IVF_NPROBE / CHATBOT_FAISS_HNSW_EF_SEARCH) "
+            "in settings.py, then run: python manage.py build_knowledge_base --force"
+        ))
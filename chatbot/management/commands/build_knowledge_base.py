@@ -9,6 +9,17 @@ from chatbot.management.modules.database_loader import (
     get_database_statistics,
     validate_database_connection
 )
+from chatbot.artifacts import (
+    FAISS_INDEX_MODES,
+    encode_documents,
+    save_embedding_artifacts,
+    save_tfidf_artifacts,
+    save_bm25_artifacts,
+    get_artifact_paths,
+    get_faiss_index_options,
+    knowledge_base_lock
+)
+from chatbot.knowledge_index import load_stopwords
 
 class Command(BaseCommand):
     help = 'Convert database knowledge base to JSON file for faster chatbot access'
@@ -35,6 +46,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Show database statistics only',
         )
+        parser.add_argument(
+            '--skip-embeddings',
+            action='store_true',
+            help='Do not build the embedding matrix and FAISS index artifacts',
+        )
+        parser.add_argument(
+            '--index-mode',
+            choices=('auto',) + FAISS_INDEX_MODES,
+            default=None,
+            help='FAISS index type (default: CHATBOT_FAISS_INDEX_MODE, "auto" picks by knowledge base size)',
+        )
 
     def handle(self, *args, **options):
         # Show statistics if requested
@@ -94,26 +116,40 @@ class Command(BaseCommand):
             # Get database statistics
             db_stats = get_database_statistics()
             
-            # Create comprehensive JSON structure
-            json_data = {
-                'metadata': {
-                    'version': '1.0',
-                    'generated_at': datetime.now().isoformat(),
-                    'total_items': len(knowledge_data),
-                    'document_count': len(document_texts),
-                    'source': 'database_export',
-                    'generator': 'build_knowledge_base_command',
-                    'database_stats': db_stats
-                },
-                'knowledge_data': knowledge_data,
-                'document_texts': document_texts,
-                'statistics': self.calculate_content_statistics(knowledge_data)
-            }
-            
-            # Write JSON file
-            self.stdout.write(f"💾 Writing JSON to {json_file_path}...")
-            with open(json_file_path, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2, default=str)
+            # Incremental persists from running workers wait until the rebuilt files are all in place
+            with knowledge_base_lock(json_file_path):
+                # Build embeddings and FAISS index once so workers can mmap them
+                artifacts = {}
+                if not options['skip_embeddings']:
+                    artifacts.update(self.build_embedding_artifacts(json_file_path, document_texts, options['index_mode']))
+            
+                # Fitted TF-IDF model for the cosine fallback path
+                artifacts.update(self.build_tfidf_artifacts(json_file_path, document_texts))
+            
+                # BM25 term counts for the sparse half of hybrid retrieval
+                artifacts.update(self.build_bm25_artifacts(json_file_path, document_texts))
+            
+                # Create comprehensive JSON structure
+                json_data = {
+                    'metadata': {
+                        'version': '1.0',
+                        'generated_at': datetime.now().isoformat(),
+                        'total_items': len(knowledge_data),
+                        'document_count': len(document_texts),
+                        'source': 'database_export',
+                        'generator': 'build_knowledge_base_command',
+                        'database_stats': db_stats,
+                        'artifacts': artifacts
+                    },
+                    'knowledge_data': knowledge_data,
+                    'document_texts': document_texts,
+                    'statistics': self.calculate_content_statistics(knowledge_data)
+                }
+            
+                # Write JSON file
+                self.stdout.write(f"💾 Writing JSON to {json_file_path}...")
+                with open(json_file_path, 'w', encoding='utf-8') as f:
+                    json.dump(json_data, f, ensure_ascii=False, indent=2, default=str)
             
             # Show success summary
             self.show_build_summary(json_file_path, json_data)
@@ -123,6 +159,59 @@ class Command(BaseCommand):
             import traceback
             self.stdout.write(traceback.format_exc())
 
+    def build_embedding_artifacts(self, json_file_path, document_texts, index_mode=None):
+        """Encode all documents and persist embeddings + FAISS index next to the JSON"""
+        try:
+            self.stdout.write(f"🧠 Encoding {len(document_texts)} documents...")
+            embeddings = encode_documents(document_texts)
+            
+            index_options = get_faiss_index_options()
+            if index_mode:
+                index_options['mode'] = index_mode
+            manifest = save_embedding_artifacts(
+                json_file_path, document_texts, embeddings, index_options=index_options
+            )
+            
+            paths = get_artifact_paths(json_file_path)
+            self.stdout.write(f"💾 Wrote embeddings to {paths['embeddings']}")
+            if manifest.get('faiss_index_file'):
+                self.stdout.write(f"💾 Wrote {manifest['faiss_index_mode']} FAISS index to {paths['faiss_index']}")
+            return manifest
+            
+        except ImportError as e:
+            self.stdout.write(self.style.WARNING(f"⚠️ Skipping embedding artifacts, missing AI libraries: {e}"))
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"⚠️ Could not build embedding artifacts: {e}"))
+        return {}
+
+    def build_tfidf_artifacts(self, json_file_path, document_texts):
+        """Fit TF-IDF once and persist vocabulary/idf plus the document-term matrix"""
+        try:
+            self.stdout.write("📐 Fitting TF-IDF model...")
+            manifest = save_tfidf_artifacts(json_file_path, document_texts, load_stopwords())
+            
+            paths = get_artifact_paths(json_file_path)
+            self.stdout.write(f"💾 Wrote TF-IDF matrix to {paths['tfidf_matrix']} ({manifest['tfidf_features']} features)")
+            return manifest
+            
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"⚠️ Could not build TF-IDF artifacts: {e}"))
+        return {}
+
+    def build_bm25_artifacts(self, json_file_path, document_texts):
+        """Count BM25 terms once and persist the counts and vocabulary"""
+        try:
+            self.stdout.write("📐 Counting BM25 terms...")
+            manifest = save_bm25_artifacts(json_file_path, document_texts, load_stopwords())
+            
+            paths = get_artifact_paths(json_file_path)
+            self.stdout.write(f"💾 Wrote BM25 counts to {paths['bm25_counts']} ({manifest['bm25_terms']} terms)")
+            return manifest
+            
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"⚠️ Could not build BM25 artifacts: {e}"))
+        return {}
+
     def calculate_content_statistics(self, knowledge_data):
         """Calculate statistics about the content"""
         stats = {
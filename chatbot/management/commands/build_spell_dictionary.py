@@ -0,0 +1,61 @@
+import os
+import time
+from django.core.management.base import BaseCommand
+
+from chatbot.spell_corrector import DynamicSpellCorrector, get_spell_dictionary_path
+from chatbot.symspell import SymSpellIndex, DEFAULT_MAX_EDIT_DISTANCE, DEFAULT_PREFIX_LENGTH
+
+
+class Command(BaseCommand):
+    help = 'Build the precompiled spell dictionary (frequencies, SymSpell index, learned patterns) from NLTK + knowledge base vocabulary'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Output path (default: chatbot/data/spell-dictionary.bin)',
+        )
+        parser.add_argument(
+            '--max-edit-distance',
+            type=int,
+            default=DEFAULT_MAX_EDIT_DISTANCE,
+            help='Largest edit distance a correction may span',
+        )
+        parser.add_argument(
+            '--prefix-length',
+            type=int,
+            default=DEFAULT_PREFIX_LENGTH,
+            help='Only the first N characters of each word are indexed',
+        )
+
+    def handle(self, *args, **options):
+        output_path = options['output'] or get_spell_dictionary_path()
+
+        # The corrector merges the English corpora (NLTK), domain terms and knowledge base vocabulary
+        corrector = DynamicSpellCorrector(use_prebuilt=False)
+        corrector.load_learned_patterns()
+        word_counts = corrector.spell_checker.word_frequency.dictionary
+
+        self.stdout.write(f"🔨 Indexing {len(word_counts)} words...")
+        start = time.perf_counter()
+        index = SymSpellIndex.build(
+            word_counts,
+            max_edit_distance=options['max_edit_distance'],
+            prefix_length=options['prefix_length'],
+        )
+        index.metadata = {
+            'learned_patterns': corrector.learned_patterns,
+            'knowledge_vocabulary_size': len(corrector.knowledge_vocabulary),
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        tmp_path = f"{output_path}.tmp"
+        index.save(tmp_path)
+        os.replace(tmp_path, output_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Wrote {output_path}: {len(index)} words, {len(index.key_hashes)} delete keys, "
+            f"{len(corrector.learned_patterns)} learned patterns, "
+            f"{os.path.getsize(output_path) / (1024 * 1024):.1f} MB in {time.perf_counter() - start:.1f}s"
+        ))
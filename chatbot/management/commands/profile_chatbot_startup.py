@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import resource
+import subprocess
+from django.core.management.base import BaseCommand, CommandError
+
+# Packages that should only ever be imported by warmed-up web workers
+HEAVY_MODULES = (
+    'torch', 'transformers', 'sentence_transformers', 'faiss',
+    'spacy', 'nltk', 'sklearn', 'scipy',
+)
+
+# Runs in a fresh interpreter so nothing is already imported
+PROFILE_SCRIPT = '''
+import json, resource, sys, time
+timings = {}
+start = time.perf_counter()
+import django
+django.setup()
+timings['django.setup()'] = time.perf_counter() - start
+for module in sys.argv[2:]:
+    start = time.perf_counter()
+    __import__(module)
+    timings[module] = time.perf_counter() - start
+print(json.dumps({
+    'timings': timings,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'heavy_modules': [name for name in sys.argv[1].split(',') if name in sys.modules],
+}))
+'''
+
+class Command(BaseCommand):
+    help = 'Profile chatbot import time and startup cost (python -X importtime in a fresh interpreter)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modules',
+            type=str,
+            default='chatbot.services,chatbot.views,chatbot.spell_corrector',
+            help='Comma-separated modules to import after django.setup()',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Number of slowest imports to list',
+        )
+        parser.add_argument(
+            '--warmup',
+            action='store_true',
+            help='Also run the web worker warmup steps in this process and time each one',
+        )
+
+    def handle(self, *args, **options):
+        modules = [module.strip() for module in options['modules'].split(',') if module.strip()]
+
+        self.stdout.write(self.style.SUCCESS("⏱️ Profiling chatbot startup in a fresh interpreter..."))
+        report, import_times = self.profile_imports(modules)
+
+        self.stdout.write("\n📦 Startup phases:")
+        for phase, seconds in report['timings'].items():
+            self.stdout.write(f"  {phase:<40} {seconds * 1000:>10.1f} ms")
+        self.stdout.write(f"  {'peak RSS':<40} {report['max_rss_kb'] / 1024:>10.1f} MB")
+
+        self.stdout.write("\n🐢 Slowest imports (cumulative):")
+        for module, cumulative_us, self_us in import_times[:options['top']]:
+            self.stdout.write(f"  {module:<50} {cumulative_us / 1000:>10.1f} ms  (self {self_us / 1000:.1f} ms)")
+
+        if report['heavy_modules']:
+            self.stdout.write(self.style.WARNING(
+                f"\n⚠️ Heavy packages imported at startup: {', '.join(report['heavy_modules'])}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("\n✅ No heavy AI/NLP packages imported at startup"))
+
+        if options['warmup']:
+            self.profile_warmup()
+
+    def profile_imports(self, modules):
+        """Run PROFILE_SCRIPT under -X importtime; return its report and (module, cumulative_us, self_us) rows"""
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'kmhub.settings')
+
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT, ','.join(HEAVY_MODULES)] + modules,
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=os.getcwd(),
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Profiling interpreter failed:\n{result.stderr[-2000:]}")
+
+        # App code may print during import; the report is the last line
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+
+        import_times = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            try:
+                self_us, cumulative_us, module = line[len('import time:'):].split('|', 2)
+                import_times.append((module.strip(), int(cumulative_us), int(self_us)))
+            except ValueError:
+                continue
+
+        import_times.sort(key=lambda row: row[1], reverse=True)
+        return report, import_times
+
+    def profile_warmup(self):
+        """Time each warmup step and the memory it adds"""
+        from chatbot.warmup import get_warmup_steps, run_warmup_steps
+
+        self.stdout.write("\n🔥 Warmup steps:")
+        for step in get_warmup_steps():
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            seconds = run_warmup_steps([step])[step]
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.stdout.write(
+                f"  {step:<40} {seconds * 1000:>10.1f} ms  (+{(rss_after - rss_before) / 1024:.1f} MB peak RSS)"
+            )
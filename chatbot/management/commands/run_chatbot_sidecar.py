@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from chatbot import services
+from chatbot.sidecar import SidecarServer
+from chatbot.warmup import run_warmup_steps
+
+DEFAULT_SOCKET_PATH = '/tmp/kmhub-chatbot.sock'
+
+class Command(BaseCommand):
+    help = 'Serve sentence-transformer encoding and FAISS search to the web workers over a Unix socket'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--socket',
+            type=str,
+            default=None,
+            help=f'Unix socket path (default: CHATBOT_SIDECAR_SOCKET or {DEFAULT_SOCKET_PATH})',
+        )
+
+    def handle(self, *args, **options):
+        socket_path = options['socket'] or getattr(settings, 'CHATBOT_SIDECAR_SOCKET', None) or DEFAULT_SOCKET_PATH
+
+        # This process is the sidecar - never route back to ourselves
+        services.disable_sidecar_client()
+
+        self.stdout.write(self.style.SUCCESS("🔥 Loading models, knowledge base and FAISS index..."))
+        run_warmup_steps(['knowledge_base', 'ai_models', 'embeddings'])
+        if services.get_sentence_transformer() is None:
+            raise CommandError("Sentence transformer could not be loaded - pip install sentence-transformers torch")
+
+        try:
+            server = SidecarServer(socket_path)
+        except OSError as e:
+            raise CommandError(f"Cannot listen on {socket_path}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"🚀 Chatbot sidecar listening on {socket_path}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("\n🛑 Stopping chatbot sidecar")
+        finally:
+            server.server_close()
@@ -43,6 +43,13 @@ class Command(BaseCommand):
         self.stdout.write(f"Pattern-based corrections: {stats['pattern_corrections']}")
         self.stdout.write(f"Algorithmic corrections: {stats['algorithmic_corrections']}")
         self.stdout.write(f"Cache hits: {stats['cache_hits']}")
+        for label, cache_stats in (('Word cache', stats['word_cache']), ('Query cache', stats['query_cache'])):
+            self.stdout.write(
+                f"{label}: {cache_stats['size']}/{cache_stats['maxsize']} entries, "
+                f"{cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['evictions']} evictions ({cache_stats['hit_rate']:.1f}% hit rate)"
+            )
         self.stdout.write(f"Learned patterns: {stats['learned_patterns_count']}")
         self.stdout.write(f"Knowledge vocabulary size: {stats['knowledge_vocabulary_size']}")
+        self.stdout.write(f"SymSpell dictionary size: {stats['symspell_dictionary_size']}")
         self.stdout.write(f"Pattern efficiency: {stats['pattern_efficiency']:.1f}%")
\ No newline at end of file
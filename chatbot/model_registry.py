@@ -0,0 +1,267 @@
+"""
+Registry for the large in-process models used by the chatbot.
+
+Each model is loaded the first time a code path asks for it, its resident
+size is recorded, and the registry keeps the total under a configurable
+memory budget by unloading the least recently used models. A background
+sweeper unloads models that have not been used for a while, so a worker
+that only ever does semantic search never pays for the zero-shot classifier.
+"""
+
+import gc
+import os
+import sys
+import time
+import threading
+
+_BYTES_PER_MB = 1024 * 1024
+
+
+def current_rss_bytes():
+    """Resident set size of this process (Linux /proc, else peak RSS)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure_model_bytes(model):
+    """Parameter + buffer bytes of a torch module (pipelines expose .model); None if unknown"""
+    module = getattr(model, 'model', model)
+    if not hasattr(module, 'parameters'):
+        return None
+    try:
+        tensors = list(module.parameters())
+        if hasattr(module, 'buffers'):
+            tensors += list(module.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors) or None
+    except Exception:
+        return None
+
+
+class _ModelEntry:
+    def __init__(self, name, loader, estimated_mb, pinned):
+        self.name = name
+        self.loader = loader
+        self.estimated_bytes = int((estimated_mb or 0) * _BYTES_PER_MB)
+        self.pinned = pinned
+        self.model = None
+        self.failed = False
+        self.size_bytes = None
+        self.last_used = 0.0
+        self.load_seconds = None
+        self.loads = 0
+        self.unloads = 0
+        self.budget_rejections = 0
+        self.lock = threading.Lock()
+
+    def expected_bytes(self):
+        """Measured size once loaded before, otherwise the registered estimate"""
+        return self.size_bytes if self.size_bytes is not None else self.estimated_bytes
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, memory-accounted models.
+
+    ``register(name, loader)`` only records how to build a model;
+    ``get(name)`` loads it on first use and returns None when the loader
+    fails or the model cannot fit in ``memory_budget_mb``. Models idle for
+    longer than ``idle_timeout`` seconds are unloaded by a daemon sweeper
+    thread unless they were registered as pinned. Set ``sweeper_paused``
+    while preloading in a process that is about to fork - each child starts
+    its own sweeper on first use once it is cleared.
+    """
+
+    def __init__(self, memory_budget_mb=None, idle_timeout=None, sweep_interval=60):
+        self.memory_budget_bytes = int(memory_budget_mb * _BYTES_PER_MB) if memory_budget_mb else None
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._sweeper_pid = None
+        self.sweeper_paused = False
+
+    def register(self, name, loader, estimated_mb=0, pinned=False):
+        """Record a loader - nothing is loaded until get(name)"""
+        with self._lock:
+            self._entries[name] = _ModelEntry(name, loader, estimated_mb, pinned)
+
+    def is_registered(self, name):
+        return name in self._entries
+
+    def is_loaded(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and entry.model is not None
+
+    def get(self, name):
+        """Return the model, loading it first if needed; None when unavailable"""
+        entry = self._entries[name]
+        entry.last_used = time.monotonic()
+
+        model = entry.model
+        if model is not None or entry.failed:
+            if model is not None and self._sweeper_pid != os.getpid():
+                self._ensure_sweeper()
+            return model
+
+        with entry.lock:
+            if entry.model is not None or entry.failed:
+                return entry.model
+
+            if not self._make_room(entry):
+                return None
+
+            print(f"🧠 Loading model '{name}' (first use)...")
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            try:
+                model = entry.loader()
+            except Exception as e:
+                print(f"❌ Error loading model '{name}': {e}")
+                model = None
+
+            if model is None:
+                entry.failed = True
+                return None
+
+            entry.load_seconds = round(time.perf_counter() - start, 3)
+            entry.size_bytes = measure_model_bytes(model) or max(current_rss_bytes() - rss_before, 0)
+            entry.loads += 1
+            entry.last_used = time.monotonic()
+            entry.model = model
+
+        print(f"✅ Model '{name}' loaded in {entry.load_seconds}s (~{entry.size_bytes / _BYTES_PER_MB:.0f} MB)")
+        self._ensure_sweeper()
+        return model
+
+    def _make_room(self, entry):
+        """Unload least recently used models until ``entry`` fits the budget"""
+        if self.memory_budget_bytes is None:
+            return True
+
+        needed = entry.expected_bytes()
+        with self._lock:
+            loaded = sorted(
+                (other for other in self._entries.values() if other.model is not None and other is not entry),
+                key=lambda other: other.last_used
+            )
+            resident = sum(other.size_bytes or 0 for other in loaded)
+            pinned = sum(other.size_bytes or 0 for other in loaded if other.pinned)
+
+            # Don't evict anything for a model that cannot fit anyway
+            if pinned + needed > self.memory_budget_bytes:
+                entry.budget_rejections += 1
+                print(
+                    f"⚠️ Model '{entry.name}' (~{needed / _BYTES_PER_MB:.0f} MB) does not fit the "
+                    f"{self.memory_budget_bytes / _BYTES_PER_MB:.0f} MB model budget"
+                )
+                return False
+
+            evicted = False
+            for other in loaded:
+                if resident + needed <= self.memory_budget_bytes:
+                    break
+                if not other.pinned:
+                    resident -= other.size_bytes or 0
+                    self._unload_entry(other, reason='memory budget')
+                    evicted = True
+
+        if evicted:
+            self._release_memory()
+        return True
+
+    def _unload_entry(self, entry, reason):
+        if entry.model is None:
+            return
+        entry.model = None
+        entry.unloads += 1
+        print(f"🧹 Unloaded model '{entry.name}' ({reason})")
+
+    def unload(self, name, reason='requested'):
+        """Drop a loaded model; it is reloaded on the next get()"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+        with self._lock:
+            self._unload_entry(entry, reason)
+        self._release_memory()
+
+    def unload_idle(self, now=None):
+        """Unload unpinned models unused for idle_timeout seconds; return their names"""
+        if not self.idle_timeout:
+            return []
+
+        now = time.monotonic() if now is None else now
+        unloaded = []
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.model is None or entry.pinned:
+                    continue
+                if now - entry.last_used >= self.idle_timeout:
+                    self._unload_entry(entry, reason=f'idle {now - entry.last_used:.0f}s')
+                    unloaded.append(entry.name)
+
+        if unloaded:
+            self._release_memory()
+        return unloaded
+
+    def _release_memory(self):
+        """Collect the dropped model graph and return cached GPU memory"""
+        gc.collect()
+        torch = sys.modules.get('torch')
+        if torch is not None:
+            try:
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+            except Exception:
+                pass
+
+    def _ensure_sweeper(self):
+        """Start the idle sweeper once per process (threads do not survive fork)"""
+        if not self.idle_timeout or self.sweeper_paused:
+            return
+        with self._lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+
+        interval = max(1, min(self.sweep_interval, self.idle_timeout))
+        threading.Thread(target=self._sweep_forever, args=(interval,), name='chatbot-model-sweeper', daemon=True).start()
+
+    def _sweep_forever(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.unload_idle()
+            except Exception as e:
+                print(f"⚠️ Model idle sweep failed: {e}")
+
+    def stats(self):
+        """Per-model state and the memory budget, for monitoring endpoints"""
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                entry.name: {
+                    'loaded': entry.model is not None,
+                    'failed': entry.failed,
+                    'pinned': entry.pinned,
+                    'size_mb': round(entry.expected_bytes() / _BYTES_PER_MB, 1),
+                    'load_seconds': entry.load_seconds,
+                    'idle_seconds': round(now - entry.last_used, 1) if entry.last_used else None,
+                    'loads': entry.loads,
+                    'unloads': entry.unloads,
+                    'budget_rejections': entry.budget_rejections,
+                }
+                for entry in self._entries.values()
+            }
+            resident = sum(entry.size_bytes or 0 for entry in self._entries.values() if entry.model is not None)
+
+        return {
+            'models': models,
+            'resident_mb': round(resident / _BYTES_PER_MB, 1),
+            'memory_budget_mb': round(self.memory_budget_bytes / _BYTES_PER_MB, 1) if self.memory_budget_bytes else None,
+            'idle_timeout': self.idle_timeout,
+        }
@@ -0,0 +1,87 @@
+"""
+Aho-Corasick multi-pattern matching for the chatbot's keyword tables.
+
+The basic-response patterns and the intent/content-type/about keyword lists
+are compiled into one automaton when the service loads, so finding every
+pattern that occurs in a query is a single pass over the query no matter
+how many patterns there are. Matching keeps the plain substring semantics
+of the ``pattern in query`` tests it replaces.
+"""
+
+from collections import deque
+
+
+class PatternMatcher:
+    """
+    Automaton over ``(group, label, pattern)`` entries.
+
+    ``match(text)`` returns ``{group: [(label, pattern), ...]}`` for every
+    pattern occurring in the lowercased text, ordered by registration order
+    - so "first match in table order" is simply the first entry of a group.
+    """
+
+    def __init__(self, entries):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.pattern_count = 0
+
+        for group, label, pattern in entries:
+            self._add(group, label, pattern)
+        self._build()
+
+    def _add(self, group, label, pattern):
+        pattern = pattern.lower()
+        if not pattern:
+            return
+
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+
+        self._output[node].append((self.pattern_count, group, label, pattern))
+        self.pattern_count += 1
+
+    def _build(self):
+        """Breadth-first failure links; each node also reports its suffixes' patterns"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child].extend(self._output[self._fail[child]])
+
+        self._output = [tuple(output) for output in self._output]
+
+    def match(self, text):
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found = {}
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for entry in output[node]:
+                found[entry[0]] = entry
+
+        matches = {}
+        for _, group, label, pattern in sorted(found.values()):
+            matches.setdefault(group, []).append((label, pattern))
+        return matches
+
+    def __len__(self):
+        return self.pattern_count
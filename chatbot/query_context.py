@@ -0,0 +1,91 @@
+"""
+Per-request query state.
+
+A QueryContext is created once per user query and passed through the
+response pipeline. Every derived form - spell-corrected, lowercased,
+preprocessed, tokenized, embedded, intent prediction - is computed on first
+access and reused by every later stage, so each transformation runs once
+per request. It also pins the knowledge base snapshot the request started
+with.
+"""
+
+from .spell_corrector import correct_spelling_dynamic
+
+
+class QueryContext:
+    """
+    Lazily derived forms of one query.
+
+    Pipeline methods accept either a query string or a context and call
+    ``QueryContext.of(query)``, so existing string callers keep working.
+    """
+
+    _UNSET = object()
+
+    def __init__(self, query, corrected=None):
+        self.original = (query or '').strip()
+        self._corrected = corrected
+        self._snapshot = None
+        self._lower = None
+        self._preprocessed = None
+        self._tokens = None
+        self._embeddings = {}
+        self._intent_prediction = self._UNSET
+
+    @classmethod
+    def of(cls, query):
+        return query if isinstance(query, cls) else cls(query)
+
+    @property
+    def snapshot(self):
+        """Knowledge base snapshot for this request"""
+        if self._snapshot is None:
+            from .services import get_knowledge_base_cache
+            self._snapshot = get_knowledge_base_cache()
+        return self._snapshot
+
+    @property
+    def corrected(self):
+        if self._corrected is None:
+            self._corrected = correct_spelling_dynamic(self.original) if self.original else self.original
+            if self._corrected != self.original:
+                print(f"🔧 Query corrected: '{self.original}' → '{self._corrected}'")
+        return self._corrected
+
+    @property
+    def lower(self):
+        """Lowercased corrected query"""
+        if self._lower is None:
+            self._lower = self.corrected.lower()
+        return self._lower
+
+    @property
+    def preprocessed(self):
+        """Corrected query with punctuation and stopwords removed (preprocess_text)"""
+        if self._preprocessed is None:
+            from .services import preprocess_text
+            self._preprocessed = preprocess_text(self.corrected)
+        return self._preprocessed
+
+    @property
+    def tokens(self):
+        """Stopword-filtered token set of the corrected query"""
+        if self._tokens is None:
+            self._tokens = self.snapshot['knowledge_index'].tokenize(self.corrected)
+        return self._tokens
+
+    def embedding(self, text=None):
+        """Sentence embedding of ``text`` (default: the corrected query); None without an encoder"""
+        text = self.corrected if text is None else text
+        if text not in self._embeddings:
+            from .services import encode_query
+            self._embeddings[text] = encode_query(text)
+        return self._embeddings[text]
+
+    @property
+    def intent_prediction(self):
+        """Prototype intent/content-type prediction (classify_query_intent), or None"""
+        if self._intent_prediction is self._UNSET:
+            from .services import classify_query_intent
+            self._intent_prediction = classify_query_intent(self.corrected, context=self)
+        return self._intent_prediction
@@ -1,55 +1,141 @@
 import re
 import json
+import importlib.util
 import logging
 import random
 import numpy as np
-import spacy
 import threading
 import os
-from fuzzywuzzy import fuzz
+import time
+import queue
+import zlib
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from django.core.cache import cache
 from django.conf import settings
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from .spell_corrector import (
-    correct_spelling_dynamic, 
     get_spell_corrector, 
     advanced_fuzzy_match, 
     fuzzy_match_keywords,
     get_spell_correction_stats
 )
-# Import for local AI and FAISS
-try:
-    from sentence_transformers import SentenceTransformer
-    from transformers import pipeline       
-    import torch
-    import faiss
-    TRANSFORMERS_AVAILABLE = True
-    FAISS_AVAILABLE = True
-    print("✅ AI libraries loaded successfully!")
-except ImportError as e:
-    TRANSFORMERS_AVAILABLE = False
-    FAISS_AVAILABLE = False
-    print(f"⚠️ Missing AI libraries: {e}")
+from .artifacts import (
+    EMBEDDING_MODEL_NAME,
+    configure_faiss_search,
+    describe_faiss_index,
+    get_faiss_index_options,
+    load_bm25_artifacts,
+    load_embedding_artifacts,
+    load_tfidf_artifacts,
+    make_faiss_index,
+    make_tfidf_vectorizer
+)
+from .knowledge_index import ABOUT_KEYWORDS, KnowledgeIndex, load_stopwords
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .caches import LRUCache
+from .model_registry import ModelRegistry
+from .intent_prototypes import PrototypeClassifier, load_prototype_examples
+from .sidecar import SidecarClient, SidecarError
+from .pattern_matcher import PatternMatcher
+from .query_context import QueryContext
+from .incremental import claim_pending_refreshes
+# AI libraries (torch, transformers, faiss) are imported on first use, never at
+# module import - migrate/collectstatic and other management commands stay fast
+TRANSFORMERS_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None
+    for name in ('sentence_transformers', 'transformers', 'torch')
+)
+FAISS_AVAILABLE = importlib.util.find_spec('faiss') is not None
+if not (TRANSFORMERS_AVAILABLE and FAISS_AVAILABLE):
+    print("⚠️ Missing AI libraries - semantic search disabled")
     print("💡 Install with: pip install transformers sentence-transformers torch faiss-cpu")
 
 # Global singleton instances - loaded once and reused
-_ai_models = None
-_nlp_model = None
 _vectorizer = None
-_stopwords = None
 _basic_responses = None
+_query_matcher = None
 _faiss_index = None
 _faiss_embeddings = None
-_model_loading_lock = threading.Lock()
+_intent_prototypes = None
+_intent_prototypes_lock = threading.Lock()
+_sidecar_client = None
+_sidecar_disabled = False
+_search_executor = None
+_search_executor_pid = None
+_search_executor_lock = threading.Lock()
 _knowledge_base_cache = None
 _knowledge_base_last_updated = None
+_knowledge_base_version = 0
+_knowledge_base_checked_at = 0.0
 
 # JSON-based loading for better performance
 _json_knowledge_cache = None
 _json_last_loaded = None
 
+# Query embeddings keyed by the normalized enhanced query - skips transformer inference on repeats
+_query_embedding_cache = LRUCache(
+    maxsize=getattr(settings, 'CHATBOT_QUERY_EMBEDDING_CACHE_SIZE', 2048),
+    name='query_embeddings'
+)
+
+# Generated responses keyed by (KB version, normalized corrected query)
+_response_cache = LRUCache(
+    maxsize=getattr(settings, 'CHATBOT_RESPONSE_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'CHATBOT_RESPONSE_CACHE_TTL', 3600),
+    name='responses'
+)
+RESPONSE_CACHE_NEGATIVE_TTL = getattr(settings, 'CHATBOT_RESPONSE_CACHE_NEGATIVE_TTL', 300)
+
+# How often a worker stats knowledge_base.json for updates written by another process
+KNOWLEDGE_BASE_RELOAD_CHECK_SECONDS = getattr(settings, 'CHATBOT_KB_RELOAD_CHECK_SECONDS', 10)
+
+# Minimum cosine score (and lead over the runner-up) before a prototype label beats the keyword rules
+INTENT_PROTOTYPE_THRESHOLD = getattr(settings, 'CHATBOT_INTENT_PROTOTYPE_THRESHOLD', 0.45)
+INTENT_PROTOTYPE_MIN_MARGIN = getattr(settings, 'CHATBOT_INTENT_PROTOTYPE_MIN_MARGIN', 0.02)
+
+# Hybrid retrieval - BM25 and dense candidates (multiples of top_k) fused by reciprocal rank
+BM25_K1 = getattr(settings, 'CHATBOT_BM25_K1', 1.5)
+BM25_B = getattr(settings, 'CHATBOT_BM25_B', 0.75)
+HYBRID_DENSE_CANDIDATES = getattr(settings, 'CHATBOT_HYBRID_DENSE_CANDIDATES', 2)
+HYBRID_SPARSE_CANDIDATES = getattr(settings, 'CHATBOT_HYBRID_SPARSE_CANDIDATES', 3)
+RRF_K = getattr(settings, 'CHATBOT_RRF_K', 60)
+
+# Maximal marginal relevance: 1.0 ranks purely by relevance, lower values favour diverse results
+MMR_LAMBDA = getattr(settings, 'CHATBOT_MMR_LAMBDA', 0.7)
+
+# Keyword tables - compiled together with the basic-response patterns into one matcher
+ABOUT_TRIGGERS = [
+    'about', 'tell me about', 'mission', 'vision', 
+    'goal', 'objective', 'purpose', 'aanr', 'knowledge hub', 
+    'km hub', 'who are', 'how does', 'background', 'overview'
+]
+
+HUB_SPECIFIC_TERMS = ['aanr', 'knowledge hub', 'km hub', 'knowledge management', 'system']
+
+CONTENT_TYPE_KEYWORDS = {
+    'faq': ['faq', 'faqs', 'question', 'answer', 'frequently', 'asked', 'questions'],  
+    'forum': ['forum', 'discussion', 'community', 'post'],
+    'resource': ['resource', 'document', 'publication', 'paper'],
+    'training': ['training', 'seminar', 'course', 'workshop'],
+    'event': ['event', 'conference', 'meeting'],
+    'cmi': ['cmi', 'office', 'location', 'contact'],
+    'news': ['news', 'announcement', 'update'],
+    'technology': ['technology', 'innovation', 'tool', 'equipment'],
+    'research': ['research', 'study', 'analysis', 'findings']
+}
+
+INTENT_KEYWORDS = {
+    'sample_request': ['sample', 'example', 'show me', 'give me', 'demonstrate'],
+    'location_query': ['where', 'location', 'address', 'contact', 'find office'],
+    'agriculture_query': ['farm', 'crop', 'plant', 'agriculture', 'cultivation', 'harvest'],
+    'aquaculture_query': ['fish', 'aquaculture', 'fisheries', 'aquatic', 'pond'],
+    'technical_query': ['how to', 'technical', 'procedure', 'method', 'process'],
+    'research_query': ['research', 'study', 'publication', 'paper', 'findings'],
+    'faq_query': ['faq', 'question', 'answer', 'frequently asked'],
+    'program_query': ['training', 'seminar', 'workshop', 'course', 'education'],
+}
+
 logger = logging.getLogger(__name__)
 
 def preprocess_text(text):
@@ -67,64 +153,76 @@ def preprocess_text(text):
     
     return ' '.join(filtered_words)
 
-def load_stopwords():
-    """Load custom stopwords from stopwords.txt file - cached globally"""
-    global _stopwords
-    if _stopwords is not None:
-        return _stopwords
-    
-    _stopwords = set()
-    
-    try:
-        stopwords_path = os.path.join(settings.BASE_DIR, 'utils', 'stopwords', 'stopwords.txt')
-        with open(stopwords_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                word = line.strip().lower()
-                if word and not word.startswith('//'):
-                    _stopwords.add(word)
-        print(f"✅ Loaded {len(_stopwords)} custom stopwords")
-    except FileNotFoundError:
-        print("⚠️ Custom stopwords file not found, using default English stopwords")
-        _stopwords = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
-    
-    return _stopwords
+def _load_sentence_transformer():
+    if not TRANSFORMERS_AVAILABLE:
+        return None
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
 
-def get_ai_models():
-    """Get AI models - loaded once globally and reused across all requests"""
-    global _ai_models, _model_loading_lock
-    
-    if _ai_models is not None:
-        return _ai_models
-    
+def _load_intent_classifier():
     if not TRANSFORMERS_AVAILABLE:
         return None
+    from transformers import pipeline
+    import torch
+    return pipeline(
+        "zero-shot-classification",
+        model="facebook/bart-large-mnli",
+        device=0 if torch.cuda.is_available() else -1
+    )
+
+def _load_spacy_model():
+    try:
+        import spacy
+    except ImportError:
+        print("⚠️ Warning: spaCy not installed. Using basic processing.")
+        return None
     
-    with _model_loading_lock:
-        if _ai_models is not None:
-            return _ai_models
-        
+    for model_name in ("en_core_web_md", "en_core_web_sm"):
         try:
-            print("🧠 Loading AI models (one-time initialization)...")
-            
-            _ai_models = {
-                'sentence_transformer': SentenceTransformer('all-MiniLM-L6-v2'),
-                'intent_classifier': pipeline(
-                    "zero-shot-classification",
-                    model="facebook/bart-large-mnli",
-                    device=0 if torch.cuda.is_available() else -1
-                )
-            }
-            
-            print("✅ AI models loaded successfully and cached!")
-            return _ai_models
-            
-        except Exception as e:
-            print(f"❌ Error loading AI models: {e}")
-            _ai_models = False
-            return None
+            nlp = spacy.load(model_name)
+            print(f"✅ Loaded spaCy model: {model_name}")
+            return nlp
+        except OSError:
+            continue
+    
+    print("⚠️ Warning: No spaCy model found. Using basic processing.")
+    return None
+
+# Models load on first use and are unloaded when idle or over the memory budget -
+# every gunicorn worker holds its own copy, so only what a worker uses stays resident
+_model_registry = ModelRegistry(
+    memory_budget_mb=getattr(settings, 'CHATBOT_MODEL_MEMORY_BUDGET_MB', None),
+    idle_timeout=getattr(settings, 'CHATBOT_MODEL_IDLE_UNLOAD_SECONDS', 1800),
+    sweep_interval=getattr(settings, 'CHATBOT_MODEL_SWEEP_INTERVAL', 60)
+)
+_model_registry.register(
+    'sentence_transformer', _load_sentence_transformer, estimated_mb=100,
+    pinned=getattr(settings, 'CHATBOT_PIN_SENTENCE_TRANSFORMER', True)
+)
+_model_registry.register('intent_classifier', _load_intent_classifier, estimated_mb=1650)
+_model_registry.register('spacy', _load_spacy_model, estimated_mb=120)
+
+def get_model_registry():
+    """Shared model registry for this worker process"""
+    return _model_registry
+
+def get_sentence_transformer():
+    """Sentence transformer used for semantic search - None when unavailable"""
+    return _model_registry.get('sentence_transformer')
+
+def get_intent_classifier():
+    """Zero-shot bart-large-mnli pipeline (~1.6 GB) - loaded only if a code path asks for it"""
+    return _model_registry.get('intent_classifier')
+
+def get_ai_models():
+    """Models needed for semantic search, or None when they can't be loaded"""
+    sentence_transformer = get_sentence_transformer()
+    if sentence_transformer is None:
+        return None
+    return {'sentence_transformer': sentence_transformer}
 
 def warmup_ai_models():
-    """Warm up AI models during application startup"""
+    """Load the search model and the embedding index - called by chatbot.warmup, never at import"""
     print("🔥 Warming up AI models...")
     try:
         # Trigger AI model loading
@@ -135,16 +233,6 @@ def warmup_ai_models():
     except Exception as e:
         print(f"⚠️ AI warmup failed: {e}")
 
-def background_ai_warmup():
-    """Load AI models in background"""
-    def warmup_thread():
-        try:
-            warmup_ai_models()
-        except Exception as e:
-            print(f"❌ Background AI warmup failed: {e}")
-    
-    threading.Thread(target=warmup_thread, daemon=True).start()
-
 def build_faiss_index(embeddings):
     """Build FAISS index for fast similarity search"""
     global _faiss_index, _faiss_embeddings
@@ -153,48 +241,308 @@ def build_faiss_index(embeddings):
         return None
     
     try:
+        import faiss
+        
         if not isinstance(embeddings, np.ndarray):
             embeddings = np.array(embeddings)
         
         embeddings = embeddings.astype('float32')
         dimension = embeddings.shape[1]
         
-        # Use IndexFlatIP for inner product (cosine similarity after normalization)
-        index = faiss.IndexFlatIP(dimension)
-        
-        # Normalize embeddings for cosine similarity
+        # Normalize embeddings so inner product is cosine similarity
         faiss.normalize_L2(embeddings)
-        index.add(embeddings)
+        
+        # Flat (exact) for small knowledge bases, IVF/HNSW per CHATBOT_FAISS_INDEX_MODE
+        index = make_faiss_index(embeddings, **get_faiss_index_options())
         
         _faiss_index = index
         _faiss_embeddings = embeddings
         
-        print(f"✅ Built FAISS index with {index.ntotal} vectors of dimension {dimension}")
+        print(f"✅ Built {describe_faiss_index(index)} FAISS index with {index.ntotal} vectors of dimension {dimension}")
         return index
         
     except Exception as e:
         print(f"❌ Error building FAISS index: {e}")
         return None
 
-def faiss_similarity_search(query_embedding, top_k=10):
-    """Perform similarity search using FAISS"""
-    if _faiss_index is None or query_embedding is None:
+class EmbeddingBatcher:
+    """
+    Micro-batches concurrent query encodes into one sentence-transformer call.
+
+    Callers enqueue a text and block on a future; a single worker thread waits
+    up to ``max_wait_ms`` for more requests (at most ``max_batch_size``), encodes
+    them together and hands each caller its own row.
+    """
+
+    def __init__(self, encode_fn, max_batch_size=32, max_wait_ms=5):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+        self._queue = None
+        self._worker = None
+        self._worker_pid = None
+        self._worker_lock = threading.Lock()
+        self.batches = 0
+        self.batched_queries = 0
+
+    def _ensure_worker(self):
+        """Start the worker thread lazily - and again in a forked child, where threads don't survive"""
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        
+        with self._worker_lock:
+            if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, args=(self._queue,), name='embedding-batcher', daemon=True)
+            self._worker.start()
+
+    def encode(self, text, timeout=30):
+        """Encode one text, sharing the model call with concurrent callers"""
+        if self.max_batch_size == 1:
+            return np.asarray(self.encode_fn([text]), dtype='float32')[0]
+        
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future.result(timeout=timeout)
+
+    def _run(self, request_queue):
+        while True:
+            batch = [request_queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        batch.append(request_queue.get_nowait())
+                    else:
+                        batch.append(request_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # Identical texts in one window are encoded once
+            unique_texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                embeddings = np.asarray(self.encode_fn(unique_texts), dtype='float32')
+                rows = dict(zip(unique_texts, embeddings))
+                for text, future in batch:
+                    future.set_result(rows[text])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            
+            self.batches += 1
+            self.batched_queries += len(batch)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'queries': self.batched_queries,
+            'avg_batch_size': round(self.batched_queries / self.batches, 2) if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+        }
+
+def _encode_texts(texts):
+    """Run the shared sentence transformer over a batch of texts"""
+    sentence_transformer = get_sentence_transformer()
+    if sentence_transformer is None:
+        raise RuntimeError("Sentence transformer is not loaded")
+    return sentence_transformer.encode(
+        texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False
+    )
+
+_embedding_batcher = EmbeddingBatcher(
+    _encode_texts,
+    max_batch_size=getattr(settings, 'CHATBOT_EMBEDDING_BATCH_MAX', 32),
+    max_wait_ms=getattr(settings, 'CHATBOT_EMBEDDING_BATCH_WAIT_MS', 5)
+)
+
+def normalize_query_key(query):
+    """Cache key for a query - the MiniLM tokenizer is uncased, so case and spacing don't matter"""
+    return ' '.join(query.lower().split())
+
+def encode_query(query):
+    """Encode a single query with the sentence transformer, memoized in a bounded LRU"""
+    key = normalize_query_key(query)
+    embedding = _query_embedding_cache.get(key)
+    if embedding is not None:
+        return embedding
+    
+    sidecar = get_sidecar_client()
+    if sidecar is not None:
+        try:
+            embedding = sidecar.encode([query])
+        except SidecarError as e:
+            print(f"⚠️ Sidecar encode failed: {e}")
+            return None
+    else:
+        if get_sentence_transformer() is None:
+            return None
+        embedding = _embedding_batcher.encode(query).reshape(1, -1)
+    
+    embedding.setflags(write=False)
+    _query_embedding_cache.set(key, embedding)
+    return embedding
+
+def get_query_embedding_cache_stats():
+    """Hit/miss counters of the query embedding cache and batching stats"""
+    stats = _query_embedding_cache.stats()
+    stats['batching'] = _embedding_batcher.stats()
+    return stats
+
+def get_intent_prototypes():
+    """Intent/content-type prototype classifier - built once from intent-prototypes.json"""
+    global _intent_prototypes
+    
+    if _intent_prototypes is not None:
+        return _intent_prototypes or None
+    
+    with _intent_prototypes_lock:
+        if _intent_prototypes is not None:
+            return _intent_prototypes or None
+        
+        sidecar = get_sidecar_client()
+        if sidecar is None and get_sentence_transformer() is None:
+            return None  # Retry once the encoder is available
+        
+        try:
+            _intent_prototypes = PrototypeClassifier(
+                load_prototype_examples(),
+                sidecar.encode if sidecar is not None else _encode_texts,
+                threshold=INTENT_PROTOTYPE_THRESHOLD,
+                min_margin=INTENT_PROTOTYPE_MIN_MARGIN
+            )
+            print(f"✅ Built {len(_intent_prototypes.labels)} intent/content-type prototypes")
+        except SidecarError as e:
+            print(f"⚠️ Sidecar not reachable yet, intent prototypes deferred: {e}")
+            return None
+        except Exception as e:
+            print(f"⚠️ Intent prototypes unavailable, using keyword rules: {e}")
+            _intent_prototypes = False
+    
+    return _intent_prototypes or None
+
+def classify_query_intent(query, context=None):
+    """{'intents': (label, score) | None, 'content_types': ...} - None when no encoder is available"""
+    prototypes = get_intent_prototypes()
+    if prototypes is None:
+        return None
+    
+    query_embedding = context.embedding(query) if context is not None else encode_query(query)
+    if query_embedding is None:
+        return None
+    
+    return prototypes.classify(query_embedding)
+
+def faiss_similarity_search(query_embedding, top_k=10, snapshot=None):
+    """Perform similarity search using FAISS - returns scores and knowledge base positions"""
+    snapshot = snapshot or _knowledge_base_cache or {}
+    faiss_index = snapshot.get('faiss_index', _faiss_index)
+    if faiss_index is None or query_embedding is None:
         return [], []
     
     try:
+        import faiss
+        
         if len(query_embedding.shape) == 1:
             query_embedding = query_embedding.reshape(1, -1)
         
-        query_embedding = query_embedding.astype('float32')
+        query_embedding = np.array(query_embedding, dtype='float32')
         faiss.normalize_L2(query_embedding)
         
-        scores, indices = _faiss_index.search(query_embedding, top_k)
-        return scores[0], indices[0]
+        scores, indices = faiss_index.search(query_embedding, top_k)
+        scores, indices = scores[0], indices[0]
+        
+        # After incremental updates the index holds stable vector ids, not positions
+        vector_positions = snapshot.get('vector_positions')
+        if vector_positions is not None:
+            valid = (indices >= 0) & (indices < len(vector_positions))
+            indices = np.where(valid, vector_positions[np.where(valid, indices, 0)], -1)
+        
+        return scores, indices
         
     except Exception as e:
         print(f"❌ Error in FAISS search: {e}")
         return [], []
 
+def get_sidecar_client():
+    """Client for the inference/search sidecar, or None in the default in-process mode"""
+    global _sidecar_client
+    
+    if _sidecar_disabled:
+        return None
+    
+    if _sidecar_client is None:
+        socket_path = getattr(settings, 'CHATBOT_SIDECAR_SOCKET', None)
+        if not socket_path:
+            return None
+        _sidecar_client = SidecarClient(socket_path, timeout=getattr(settings, 'CHATBOT_SIDECAR_TIMEOUT', 5.0))
+    
+    return _sidecar_client
+
+def disable_sidecar_client():
+    """Force in-process models and index - the sidecar process itself calls this"""
+    global _sidecar_disabled
+    _sidecar_disabled = True
+
+def get_knowledge_base_fingerprint(snapshot=None):
+    """CRC32 of the item ids in position order - both sides of the sidecar must agree on it"""
+    snapshot = snapshot or get_knowledge_base_cache()
+    fingerprint = snapshot.get('fingerprint')
+    if fingerprint is None:
+        item_ids = '\n'.join(str(item.get('id', '')) for item in snapshot['knowledge_data'])
+        fingerprint = zlib.crc32(item_ids.encode('utf-8'))
+        snapshot['fingerprint'] = fingerprint
+    return fingerprint
+
+def sidecar_similarity_search(query_embedding, top_k=10, snapshot=None):
+    """FAISS search in the sidecar - empty when it is unreachable or serves another knowledge base version"""
+    sidecar = get_sidecar_client()
+    if sidecar is None or query_embedding is None:
+        return [], []
+    
+    try:
+        scores, indices, fingerprint = sidecar.search(query_embedding, top_k)
+    except SidecarError as e:
+        print(f"⚠️ Sidecar search failed: {e}")
+        return [], []
+    
+    # Positions only mean something if both processes loaded the same knowledge base
+    if fingerprint != get_knowledge_base_fingerprint(snapshot):
+        print("⚠️ Sidecar knowledge base differs from this worker's - skipping semantic results")
+        return [], []
+    
+    return scores, indices
+
+def _get_search_executor():
+    """Small pool for the sparse half of hybrid search - recreated after fork"""
+    global _search_executor, _search_executor_pid
+    
+    if _search_executor is None or _search_executor_pid != os.getpid():
+        with _search_executor_lock:
+            if _search_executor is None or _search_executor_pid != os.getpid():
+                _search_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'CHATBOT_HYBRID_SEARCH_THREADS', 4),
+                    thread_name_prefix='bm25-search'
+                )
+                _search_executor_pid = os.getpid()
+    return _search_executor
+
+def submit_bm25_search(query, top_k=10, snapshot=None):
+    """Start a BM25 search in the background; the future yields (scores, positions)"""
+    snapshot = snapshot or get_knowledge_base_cache()
+    bm25_index = snapshot.get('bm25_index')
+    if bm25_index is None:
+        future = Future()
+        future.set_result((np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)))
+        return future
+    return _get_search_executor().submit(bm25_index.search, query, top_k)
+
 def get_knowledge_base_json_path():
     """Get path to the knowledge base JSON file"""
     return os.path.join(settings.BASE_DIR, 'chatbot', 'data', 'knowledge_base.json')
@@ -243,7 +591,7 @@ def load_knowledge_base_from_json():
 
 def get_knowledge_base_cache():
     """Get knowledge base cache - OPTIMIZED for speed"""
-    global _knowledge_base_cache, _knowledge_base_last_updated
+    global _knowledge_base_cache, _knowledge_base_last_updated, _knowledge_base_version
     
     # Reduced cache duration for testing - increase to 6 hours in production
     cache_duration = timedelta(hours=6)
@@ -251,7 +599,8 @@ def get_knowledge_base_cache():
     
     if (_knowledge_base_cache is not None and 
         _knowledge_base_last_updated is not None and
-        current_time - _knowledge_base_last_updated < cache_duration):
+        current_time - _knowledge_base_last_updated < cache_duration and
+        not knowledge_base_json_changed()):
         # print("🚀 Using cached knowledge base")  # Remove logging for speed
         return _knowledge_base_cache
     
@@ -266,31 +615,136 @@ def get_knowledge_base_cache():
             'knowledge_data': [],
             'document_texts': [],
             'knowledge_vectors': None,
+            'tfidf_vectorizer': None,
             'knowledge_embeddings': None,
-            'faiss_index': None
+            'faiss_index': None,
+            'bm25_index': None,
+            'knowledge_index': KnowledgeIndex([])
         }
     
     _knowledge_base_cache = {
         'knowledge_data': knowledge_data,
         'document_texts': document_texts,
         'knowledge_vectors': None,
+        'tfidf_vectorizer': None,
         'knowledge_embeddings': None,
-        'faiss_index': None
+        'faiss_index': None,
+        'bm25_index': None,
+        'knowledge_index': KnowledgeIndex(knowledge_data, load_stopwords())
     }
     _knowledge_base_last_updated = current_time
     
-    # Create TF-IDF vectors for fallback - ONLY IF NEEDED
+    # New snapshot - responses generated from the previous one are stale
+    _knowledge_base_version += 1
+    _response_cache.clear()
+    
+    manifest = (_json_knowledge_cache or {}).get('metadata', {}).get('artifacts', {})
+    
+    # TF-IDF model for the fallback - persisted by build_knowledge_base, fitted here only if missing
     if document_texts:
         try:
-            vectorizer = get_vectorizer()
-            _knowledge_base_cache['knowledge_vectors'] = vectorizer.fit_transform(document_texts)
-            print(f"✅ Created TF-IDF vectors for {len(document_texts)} documents")
+            vectorizer, knowledge_vectors = load_tfidf_artifacts(
+                get_knowledge_base_json_path(), document_texts, manifest, load_stopwords()
+            )
+            if vectorizer is not None:
+                print(f"✅ Loaded persisted TF-IDF matrix for {len(document_texts)} documents")
+            else:
+                vectorizer = get_vectorizer()
+                knowledge_vectors = vectorizer.fit_transform(document_texts).tocsr()
+                print(f"✅ Created TF-IDF vectors for {len(document_texts)} documents")
+            _knowledge_base_cache['tfidf_vectorizer'] = vectorizer
+            _knowledge_base_cache['knowledge_vectors'] = knowledge_vectors
         except Exception as e:
             print(f"⚠️ Could not create TF-IDF vectors: {e}")
     
+    # BM25 term counts for hybrid retrieval - weights are derived from the counts in one pass
+    if document_texts:
+        try:
+            counts, vocabulary = load_bm25_artifacts(get_knowledge_base_json_path(), document_texts, manifest)
+            if counts is not None:
+                bm25_index = BM25Index(counts, vocabulary, load_stopwords(), k1=BM25_K1, b=BM25_B)
+                print(f"✅ Loaded persisted BM25 counts ({len(vocabulary)} terms)")
+            else:
+                bm25_index = BM25Index.build(document_texts, load_stopwords(), k1=BM25_K1, b=BM25_B)
+                print(f"✅ Built BM25 index for {len(document_texts)} documents")
+            _knowledge_base_cache['bm25_index'] = bm25_index
+        except Exception as e:
+            print(f"⚠️ Could not build BM25 index: {e}")
+    
     print(f"🎉 Knowledge base cached with {len(knowledge_data)} items")
     return _knowledge_base_cache
 
+def knowledge_base_json_changed():
+    """True when another process rewrote knowledge_base.json since we loaded it - checked at most every few seconds"""
+    global _knowledge_base_checked_at
+    
+    now = time.monotonic()
+    if _json_last_loaded is None or now - _knowledge_base_checked_at < KNOWLEDGE_BASE_RELOAD_CHECK_SECONDS:
+        return False
+    _knowledge_base_checked_at = now
+    
+    # Rows saved from manage.py shell or commands are refreshed by the first worker to look
+    try:
+        claim_pending_refreshes()
+    except Exception as e:
+        print(f"⚠️ Could not claim pending knowledge base refreshes: {e}")
+    
+    try:
+        changed = os.path.getmtime(get_knowledge_base_json_path()) > _json_last_loaded
+    except OSError:
+        return False
+    
+    if changed:
+        print("🔄 knowledge_base.json changed on disk - reloading snapshot")
+    return changed
+
+def knowledge_base_json_stale():
+    """True when knowledge_base.json on disk is newer than the one this process loaded or wrote - not throttled"""
+    try:
+        return _json_last_loaded is None or os.path.getmtime(get_knowledge_base_json_path()) > _json_last_loaded
+    except OSError:
+        return False
+
+def reload_knowledge_base_cache():
+    """Rebuild the snapshot from knowledge_base.json now instead of at the next reload check"""
+    global _knowledge_base_last_updated
+    
+    _knowledge_base_last_updated = None
+    return get_knowledge_base_cache()
+
+def install_knowledge_base_snapshot(snapshot):
+    """
+    Swap in a patched knowledge base snapshot (see incremental.py).
+    
+    Requests already holding the previous snapshot keep using it; cached
+    responses built from it are dropped.
+    """
+    global _knowledge_base_cache, _knowledge_base_last_updated, _knowledge_base_version
+    global _faiss_index, _faiss_embeddings
+    
+    snapshot.pop('fingerprint', None)  # Positions changed - recomputed on demand
+    _knowledge_base_cache = snapshot
+    _faiss_index = snapshot.get('faiss_index')
+    _faiss_embeddings = snapshot.get('knowledge_embeddings')
+    _knowledge_base_last_updated = datetime.now()
+    _knowledge_base_version += 1
+    _response_cache.clear()
+
+def get_knowledge_base_metadata():
+    """Metadata block of the loaded knowledge_base.json"""
+    return (_json_knowledge_cache or {}).get('metadata', {})
+
+def remember_knowledge_base_json(json_data, modified_time):
+    """Record a knowledge_base.json this process wrote itself so it is not reloaded"""
+    global _json_knowledge_cache, _json_last_loaded
+    
+    _json_knowledge_cache = {
+        'knowledge_data': json_data['knowledge_data'],
+        'document_texts': json_data['document_texts'],
+        'metadata': json_data.get('metadata', {})
+    }
+    _json_last_loaded = modified_time
+
 def get_or_create_ai_cache():
     """Lazily create AI embeddings and FAISS index only when needed"""
     global _knowledge_base_cache
@@ -304,12 +758,17 @@ def get_or_create_ai_cache():
         return _knowledge_base_cache
     
     document_texts = _knowledge_base_cache.get('document_texts', [])
-    ai_models = get_ai_models()
     
-    if ai_models and document_texts:
+    # Prefer the artifacts written by build_knowledge_base - memory-mapped, no encoding
+    if document_texts and load_persisted_ai_cache(document_texts):
+        return _knowledge_base_cache
+    
+    sentence_transformer = get_sentence_transformer() if document_texts else None
+    
+    if sentence_transformer is not None:
         try:
             print("🧠 Creating AI embeddings (lazy loading)...")
-            embeddings = ai_models['sentence_transformer'].encode(document_texts, show_progress_bar=True)
+            embeddings = sentence_transformer.encode(document_texts, show_progress_bar=True)
             _knowledge_base_cache['knowledge_embeddings'] = embeddings
             
             # Build FAISS index
@@ -322,26 +781,45 @@ def get_or_create_ai_cache():
     
     return _knowledge_base_cache
 
-def get_nlp_model():
-    """Get spaCy model - loaded once globally and reused"""
-    global _nlp_model
+def load_persisted_ai_cache(document_texts):
+    """Attach memory-mapped embeddings and FAISS index built by build_knowledge_base"""
+    global _faiss_index, _faiss_embeddings
     
-    if _nlp_model is not None:
-        return _nlp_model if _nlp_model is not False else None
+    manifest = {}
+    if _json_knowledge_cache:
+        manifest = _json_knowledge_cache.get('metadata', {}).get('artifacts', {})
     
     try:
-        _nlp_model = spacy.load("en_core_web_md")
-        print("✅ Loaded spaCy model: en_core_web_md")
-        return _nlp_model
-    except OSError:
-        try:
-            _nlp_model = spacy.load("en_core_web_sm")
-            print("✅ Loaded spaCy model: en_core_web_sm")
-            return _nlp_model
-        except OSError:
-            print("⚠️ Warning: No spaCy model found. Using basic processing.")
-            _nlp_model = False
-            return None
+        embeddings, faiss_index = load_embedding_artifacts(
+            get_knowledge_base_json_path(), document_texts, manifest
+        )
+    except Exception as e:
+        print(f"⚠️ Could not load persisted embeddings: {e}")
+        return False
+    
+    if embeddings is None:
+        return False
+    
+    if faiss_index is None:
+        # Artifacts without a serialized index (FAISS missing at build time)
+        faiss_index = build_faiss_index(np.array(embeddings))
+        if faiss_index is None:
+            return False
+    
+    options = get_faiss_index_options()
+    configure_faiss_search(faiss_index, nprobe=options['nprobe'], ef_search=options['ef_search'])
+    
+    _faiss_index = faiss_index
+    _faiss_embeddings = embeddings
+    _knowledge_base_cache['knowledge_embeddings'] = embeddings
+    _knowledge_base_cache['faiss_index'] = faiss_index
+    
+    print(f"✅ Memory-mapped embeddings and {describe_faiss_index(faiss_index)} FAISS index for {len(document_texts)} documents")
+    return True
+
+def get_nlp_model():
+    """Get spaCy model - loaded on first use through the model registry"""
+    return _model_registry.get('spacy')
 
 def get_vectorizer():
     """Get TF-IDF vectorizer - initialized once and reused"""
@@ -350,15 +828,7 @@ def get_vectorizer():
     if _vectorizer is not None:
         return _vectorizer
     
-    stopwords = load_stopwords()
-    _vectorizer = TfidfVectorizer(
-        max_features=10000,
-        stop_words=list(stopwords),
-        ngram_range=(1, 3),
-        min_df=1,
-        max_df=0.8,
-        sublinear_tf=True
-    )
+    _vectorizer = make_tfidf_vectorizer(load_stopwords())
     
     return _vectorizer
 
@@ -398,126 +868,195 @@ def load_basic_responses():
         }
         return _basic_responses
 
+def get_query_matcher():
+    """Aho-Corasick matcher over the basic-response patterns and keyword tables - built once"""
+    global _query_matcher
+    if _query_matcher is not None:
+        return _query_matcher
+
+    entries = []
+    for category_name, category_data in load_basic_responses().items():
+        for response_type, response_data in category_data.items():
+            if not response_data.get('responses'):
+                continue
+            for pattern in response_data.get('patterns', []):
+                entries.append(('basic_response', (category_name, response_type), pattern))
+
+    entries.extend(('about_trigger', trigger, trigger) for trigger in ABOUT_TRIGGERS)
+    entries.extend(('hub_term', term, term) for term in HUB_SPECIFIC_TERMS)
+    for content_type, keywords in CONTENT_TYPE_KEYWORDS.items():
+        entries.extend(('content_type', content_type, keyword) for keyword in keywords)
+    for intent, keywords in INTENT_KEYWORDS.items():
+        entries.extend(('intent', intent, keyword) for keyword in keywords)
+
+    _query_matcher = PatternMatcher(entries)
+    print(f"✅ Compiled query matcher with {len(_query_matcher)} patterns")
+    return _query_matcher
+
 class IntelligentChatbotService:
     """Optimized chatbot service with lazy-loaded FAISS for ultra-fast startup"""
 
     def __init__(self):
         self.stopwords = load_stopwords()
         self.basic_responses = load_basic_responses()
+        self.query_matcher = get_query_matcher()
         
-        # Get models but don't force AI model loading
-        self.ai_models = None  # Load lazily
-        self.nlp = None        # Load lazily
+        # Models live in the registry so idle ones can be unloaded - don't hold references here
         self.vectorizer = get_vectorizer()
         
-        # Conversation cache for this session
-        self._conversation_cache = {}
-        
         print("✅ ChatbotService initialized with lazy loading")
 
     def _get_ai_models(self):
         """Lazy load AI models only when needed"""
-        if self.ai_models is None:
-            self.ai_models = get_ai_models()
-        return self.ai_models
+        return get_ai_models()
 
     def _get_nlp_model(self):
         """Lazy load NLP model only when needed"""
-        if self.nlp is None:
-            self.nlp = get_nlp_model()
-        return self.nlp
+        return get_nlp_model()
 
-    def _get_knowledge_data(self):
+    def _get_knowledge_data(self, snapshot=None):
         """Get knowledge data from cache - FAST"""
-        cache = get_knowledge_base_cache()
+        cache = snapshot or get_knowledge_base_cache()
         return (cache['knowledge_data'], cache['document_texts'], 
                 cache['knowledge_vectors'], cache.get('knowledge_embeddings'))
 
     def _enhanced_semantic_search_with_faiss(self, query, intent_info, top_k=5):
         """Enhanced semantic search with dynamic topic handling"""
-        knowledge_data, document_texts, knowledge_vectors, knowledge_embeddings = self._get_knowledge_data()
+        # Every position below indexes this request's snapshot, even if a newer one is swapped in meanwhile
+        context = QueryContext.of(query)
+        snapshot = context.snapshot
+        knowledge_data, document_texts, knowledge_vectors, knowledge_embeddings = self._get_knowledge_data(snapshot)
         
         if not knowledge_data:
             return []
         
-        corrected_query = self.process_query_with_correction(query)
+        corrected_query = context.corrected
         
-        specific_results = self._find_specific_matches(corrected_query, knowledge_data)
+        specific_results = self._find_specific_matches(corrected_query, knowledge_data, snapshot=snapshot)
         if specific_results:
             print(f"✅ Found {len(specific_results)} specific matches")
             return specific_results[:top_k]
         
-        ai_models = self._get_ai_models()
+        # With a sidecar configured the models and FAISS index live in that process
+        use_sidecar = get_sidecar_client() is not None
         
-        if not ai_models or not FAISS_AVAILABLE:
-            return self._cosine_similarity_fallback(corrected_query, intent_info, top_k, knowledge_data, document_texts)
+        if not use_sidecar and (not self._get_ai_models() or not FAISS_AVAILABLE):
+            return self._cosine_similarity_fallback(context, intent_info, top_k, knowledge_data, document_texts, snapshot=snapshot)
         
         try:
             enhanced_query = self._enhance_query_for_search(corrected_query, intent_info)
             
-            if knowledge_embeddings is None:
-                ai_cache = get_or_create_ai_cache()
-                knowledge_embeddings = ai_cache.get('knowledge_embeddings')
+            if knowledge_embeddings is None and not use_sidecar:
+                # Attaches the embeddings to the live snapshot - unusable if that is no longer ours
+                if get_or_create_ai_cache() is snapshot:
+                    knowledge_embeddings = snapshot.get('knowledge_embeddings')
             
-            if knowledge_embeddings is None:
-                return self._cosine_similarity_fallback(corrected_query, intent_info, top_k, knowledge_data, document_texts)
+            if knowledge_embeddings is None and not use_sidecar:
+                return self._cosine_similarity_fallback(context, intent_info, top_k, knowledge_data, document_texts, snapshot=snapshot)
             
-            query_embedding = ai_models['sentence_transformer'].encode([enhanced_query])
-            scores, indices = faiss_similarity_search(query_embedding, top_k * 3)
+            # Exact-term BM25 runs on the corrected query while the dense side encodes and searches
+            bm25_future = submit_bm25_search(corrected_query, top_k * HYBRID_SPARSE_CANDIDATES, snapshot=snapshot)
             
-            if len(scores) == 0:
-                return self._cosine_similarity_fallback(corrected_query, intent_info, top_k, knowledge_data, document_texts)
+            query_embedding = context.embedding(enhanced_query)
+            if query_embedding is None:
+                return self._cosine_similarity_fallback(context, intent_info, top_k, knowledge_data, document_texts, snapshot=snapshot)
             
-            results = []
+            dense_k = top_k * HYBRID_DENSE_CANDIDATES
+            if use_sidecar:
+                scores, indices = sidecar_similarity_search(query_embedding, dense_k, snapshot=snapshot)
+            else:
+                scores, indices = faiss_similarity_search(query_embedding, dense_k, snapshot=snapshot)
+            bm25_scores, bm25_indices = bm25_future.result()
             
-            for score, idx in zip(scores, indices):
-                if idx < len(knowledge_data) and score > 0.2:
-                    item = knowledge_data[idx]
-                    
-                    enhanced_score = self._calculate_enhanced_score(corrected_query, item, float(score), intent_info)
-                    results.append({
-                        'resource': item,
-                        'similarity_score': enhanced_score,
-                        'faiss_score': float(score),
-                        'confidence': self._get_confidence_level(enhanced_score)
-                    })
+            if len(scores) == 0 and len(bm25_indices) == 0:
+                return self._cosine_similarity_fallback(context, intent_info, top_k, knowledge_data, document_texts, snapshot=snapshot)
             
-            results.sort(key=lambda x: x['similarity_score'], reverse=True)
-            filtered_results = self._apply_diversity_filter(results, top_k)
+            fused_scores, fused_positions = reciprocal_rank_fusion([indices, bm25_indices], k=RRF_K)
+            in_range = fused_positions < len(knowledge_data)
+            fused_scores, fused_positions = fused_scores[in_range], fused_positions[in_range]
             
-            print(f"🔍 Found {len(results)} AI-powered results for query: '{query}'")
+            dense_scores = dict(zip(np.asarray(indices).tolist(), np.asarray(scores).tolist()))
+            bm25_by_position = dict(zip(bm25_indices.tolist(), bm25_scores.tolist()))
+            dense_scores.update(self._dense_scores_for(
+                [position for position in fused_positions.tolist() if position not in dense_scores],
+                query_embedding, knowledge_embeddings
+            ))
+            
+            # BM25-only hits without a local embedding start at the dense relevance threshold
+            base_scores = np.array([dense_scores.get(idx, 0.2) for idx in fused_positions.tolist()], dtype=np.float32)
+            keep = np.fromiter((idx in bm25_by_position for idx in fused_positions.tolist()), dtype=bool, count=len(fused_positions))
+            keep |= base_scores > 0.2
+            fused_scores, fused_positions, base_scores = fused_scores[keep], fused_positions[keep], base_scores[keep]
+            
+            enhanced_scores = self._calculate_enhanced_scores(
+                context.tokens, fused_positions, base_scores, intent_info, snapshot=snapshot
+            )
+            
+            # Results stay in RRF order, which is also the MMR relevance; the enhanced score feeds confidence levels
+            results = []
+            for idx, fused_score, base_score, enhanced_score in zip(
+                fused_positions.tolist(), fused_scores.tolist(), base_scores.tolist(), enhanced_scores.tolist()
+            ):
+                results.append({
+                    'resource': knowledge_data[idx],
+                    'kb_position': idx,
+                    'similarity_score': enhanced_score,
+                    'faiss_score': base_score,
+                    'bm25_score': float(bm25_by_position.get(idx, 0.0)),
+                    'rrf_score': fused_score,
+                    'confidence': self._get_confidence_level(enhanced_score)
+                })
+            
+            filtered_results = self._apply_diversity_filter(results, top_k, knowledge_embeddings, snapshot=snapshot)
+            
+            print(f"🔍 Found {len(results)} AI-powered results for query: '{context.original}'")
             return filtered_results[:top_k]
             
         except Exception as e:
             print(f"Enhanced semantic search error: {e}")
-            return self._cosine_similarity_fallback(corrected_query, intent_info, top_k, knowledge_data, document_texts)
+            return self._cosine_similarity_fallback(context, intent_info, top_k, knowledge_data, document_texts, snapshot=snapshot)
+
+    def _dense_scores_for(self, positions, query_embedding, knowledge_embeddings):
+        """Cosine similarity of the query to a few knowledge items - {position: score}"""
+        if not positions or knowledge_embeddings is None or query_embedding is None:
+            return {}
+        
+        candidates = np.asarray(knowledge_embeddings[np.asarray(positions)], dtype='float32')
+        query_vector = np.asarray(query_embedding, dtype='float32').reshape(-1)
+        norms = np.linalg.norm(candidates, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+        norms[norms == 0] = 1.0
+        return dict(zip(positions, (candidates @ query_vector / norms).tolist()))
 
-    def _find_specific_matches(self, query, knowledge_data):
+    def _find_specific_matches(self, query, knowledge_data, snapshot=None):
         """Find specific/exact matches in knowledge base"""
+        knowledge_index = (snapshot or get_knowledge_base_cache())['knowledge_index']
         query_lower = query.lower()
+        query_words = set(query_lower.split())
+        long_query_words = [word for word in query_words if len(word) > 3]
         specific_matches = []
         
-        for idx, item in enumerate(knowledge_data):
+        # Only items sharing a title word or a substring relation with the query can reach the threshold
+        for idx in sorted(knowledge_index.title_candidates(query_lower)):
+            item = knowledge_data[idx]
             score = 0
-            
 
-            title_lower = item['title'].lower()
+            title_lower = knowledge_index.titles_lower[idx]
             if query_lower in title_lower or title_lower in query_lower:
                 score += 10
             
-            query_words = set(query_lower.split())
             title_words = set(title_lower.split())
             word_overlap = query_words.intersection(title_words)
             if word_overlap:
                 score += len(word_overlap) * 2
 
-            desc_lower = item['description'].lower()
-            if any(word in desc_lower for word in query_words if len(word) > 3):
+            desc_lower = knowledge_index.descriptions_lower[idx]
+            if any(word in desc_lower for word in long_query_words):
                 score += 1
             
             if score >= 5:
                 specific_matches.append({
                     'resource': item,
+                    'kb_position': idx,
                     'similarity_score': min(score / 15.0, 1.0),
                     'confidence': 'high',
                     'match_type': 'specific'
@@ -526,32 +1065,37 @@ class IntelligentChatbotService:
         specific_matches.sort(key=lambda x: x['similarity_score'], reverse=True)
         return specific_matches
 
-    def _cosine_similarity_fallback(self, query, intent_info, top_k, knowledge_data, document_texts):
-        """FAST fallback method using cosine similarity"""
+    def _cosine_similarity_fallback(self, query, intent_info, top_k, knowledge_data, document_texts, snapshot=None):
+        """FAST fallback method using the precomputed TF-IDF document-term matrix"""
         if not document_texts:
             return []
         
         try:
-            if not hasattr(self, '_spell_corrected'):
-                query = self.process_query_with_correction(query)
+            query = QueryContext.of(query).corrected
 
-            vectorizer = get_vectorizer()
-
-            if not hasattr(vectorizer, 'vocabulary_'):
-                vectorizer.fit(document_texts)
+            cache = snapshot or get_knowledge_base_cache()
+            vectorizer = cache.get('tfidf_vectorizer')
+            knowledge_vectors = cache.get('knowledge_vectors')
             
-            query_vector = vectorizer.transform([query])
-            document_vectors = vectorizer.transform(document_texts)
+            if vectorizer is None or knowledge_vectors is None:
+                return []
             
-            similarities = cosine_similarity(query_vector, document_vectors).flatten()
+            # Rows are L2-normalized, so one sparse mat-vec gives cosine similarities
+            query_vector = vectorizer.transform([query])
+            similarities = np.asarray((knowledge_vectors @ query_vector.T).todense()).ravel()
             
-            top_indices = similarities.argsort()[-top_k:][::-1]
+            k = min(top_k, similarities.shape[0])
+            if k <= 0:
+                return []
+            top_indices = np.argpartition(-similarities, k - 1)[:k]
+            top_indices = top_indices[np.argsort(-similarities[top_indices])]
             
             results = []
             for idx in top_indices:
                 if similarities[idx] > 0.1: 
                     results.append({
                         'resource': knowledge_data[idx],
+                        'kb_position': int(idx),
                         'similarity_score': float(similarities[idx]),
                         'cosine_score': float(similarities[idx]),
                         'confidence': self._get_confidence_level(float(similarities[idx]))
@@ -591,58 +1135,108 @@ class IntelligentChatbotService:
         
         return ' '.join(enhanced_parts)
 
-    def _calculate_enhanced_score(self, query, item, faiss_score, intent_info):
-        """FAST enhanced scoring with multiple factors"""
-        base_score = faiss_score
+    def _calculate_enhanced_scores(self, query_tokens, positions, base_scores, intent_info, snapshot=None):
+        """Rescore a batch of candidates: base score plus title/description overlap, type and topic bonuses"""
+        knowledge_index = (snapshot or get_knowledge_base_cache())['knowledge_index']
+        positions = np.asarray(positions, dtype=np.int64)
+        scores = np.array(base_scores, dtype=np.float32)
+        if not len(positions):
+            return scores
         
-
-        title_score = self._fast_text_relevance(query, item['title']) * 0.4
-        desc_score = self._fast_text_relevance(query, item['description']) * 0.2
+        # Share of the query's tokens found in each title (0.4) and description (0.2)
+        query_columns = knowledge_index.query_columns(query_tokens)
+        if query_columns:
+            scores += knowledge_index.title_incidence.overlap(query_columns, positions) * (0.4 / len(query_tokens))
+            scores += knowledge_index.description_incidence.overlap(query_columns, positions) * (0.2 / len(query_tokens))
         
-        type_score = 0
         content_type = intent_info.get('content_type', 'general')
-        if content_type != 'general' and item.get('type') == content_type:
-            type_score = 0.1
+        if content_type != 'general':
+            scores += knowledge_index.type_matches(content_type, positions) * 0.1
         
-        topic_score = 0
         main_topic = intent_info.get('main_topic')
-        if main_topic and main_topic.lower() in item['title'].lower():
-            topic_score = 0.2
+        if main_topic:
+            scores += knowledge_index.topic_matches(main_topic, positions.tolist()) * 0.2
         
-        enhanced_score = base_score + title_score + desc_score + type_score + topic_score
-        return min(enhanced_score, 1.0)
+        return np.minimum(scores, 1.0)
 
-    def _fast_text_relevance(self, query, text):
-        """FAST text relevance using word overlap only"""
-        if not text:
-            return 0
-        
-        query_words = set(preprocess_text(query).split()) - self.stopwords
-        text_words = set(preprocess_text(text).split()) - self.stopwords
-        
-        if not query_words:
-            return 0
-        
-        overlap = len(query_words.intersection(text_words))
-        return overlap / len(query_words)
+    def _result_title_tokens(self, result, knowledge_index):
+        """Precomputed title tokens for a search result, tokenizing only items outside the index"""
+        position = result.get('kb_position')
+        if position is not None and position < len(knowledge_index):
+            return knowledge_index.title_tokens[position]
+        return knowledge_index.tokenize(result['resource']['title'])
 
-    def _apply_diversity_filter(self, results, target_count):
-        """FAST diversity filter"""
+    def _apply_diversity_filter(self, results, target_count, knowledge_embeddings=None, snapshot=None):
+        """Pick target_count diverse results - MMR on embeddings, title overlap when none are loaded"""
         if len(results) <= target_count:
             return results
         
+        snapshot = snapshot or get_knowledge_base_cache()
+        if knowledge_embeddings is None:
+            knowledge_embeddings = snapshot.get('knowledge_embeddings')
+        
+        positions = [result.get('kb_position') for result in results]
+        if (knowledge_embeddings is not None and None not in positions
+                and max(positions) < len(knowledge_embeddings)):
+            return self._select_mmr(results, target_count, knowledge_embeddings, positions)
+        
+        return self._title_diversity_filter(results, target_count, snapshot['knowledge_index'])
+
+    def _select_mmr(self, results, target_count, knowledge_embeddings, positions):
+        """Maximal marginal relevance over the candidates' normalized embeddings - one k x k product"""
+        candidates = np.asarray(knowledge_embeddings[np.asarray(positions)], dtype='float32')
+        norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        candidates /= norms
+        redundancy = candidates @ candidates.T
+        
+        relevance = self._mmr_relevance(results)
+        selected = [int(np.argmax(relevance))]
+        max_redundancy = redundancy[selected[0]].copy()
+        available = np.ones(len(results), dtype=bool)
+        available[selected[0]] = False
+        
+        while len(selected) < target_count:
+            mmr_scores = MMR_LAMBDA * relevance - (1.0 - MMR_LAMBDA) * max_redundancy
+            mmr_scores[~available] = -np.inf
+            chosen = int(np.argmax(mmr_scores))
+            selected.append(chosen)
+            available[chosen] = False
+            np.maximum(max_redundancy, redundancy[chosen], out=max_redundancy)
+        
+        return [results[index] for index in selected]
+
+    def _mmr_relevance(self, results):
+        """
+        Fused (RRF) score rescaled to the candidates' similarity range, so exact-term
+        BM25 hits keep their rank; the similarity score when results were not fused
+        """
+        similarity = np.array([result['similarity_score'] for result in results], dtype=np.float32)
+        if not all('rrf_score' in result for result in results):
+            return similarity
+        
+        fused = np.array([result['rrf_score'] for result in results], dtype=np.float32)
+        low, high = float(similarity.min()), float(similarity.max())
+        if high - low < 1e-6:
+            low, high = 0.0, 1.0
+        span = float(fused.max() - fused.min())
+        if span < 1e-12:
+            return np.full(len(results), high, dtype=np.float32)
+        return low + (fused - fused.min()) / span * (high - low)
+
+    def _title_diversity_filter(self, results, target_count, knowledge_index):
+        """FAST diversity filter on title word overlap"""
         filtered = [results[0]]
+        filtered_title_words = [self._result_title_tokens(results[0], knowledge_index)]
         
         for result in results[1:]:
             is_diverse = True
-            for selected in filtered:
+            title1_words = self._result_title_tokens(result, knowledge_index)
+            for title2_words in filtered_title_words:
                 # FAST similarity check - just title words
-                title1_words = set(preprocess_text(result['resource']['title']).split())
-                title2_words = set(preprocess_text(selected['resource']['title']).split())
-                
                 if title1_words and title2_words:
-                    intersection = len(title1_words.intersection(title2_words))
-                    union = len(title1_words.union(title2_words))
+                    intersection = len(title1_words & title2_words)
+                    union = len(title1_words | title2_words)
                     similarity = intersection / union if union > 0 else 0
                     
                     if similarity > 0.7:  # More lenient threshold for speed
@@ -651,6 +1245,7 @@ class IntelligentChatbotService:
             
             if is_diverse:
                 filtered.append(result)
+                filtered_title_words.append(title1_words)
                 if len(filtered) >= target_count:
                     break
         
@@ -701,51 +1296,46 @@ class IntelligentChatbotService:
 
     def _classify_user_intent(self, query):
         """FAST intent classification with caching"""
-        basic_intent = self._check_basic_response(query)
+        context = QueryContext.of(query)
+        basic_intent = self._check_basic_response(context.lower)
         if basic_intent:
             basic_intent['skip_ai'] = True  # Flag to skip AI processing
             return basic_intent
         
         # Use basic classification by default for speed
-        return self._classify_intent_basic(query)
+        return self._classify_intent_basic(context)
 
     def _check_basic_response(self, query):
         """Check if query matches basic response patterns"""
-        query_lower = query.lower()
-        
-        for category_name, category_data in self.basic_responses.items():
-            for response_type, response_data in category_data.items():
-                patterns = response_data.get('patterns', [])
-                for pattern in patterns:
-                    if pattern.lower() in query_lower:
-                        responses = response_data.get('responses', [])
-                        if responses:
-                            return {
-                                'intent': 'basic_response',
-                                'category': response_type,
-                                'category_name': category_name,
-                                'response': random.choice(responses),
-                                'confidence': 0.9,
-                                'is_basic': True
-                            }
+        matches = self.query_matcher.match(query).get('basic_response')
+        if not matches:
+            return None
         
-        return None
+        # Patterns are registered in file order, so the first match is the one the file lists first
+        (category_name, response_type), _ = matches[0]
+        responses = self.basic_responses[category_name][response_type]['responses']
+        return {
+            'intent': 'basic_response',
+            'category': response_type,
+            'category_name': category_name,
+            'response': random.choice(responses),
+            'confidence': 0.9,
+            'is_basic': True
+        }
 
     def _extract_main_topic(self, query):
         """Dynamic main topic extraction from knowledge base data"""
         if not query:
             return None
         
-        cache = get_knowledge_base_cache()
-        knowledge_data = cache['knowledge_data']
+        context = QueryContext.of(query)
+        knowledge_data = context.snapshot['knowledge_data']
+        knowledge_index = context.snapshot['knowledge_index']
         
         if not knowledge_data:
             return None
 
-        query_lower = query.lower()
-        corrected_query = correct_spelling_dynamic(query_lower)
-        
-        processed_query = preprocess_text(corrected_query)
+        processed_query = context.preprocessed
         print(f"🔍 Processed query after stopword removal: '{processed_query}'")
         
         # Look for compound terms first
@@ -755,24 +1345,17 @@ class IntelligentChatbotService:
                 for j in range(i+1, len(processed_words)+1):
                     phrase = ' '.join(processed_words[i:j])
                     
-                    for item in knowledge_data:
-                        title_lower = item['title'].lower()
-                        desc_lower = item['description'].lower()
-                        
-                        if phrase in title_lower or phrase in desc_lower:
-                            print(f"🎯 Found compound topic: '{phrase}' in '{item['title']}'")
-                            return phrase.upper()
+                    matches = knowledge_index.find_phrase(phrase)
+                    if matches:
+                        print(f"🎯 Found compound topic: '{phrase}' in '{knowledge_data[matches[0]]['title']}'")
+                        return phrase.upper()
         
         # Single word matching from processed words
         for word in processed_words:
-            # Direct match in knowledge base
-            for item in knowledge_data:
-                title_lower = item['title'].lower()
-                desc_lower = item['description'].lower()
-                
-                if word in title_lower or word in desc_lower:
-                    print(f"🎯 Found single topic: '{word}' in '{item['title']}'")
-                    return word.upper()
+            matches = knowledge_index.find_phrase(word)
+            if matches:
+                print(f"🎯 Found single topic: '{word}' in '{knowledge_data[matches[0]]['title']}'")
+                return word.upper()
         
         return None
 
@@ -798,32 +1381,34 @@ class IntelligentChatbotService:
         print(f"🔄 Extracted {len(topics)} dynamic topics from knowledge base")
         return topics
 
-    def _extract_content_type(self, query):
-        """Dynamic content type extraction - no hardcoded priorities"""
-        original_query_lower = query.lower()  
-        
-        content_types = {
-            'faq': ['faq', 'faqs', 'question', 'answer', 'frequently', 'asked', 'questions'],  
-            'forum': ['forum', 'discussion', 'community', 'post'],
-            'resource': ['resource', 'document', 'publication', 'paper'],
-            'training': ['training', 'seminar', 'course', 'workshop'],
-            'event': ['event', 'conference', 'meeting'],
-            'cmi': ['cmi', 'office', 'location', 'contact'],
-            'news': ['news', 'announcement', 'update'],
-            'technology': ['technology', 'innovation', 'tool', 'equipment'],
-            'research': ['research', 'study', 'analysis', 'findings']
-        }
+    def _extract_content_type(self, query, prediction=None):
+        """Content type from the embedding prototypes, then keyword rules"""
+        context = QueryContext.of(query)
+        original_query_lower = context.lower
+        
+        if prediction is None:
+            prediction = context.intent_prediction
+        
+        if prediction and prediction.get('content_types'):
+            content_type, score = prediction['content_types']
+            print(f"🎯 Content type predicted: '{content_type}' ({score:.2f}) from query: '{original_query_lower}'")
+            return content_type
         
         # Check ALL content types equally for exact matches
-        for content_type, keywords in content_types.items():
-            if any(keyword in original_query_lower for keyword in keywords):
-                print(f"🎯 Content type detected: '{content_type}' from query: '{original_query_lower}'")
-                return content_type
+        matches = self.query_matcher.match(original_query_lower).get('content_type')
+        if matches:
+            content_type = matches[0][0]
+            print(f"🎯 Content type detected: '{content_type}' from query: '{original_query_lower}'")
+            return content_type
+        
+        # The prototypes already cover paraphrases and typos - fuzzy matching is only needed without an encoder
+        if prediction is not None:
+            return 'general'
         
         # Fallback to fuzzy matching for ALL types equally
         all_keywords = []
         keyword_to_type = {}
-        for content_type, keywords in content_types.items():
+        for content_type, keywords in CONTENT_TYPE_KEYWORDS.items():
             for keyword in keywords:
                 all_keywords.append(keyword)
                 keyword_to_type[keyword] = content_type
@@ -838,33 +1423,35 @@ class IntelligentChatbotService:
         return 'general'
 
     def _classify_intent_basic(self, query):
-        """FAST basic intent classification using patterns"""
-        query_lower = query.lower()
+        """FAST intent classification - embedding prototypes first, keyword patterns as fallback"""
+        context = QueryContext.of(query)
+        query_lower = context.lower
         
-        main_topic = self._extract_main_topic(query)
-        content_type = self._extract_content_type(query)
-        
-        patterns = {
-            'sample_request': ['sample', 'example', 'show me', 'give me', 'demonstrate'],
-            'location_query': ['where', 'location', 'address', 'contact', 'find office'],
-            'agriculture_query': ['farm', 'crop', 'plant', 'agriculture', 'cultivation', 'harvest'],
-            'aquaculture_query': ['fish', 'aquaculture', 'fisheries', 'aquatic', 'pond'],
-            'technical_query': ['how to', 'technical', 'procedure', 'method', 'process'],
-            'research_query': ['research', 'study', 'publication', 'paper', 'findings'],
-            'faq_query': ['faq', 'question', 'answer', 'frequently asked'],
-            'program_query': ['training', 'seminar', 'workshop', 'course', 'education'],
-        }
+        prediction = context.intent_prediction
+        main_topic = self._extract_main_topic(context)
+        content_type = self._extract_content_type(context, prediction)
         
-        for intent, keywords in patterns.items():
-            if any(keyword in query_lower for keyword in keywords):
-                confidence = 0.8 if len([k for k in keywords if k in query_lower]) > 1 else 0.7
-                return {
-                    'intent': intent, 
-                    'confidence': confidence, 
-                    'main_topic': main_topic, 
-                    'content_type': content_type,
-                    'is_basic': False
-                }
+        if prediction and prediction.get('intents'):
+            intent, score = prediction['intents']
+            return {
+                'intent': intent, 
+                'confidence': round(score, 3), 
+                'main_topic': main_topic, 
+                'content_type': content_type,
+                'is_basic': False
+            }
+        
+        matches = self.query_matcher.match(query_lower).get('intent')
+        if matches:
+            intent = matches[0][0]
+            confidence = 0.8 if sum(1 for label, _ in matches if label == intent) > 1 else 0.7
+            return {
+                'intent': intent, 
+                'confidence': confidence, 
+                'main_topic': main_topic, 
+                'content_type': content_type,
+                'is_basic': False
+            }
         
         if main_topic:
             return {
@@ -888,24 +1475,19 @@ class IntelligentChatbotService:
         if not query:
             return query
         
-        # Apply spell correction
-        corrected_query = correct_spelling_dynamic(query)
-        
-        # Log corrections for debugging
-        if corrected_query != query:
-            print(f"🔧 Query corrected: '{query}' → '{corrected_query}'")
-        
-        return corrected_query
+        # Spell correction (and its log line) happens once per context
+        return QueryContext.of(query).corrected
 
     def find_similar_content(self, query, top_k=5):
         """Find similar content using FAISS-enhanced search (for views.py compatibility)"""
+        context = QueryContext(query)
         intent_info = {
             'intent': 'general_query',
-            'main_topic': self._extract_main_topic(query),
-            'content_type': self._extract_content_type(query)
+            'main_topic': self._extract_main_topic(context),
+            'content_type': self._extract_content_type(context)
         }
         
-        return self._enhanced_semantic_search_with_faiss(query, intent_info, top_k)
+        return self._enhanced_semantic_search_with_faiss(context, intent_info, top_k)
 
     def _generate_basic_response(self, intent_info):
         """Generate response from basic response patterns"""
@@ -957,197 +1539,160 @@ class IntelligentChatbotService:
         return suggestions[:3]
 
 
-    def _calculate_semantic_similarity(self, query, text):
-        """Calculate semantic similarity between query and text with fuzzy matching"""
-        if not query or not text:
-            return 0
-        
-        query_words = set(preprocess_text(query).split()) - self.stopwords
-        text_words = set(preprocess_text(text).split()) - self.stopwords
-        
-        if not query_words or not text_words:
-            return 0
-        
-        # Calculate Jaccard similarity
-        intersection = len(query_words.intersection(text_words))
-        union = len(query_words.union(text_words))
-        
-        jaccard_sim = intersection / union if union > 0 else 0
-        
-        # Add fuzzy matching for partial word matches
-        fuzzy_matches = 0
-        for q_word in query_words:
-            for t_word in text_words:
-                if fuzz.ratio(q_word, t_word) >= 80:
-                    fuzzy_matches += 1
-                    break
-        
-        fuzzy_sim = fuzzy_matches / len(query_words) if query_words else 0
-        
-        # Combine both similarities
-        return (jaccard_sim + fuzzy_sim) / 2
-    
     def _handle_about_query(self, query, intent_info):
         """Handle ANY about queries with focused responses"""
-        query_lower = query.lower()
+        context = QueryContext.of(query)
+        corrected_query = context.lower
         
-        corrected_query = correct_spelling_dynamic(query_lower)
-        print(f"🔧 About query correction: '{query_lower}' → '{corrected_query}'")
+        knowledge_index = context.snapshot['knowledge_index']
+        about_index = knowledge_index.about_index
+
+        if not about_index:
+            return []
+
+        fuzzy_matched_keywords = fuzzy_match_keywords(corrected_query, ABOUT_KEYWORDS, threshold=75)
+        print(f"🎯 Fuzzy matched keywords: {fuzzy_matched_keywords}")
         
-        cache = get_knowledge_base_cache()
-        knowledge_data = cache['knowledge_data']
+        # Accumulate scores from the precomputed postings - only items that match anything get an entry
+        scores = defaultdict(float)
 
-        about_types = ['about', 'rationale', 'objective', 'activity', 'timeline', 'team_member', 
-                    'sub_project', 'sub_rationale', 'sub_objective', 'sub_timeline', 'sub_team_member']
-                    
-        about_items = [item for item in knowledge_data if item['type'] in about_types]
+        def add(positions, points):
+            for idx in positions:
+                scores[idx] += points
+
+        for keyword in ABOUT_KEYWORDS:
+            if keyword in corrected_query:
+                add(about_index.title_keyword_hits[keyword], 2)
+                add(about_index.content_keyword_hits[keyword], 1)
+                add(about_index.keyword_type_bonus[keyword], 2)
         
-        if not about_items:
-            return []
+        for keyword, match_ratio in fuzzy_matched_keywords:
+            if match_ratio >= 75:
+                add(about_index.fuzzy_title_hits(keyword), 1.5)
+                add(about_index.fuzzy_content_hits(keyword), 1)
+                add(about_index.positions_by_type.get(keyword, ()), 2)
         
-        about_keywords = [
-            'mission', 'vision', 'goal', 'objective', 'feature', 'purpose',
-            'history', 'background', 'overview', 'introduction', 'description',
-            'what is', 'who are', 'how does', 'aanr', 'knowledge hub', 'km hub',
-            'agriculture', 'aquaculture', 'fisheries', 'research', 'innovation',
-            'team', 'member', 'project', 'activity', 'timeline', 'rationale',
-            'about us', 'contact', 'organization', 'structure', 'management'
-        ]
+        for idx, similarity_score in about_index.semantic_similarities(context.tokens).items():
+            scores[idx] += similarity_score * 2
 
-        fuzzy_matched_keywords = fuzzy_match_keywords(corrected_query, about_keywords, threshold=75)
-        print(f"🎯 Fuzzy matched keywords: {fuzzy_matched_keywords}")
+        if any(term in corrected_query for term in ['who', 'team', 'member', 'contact']):
+            add(about_index.with_name, 2)
+        if any(term in corrected_query for term in ['when', 'date', 'timeline']):
+            add(about_index.with_date, 2)
+        if 'role' in corrected_query:
+            add(about_index.with_role, 2)
         
         best_matches = []
         seen_titles = set()
         
-        for item in about_items:
-            if item['title'] in seen_titles:
+        for idx in sorted(scores):
+            score = scores[idx]
+            title = about_index.titles[idx]
+            if score <= 0 or title in seen_titles:
                 continue
             
-            score = 0
-            
-            for keyword in about_keywords:
-                if keyword in corrected_query:
-                    if keyword in item['title'].lower():
-                        score += 2
-                    
-                    content_sample = item.get('content', item.get('description', ''))
-                    if keyword in content_sample.lower():
-                        score += 1
-                    
-                    if item['type'] == 'team_member' and any(k in keyword for k in ['team', 'member', 'who']):
-                        score += 2
-                    elif item['type'] == 'timeline' and any(k in keyword for k in ['when', 'history', 'timeline']):
-                        score += 2
-                    elif item['type'] in ['objective', 'sub_objective'] and any(k in keyword for k in ['goal', 'objective', 'aim']):
-                        score += 2
-                    elif item['type'] in ['rationale', 'sub_rationale'] and any(k in keyword for k in ['why', 'reason', 'purpose']):
-                        score += 2
-            
-            for keyword, match_ratio in fuzzy_matched_keywords:
-                if match_ratio >= 75:
-                    content_sample = item.get('content', item.get('description', ''))
-                    
-                    if fuzz.partial_ratio(keyword, item['title'].lower()) >= 75:
-                        score += 1.5
-                    
-                    if fuzz.partial_ratio(keyword, content_sample.lower()) >= 75:
-                        score += 1
-                    
-                    if item['type'] == keyword:
-                        score += 2
-            
-            item_text = f"{item['title']} {item.get('content', item.get('description', ''))}"
-            similarity_score = self._calculate_semantic_similarity(corrected_query, item_text)
-            score += similarity_score * 2
-
-            if 'name' in item and any(term in corrected_query for term in ['who', 'team', 'member', 'contact']):
-                score += 2
-            if 'date' in item and any(term in corrected_query for term in ['when', 'date', 'timeline']):
-                score += 2
-            if 'role' in item and 'role' in corrected_query:
-                score += 2
+            best_matches.append({
+                'resource': about_index.cleaned_items[idx],
+                'kb_position': idx,
+                'similarity_score': min(score / 8.0, 1.0),
+                'confidence': 'high' if score >= 6 else 'medium' if score >= 3 else 'low'
+            })
             
-            if score > 0:
-                clean_content = re.sub(r'<[^>]+>', '', item.get('description', ''))
-                clean_content = re.sub(r'\s+', ' ', clean_content).strip()
-                
-                cleaned_item = {
-                    **item,
-                    'description': clean_content[:500] + ('...' if len(clean_content) > 500 else '')
-                }
-                
-                best_matches.append({
-                    'resource': cleaned_item,
-                    'similarity_score': min(score / 8.0, 1.0),
-                    'confidence': 'high' if score >= 6 else 'medium' if score >= 3 else 'low'
-                })
-                
-                seen_titles.add(item['title'])
+            seen_titles.add(title)
         
         best_matches.sort(key=lambda x: x['similarity_score'], reverse=True)
 
-        return self._apply_diversity_filter(best_matches, 3)
+        return self._apply_diversity_filter(best_matches, 3, snapshot=context.snapshot)
 
     def generate_intelligent_response(self, query):
         """Main method for generating intelligent responses"""
-        query = query.strip()
-        original_query_lower = query.lower()
+        # Correction, tokenization, embedding and intent are computed once per request
+        context = QueryContext(query)
+        corrected_query = context.corrected
         
-        corrected_query = self.process_query_with_correction(query)
-        
-        basic_intent = self._check_basic_response(corrected_query)
+        basic_intent = self._check_basic_response(context.lower)
         if basic_intent:
             return self._generate_basic_response(basic_intent)
 
-        about_triggers = [
-            'about', 'tell me about', 'mission', 'vision', 
-            'goal', 'objective', 'purpose', 'aanr', 'knowledge hub', 
-            'km hub', 'who are', 'how does', 'background', 'overview'
-        ]
+        # Make sure the KB snapshot (and its version) is current before keying the cache
+        context.snapshot
+        cache_key = (_knowledge_base_version, normalize_query_key(corrected_query))
+        cached_response = _response_cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
         
-        hub_specific_terms = ['aanr', 'knowledge hub', 'km hub', 'knowledge management', 'system']
+        response = self._generate_uncached_response(context)
         
-        about_query_detected = False
-        corrected_lower = corrected_query.lower()
+        # Zero-result answers are cached too, but for a shorter time
+        ttl = None if response.get('matched_resources') or response.get('about_content') else RESPONSE_CACHE_NEGATIVE_TTL
+        _response_cache.set(cache_key, response, ttl=ttl)
+        return response
+
+    def _generate_uncached_response(self, query):
+        """Route a corrected, non-basic query to the about, sample, topic or general handler"""
+        context = QueryContext.of(query)
+        corrected_query = context.corrected
+        corrected_lower = context.lower
+        matches = self.query_matcher.match(corrected_lower)
         
-        for trigger in about_triggers:
-            if fuzz.partial_ratio(trigger, corrected_lower) >= 80:
-                about_query_detected = True
-                break
+        # The query is already spell-corrected, so exact trigger matches replace the per-trigger fuzzy scan
+        about_query_detected = bool(matches.get('about_trigger'))
         
         if not about_query_detected and corrected_lower.startswith('what is'):
-            if any(term in corrected_lower for term in hub_specific_terms):
+            if matches.get('hub_term'):
                 about_query_detected = True
         
         if about_query_detected:
-            matched_resources = self._handle_about_query(corrected_query, {'intent': 'about_query'})
+            matched_resources = self._handle_about_query(context, {'intent': 'about_query'})
             if matched_resources:
-                return self._generate_about_response(corrected_query, matched_resources)
+                response = self._generate_about_response(corrected_query, matched_resources)
+                return self._attach_retrieval(response, matched_resources)
 
-        if corrected_query.lower() in self._conversation_cache:
-            return self._conversation_cache[corrected_query.lower()]
-        
-        intent_info = self._classify_user_intent(corrected_query)
+        intent_info = self._classify_user_intent(context)
         
         if intent_info.get('skip_ai') or intent_info.get('is_basic'):
-            response = self._generate_basic_response(intent_info)
-            self._conversation_cache[corrected_query.lower()] = response
-            return response
+            return self._generate_basic_response(intent_info)
         
         if intent_info['intent'] == 'sample_request':
-            matched_resources = self._enhanced_semantic_search_with_faiss(corrected_query, intent_info, top_k=5)
-            return self._generate_sample_response(corrected_query, matched_resources, intent_info)
+            matched_resources = self._enhanced_semantic_search_with_faiss(context, intent_info, top_k=5)
+            response = self._generate_sample_response(corrected_query, matched_resources, intent_info)
         elif intent_info['intent'] == 'topic_content_request':
-            matched_resources = self._enhanced_semantic_search_with_faiss(corrected_query, intent_info, top_k=8)
-            return self._generate_topic_content_response(corrected_query, matched_resources, intent_info)
+            matched_resources = self._enhanced_semantic_search_with_faiss(context, intent_info, top_k=8)
+            response = self._generate_topic_content_response(corrected_query, matched_resources, intent_info)
         else:
-            matched_resources = self._enhanced_semantic_search_with_faiss(corrected_query, intent_info, top_k=5)
+            matched_resources = self._enhanced_semantic_search_with_faiss(context, intent_info, top_k=5)
             
             if matched_resources:
-                return self._generate_detailed_response(corrected_query, matched_resources)
+                response = self._generate_detailed_response(corrected_query, matched_resources)
             else:
-                return self._generate_no_results_response(corrected_query)
+                response = self._generate_no_results_response(corrected_query)
+        
+        return self._attach_retrieval(response, matched_resources)
+
+    def _attach_retrieval(self, response, matched_resources):
+        """Carry the scores and candidates computed during search along with the response"""
+        candidates = [
+            {
+                'id': match['resource'].get('id'),
+                'actual_id': match['resource'].get('actual_id'),
+                'type': match['resource'].get('type'),
+                'title': match['resource'].get('title'),
+                'similarity_score': float(match.get('similarity_score', 0.0)),
+                'confidence': match.get('confidence', 'low')
+            }
+            for match in matched_resources
+        ]
+        
+        best_match = matched_resources[0] if matched_resources else {}
+        response['retrieval'] = {
+            'similarity_score': float(best_match.get('similarity_score', 0.0)),
+            'faiss_score': float(best_match.get('faiss_score', 0.0)),
+            'cosine_score': float(best_match.get('cosine_score', 0.0)),
+            'confidence': best_match.get('confidence', 'low'),
+            'match_type': best_match.get('match_type', 'semantic') if best_match else None,
+            'candidates': candidates
+        }
+        return response
 
     def _generate_sample_response(self, query, matched_resources, intent_info):
         """Generate response for sample requests"""
@@ -1216,19 +1761,20 @@ class IntelligentChatbotService:
         print(f"🔍 DEBUG: Original query: '{query}'")
         
         # Check spell correction
-        corrected_query = self.process_query_with_correction(query)
+        context = QueryContext(query)
+        corrected_query = context.corrected
         print(f"🔧 DEBUG: Corrected query: '{corrected_query}'")
         
         # Check intent classification
-        intent_info = self._classify_user_intent(query)
+        intent_info = self._classify_user_intent(context)
         print(f"🎯 DEBUG: Intent info: {intent_info}")
         
         # Check topic extraction
-        main_topic = self._extract_main_topic(query)
+        main_topic = self._extract_main_topic(context)
         print(f"📌 DEBUG: Main topic: {main_topic}")
         
         # Check content type
-        content_type = self._extract_content_type(query)
+        content_type = self._extract_content_type(context)
         print(f"📂 DEBUG: Content type: {content_type}")
         
         # Check basic responses
@@ -1244,18 +1790,17 @@ class IntelligentChatbotService:
             'basic_intent': basic_intent
         }
     
-    def generate_source_response(self, source_id, source_title):
+    def generate_source_response(self, source_id, source_type=None, source_title=None, source_slug=None, source_url=None):
         """Generate detailed response for a specific source/resource"""
         try:
             # Get knowledge data from cache
             cache = get_knowledge_base_cache()
             knowledge_data = cache['knowledge_data']
             
-            target_resource = None
-            for item in knowledge_data:
-                if str(item.get('actual_id')) == str(source_id) and item.get('title') == source_title:
-                    target_resource = item
-                    break
+            position = cache['knowledge_index'].find_source(
+                source_id, source_type, source_title=source_title, slug=source_slug, url=source_url
+            )
+            target_resource = knowledge_data[position] if position is not None else None
             
             if not target_resource:
                 return {
@@ -1292,7 +1837,7 @@ class IntelligentChatbotService:
                 link = target_resource.get('url') or target_resource.get('link')
                 response_parts.append(f"\n🔗 **Source:** {link}")
             
-            return {
+            response = {
                 'response': '\n'.join(response_parts),
                 'confidence': 'high',
                 'suggestions': ['Ask about related topics', 'Find similar resources', 'What else can you help with?'],
@@ -1301,6 +1846,15 @@ class IntelligentChatbotService:
                 'ai_powered': True
             }
             
+            # The clicked source is an exact match - record it as such in the chat analytics
+            return self._attach_retrieval(response, [{
+                'resource': target_resource,
+                'kb_position': position,
+                'similarity_score': 1.0,
+                'confidence': 'high',
+                'match_type': 'source'
+            }])
+            
         except Exception as e:
             print(f"❌ Error in generate_source_response: {e}")
             return {
@@ -1492,15 +2046,24 @@ class IntelligentChatbotService:
 def clear_knowledge_base_cache():
     """Clear the knowledge base cache to force reload"""
     global _knowledge_base_cache, _knowledge_base_last_updated, _faiss_index, _faiss_embeddings, _json_knowledge_cache
+    global _knowledge_base_version
     
     _knowledge_base_cache = None
     _knowledge_base_last_updated = None
     _faiss_index = None
     _faiss_embeddings = None
     _json_knowledge_cache = None
+    _knowledge_base_version += 1
+    _response_cache.clear()
     
     print("🔄 Knowledge base cache cleared - will reload on next request")
 
+def get_response_cache_stats():
+    """Hit-rate statistics of the response cache"""
+    stats = _response_cache.stats()
+    stats['knowledge_base_version'] = _knowledge_base_version
+    return stats
+
 def force_reload_knowledge_base():
     """Force immediate reload of knowledge base"""
     clear_knowledge_base_cache()
@@ -1531,8 +2094,4 @@ def get_chatbot_service():
         print("✅ ULTRA-FAST ChatbotService singleton ready!")
         return _chatbot_service_instance
 
-# SOLUTION #3: Start AI model loading in background during app startup
-background_ai_warmup()
-
-# Create the singleton instance
-chatbot_service = get_chatbot_service()
\ No newline at end of file
+# Nothing is loaded at import time - web workers warm up explicitly via chatbot.warmup
\ No newline at end of file
@@ -0,0 +1,265 @@
+"""
+Optional out-of-process inference/search sidecar.
+
+One `python manage.py run_chatbot_sidecar` process owns the sentence
+transformer, embeddings and FAISS index and serves them to every web worker
+over a Unix domain socket, so workers stay small and quick to recycle and
+single-query encodes from all workers share one embedding batcher. Workers
+use it when CHATBOT_SIDECAR_SOCKET is set; otherwise everything stays
+in-process (the default).
+
+Wire format - every frame is a ``!BI`` header (opcode or status, payload
+length) followed by the payload:
+
+    ENCODE  -> !I count, then per text !I length + UTF-8 bytes
+            <- !II rows, dim + float32[rows * dim]
+    SEARCH  -> !II top_k, dim + float32[dim]
+            <- !II count, kb_fingerprint + float32[count] scores + int64[count] positions
+    STATS   -> (empty)
+            <- UTF-8 JSON
+
+A response status other than STATUS_OK carries a UTF-8 error message.
+"""
+
+import os
+import json
+import struct
+import socket
+import threading
+import socketserver
+import numpy as np
+
+OP_ENCODE = 1
+OP_SEARCH = 2
+OP_STATS = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_HEADER = struct.Struct('!BI')
+_PAIR = struct.Struct('!II')
+_LENGTH = struct.Struct('!I')
+
+# Refuse absurd frames instead of allocating them
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class SidecarError(Exception):
+    """The sidecar is unreachable or answered with an error"""
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("sidecar connection closed")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(sock):
+    """Return (code, payload) of the next frame"""
+    code, length = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if length > MAX_FRAME_BYTES:
+        raise ConnectionError(f"sidecar frame of {length} bytes exceeds the limit")
+    return code, _recv_exact(sock, length) if length else b''
+
+
+def write_frame(sock, code, payload=b''):
+    sock.sendall(_HEADER.pack(code, len(payload)) + payload)
+
+
+def pack_texts(texts):
+    parts = [_LENGTH.pack(len(texts))]
+    for text in texts:
+        data = text.encode('utf-8')
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def unpack_texts(payload):
+    (count,) = _LENGTH.unpack_from(payload, 0)
+    offset = _LENGTH.size
+    texts = []
+    for _ in range(count):
+        (length,) = _LENGTH.unpack_from(payload, offset)
+        offset += _LENGTH.size
+        texts.append(payload[offset:offset + length].decode('utf-8'))
+        offset += length
+    return texts
+
+
+def pack_matrix(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype='<f4')
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    return _PAIR.pack(*matrix.shape) + matrix.tobytes()
+
+
+def unpack_matrix(payload):
+    rows, dim = _PAIR.unpack_from(payload, 0)
+    return np.frombuffer(payload, dtype='<f4', count=rows * dim, offset=_PAIR.size).reshape(rows, dim)
+
+
+def pack_search_results(scores, positions, fingerprint):
+    scores = np.ascontiguousarray(scores, dtype='<f4')
+    positions = np.ascontiguousarray(positions, dtype='<i8')
+    return _PAIR.pack(len(scores), fingerprint) + scores.tobytes() + positions.tobytes()
+
+
+def unpack_search_results(payload):
+    count, fingerprint = _PAIR.unpack_from(payload, 0)
+    scores = np.frombuffer(payload, dtype='<f4', count=count, offset=_PAIR.size)
+    positions = np.frombuffer(payload, dtype='<i8', count=count, offset=_PAIR.size + 4 * count)
+    return scores, positions, fingerprint
+
+
+class _SidecarRequestHandler(socketserver.BaseRequestHandler):
+    """Serves frames on one worker connection until the worker disconnects"""
+
+    def handle(self):
+        while True:
+            try:
+                opcode, payload = read_frame(self.request)
+            except (ConnectionError, OSError, struct.error):
+                return
+
+            try:
+                response = self.server.dispatch(opcode, payload)
+                status = STATUS_OK
+            except Exception as e:
+                response = str(e).encode('utf-8')
+                status = STATUS_ERROR
+
+            try:
+                write_frame(self.request, status, response)
+            except OSError:
+                return
+
+
+class SidecarServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server answering ENCODE/SEARCH/STATS with this process's
+    chatbot services (run in-process mode - see run_chatbot_sidecar).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Stale socket from a previous run
+        super().__init__(socket_path, _SidecarRequestHandler)
+        self.socket_path = socket_path
+        self.requests_served = {OP_ENCODE: 0, OP_SEARCH: 0, OP_STATS: 0}
+
+    def dispatch(self, opcode, payload):
+        from . import services
+
+        if opcode == OP_ENCODE:
+            texts = unpack_texts(payload)
+            if len(texts) == 1:
+                # Single queries from all workers share the embedding batcher
+                embeddings = services.encode_query(texts[0])
+                if embeddings is None:
+                    raise RuntimeError("sentence transformer unavailable in the sidecar")
+            else:
+                embeddings = services._encode_texts(texts)
+            self.requests_served[OP_ENCODE] += 1
+            return pack_matrix(embeddings)
+
+        if opcode == OP_SEARCH:
+            top_k, dim = _PAIR.unpack_from(payload, 0)
+            query_embedding = np.frombuffer(payload, dtype='<f4', count=dim, offset=_PAIR.size)
+            # Pick up knowledge_base.json rewrites (incremental updates, rebuilds) so the
+            # fingerprint keeps matching the workers'
+            services.get_knowledge_base_cache()
+            snapshot = services.get_or_create_ai_cache()
+            scores, positions = services.faiss_similarity_search(query_embedding, top_k, snapshot=snapshot)
+            self.requests_served[OP_SEARCH] += 1
+            return pack_search_results(scores, positions, services.get_knowledge_base_fingerprint(snapshot))
+
+        if opcode == OP_STATS:
+            self.requests_served[OP_STATS] += 1
+            return json.dumps({
+                'socket': self.socket_path,
+                'pid': os.getpid(),
+                'requests': {str(op): count for op, count in self.requests_served.items()},
+                'query_embeddings': services.get_query_embedding_cache_stats(),
+                'models': services.get_model_registry().stats(),
+            }).encode('utf-8')
+
+        raise ValueError(f"unknown sidecar opcode {opcode}")
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class SidecarClient:
+    """
+    Blocking client used by web workers.
+
+    Each worker thread keeps its own persistent connection (re-opened after
+    fork or a sidecar restart); a failed request is retried once on a fresh
+    connection before SidecarError is raised.
+    """
+
+    def __init__(self, socket_path, timeout=5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None and self._local.pid == os.getpid():
+            return sock
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._local.sock = sock
+        self._local.pid = os.getpid()
+        return sock
+
+    def _disconnect(self):
+        sock = getattr(self._local, 'sock', None)
+        self._local.sock = None
+        if sock is not None and self._local.pid == os.getpid():
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def request(self, opcode, payload=b''):
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                write_frame(sock, opcode, payload)
+                status, response = read_frame(sock)
+                break
+            except (OSError, ConnectionError, struct.error) as e:
+                self._disconnect()
+                if attempt:
+                    raise SidecarError(f"sidecar at {self.socket_path} unavailable: {e}") from e
+
+        if status != STATUS_OK:
+            raise SidecarError(response.decode('utf-8', 'replace'))
+        return response
+
+    def encode(self, texts):
+        """float32 embeddings, one row per text"""
+        return unpack_matrix(self.request(OP_ENCODE, pack_texts(texts)))
+
+    def search(self, query_embedding, top_k):
+        """(scores, knowledge base positions, knowledge base fingerprint) from the sidecar's index"""
+        query_embedding = np.ascontiguousarray(np.reshape(query_embedding, -1), dtype='<f4')
+        payload = _PAIR.pack(top_k, len(query_embedding)) + query_embedding.tobytes()
+        return unpack_search_results(self.request(OP_SEARCH, payload))
+
+    def stats(self):
+        return json.loads(self.request(OP_STATS).decode('utf-8'))
@@ -1,6 +1,16 @@
 from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
 from .models import ChatSession
+from .incremental import (
+    INCREMENTAL_UPDATES_ENABLED,
+    get_tracked_models,
+    get_tracked_relations,
+    get_dependent_relations,
+    get_dependent_rows,
+    queue_knowledge_refresh
+)
 
 @receiver(user_logged_out)
 def clear_chat_sessions_on_logout(sender, request, user, **kwargs):
@@ -12,4 +22,56 @@ def clear_chat_sessions_on_logout(sender, request, user, **kwargs):
         
         # Also clear the session from browser storage (via response)
         if hasattr(request, 'session'):
-            request.session.pop('chatbot_session_id', None)
\ No newline at end of file
+            request.session.pop('chatbot_session_id', None)
+
+def knowledge_item_saved(sender, instance, raw=False, **kwargs):
+    """Refresh the chatbot knowledge item of a saved row once the transaction commits"""
+    if raw:
+        # Fixture loading - the knowledge base is rebuilt afterwards anyway
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda pk=pk: queue_knowledge_refresh(sender, pk))
+
+
+def knowledge_item_deleted(sender, instance, **kwargs):
+    """Drop the chatbot knowledge item of a deleted row once the transaction commits"""
+    # Read the pk now - the deletion collector sets it to None before an outer transaction commits
+    pk = instance.pk
+    transaction.on_commit(lambda pk=pk: queue_knowledge_refresh(sender, pk))
+
+
+def knowledge_item_dependents_deleting(sender, instance, **kwargs):
+    """Refresh the items listing a commodity/tag that is about to be deleted"""
+    # The through rows are cascaded away without m2m_changed, so collect the items now
+    for model, pk in get_dependent_rows(sender, instance.pk):
+        transaction.on_commit(lambda model=model, pk=pk: queue_knowledge_refresh(model, pk))
+
+
+def knowledge_item_relations_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Tags/commodities are part of the item text - refresh after they change"""
+    if reverse and action == 'pre_clear':
+        # clear() sends no pk_set - read the items losing this tag/commodity before they are unlinked
+        field = next(f for f in model._meta.many_to_many if f.remote_field.through is sender)
+        for pk in model._default_manager.filter(**{field.name: instance.pk}).values_list('pk', flat=True):
+            transaction.on_commit(lambda pk=pk: queue_knowledge_refresh(model, pk))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        for pk in pk_set or ():
+            transaction.on_commit(lambda pk=pk: queue_knowledge_refresh(model, pk))
+    else:
+        pk = instance.pk
+        transaction.on_commit(lambda pk=pk: queue_knowledge_refresh(instance.__class__, pk))
+
+
+if INCREMENTAL_UPDATES_ENABLED:
+    for tracked_model in get_tracked_models():
+        post_save.connect(knowledge_item_saved, sender=tracked_model, dispatch_uid=f'chatbot_kb_save_{tracked_model.__name__}')
+        post_delete.connect(knowledge_item_deleted, sender=tracked_model, dispatch_uid=f'chatbot_kb_delete_{tracked_model.__name__}')
+    for dependency_model in get_dependent_relations():
+        if dependency_model not in get_tracked_models():
+            post_save.connect(knowledge_item_saved, sender=dependency_model, dispatch_uid=f'chatbot_kb_save_{dependency_model.__name__}')
+        pre_delete.connect(knowledge_item_dependents_deleting, sender=dependency_model, dispatch_uid=f'chatbot_kb_dependents_{dependency_model.__name__}')
+    for through_model in get_tracked_relations():
+        m2m_changed.connect(knowledge_item_relations_changed, sender=through_model, dispatch_uid=f'chatbot_kb_m2m_{through_model.__name__}')
@@ -1,40 +1,57 @@
 import re
 import os
 import json
-import nltk
 import threading
 from collections import defaultdict
 from fuzzywuzzy import fuzz
 from spellchecker import SpellChecker
 from django.conf import settings
 from django.core.cache import cache
+from .caches import LRUCache
+from .symspell import SymSpellIndex
 
-try:
-    nltk.data.find('corpora/words')
-except LookupError:
-    print("📥 Downloading NLTK words corpus...")
-    nltk.download('words')
+def get_spell_dictionary_path():
+    """Symmetric-delete index written by `python manage.py build_spell_dictionary`"""
+    return os.path.join(settings.BASE_DIR, 'chatbot', 'data', 'spell-dictionary.bin')
 
-try:
-    nltk.data.find('corpora/brown')
-except LookupError:
-    print("📥 Downloading NLTK brown corpus...")
-    nltk.download('brown')
+def ensure_nltk_corpora():
+    """Download the NLTK corpora on first use - not at import, which every manage.py command pays"""
+    import nltk
+    
+    for corpus in ('words', 'brown'):
+        try:
+            nltk.data.find(f'corpora/{corpus}')
+        except LookupError:
+            print(f"📥 Downloading NLTK {corpus} corpus...")
+            nltk.download(corpus)
 
 class DynamicSpellCorrector:
     """
     Dynamic spell corrector that learns from knowledge base content
-    and user interactions without hardcoded vocabulary
+    and user interactions without hardcoded vocabulary.
+
+    With the prebuilt spell dictionary (``build_spell_dictionary``) it boots
+    from that artifact alone - no NLTK corpora, no SpellChecker. Pass
+    ``use_prebuilt=False`` to build the vocabulary from the corpora instead.
     """
     
-    def __init__(self):
-        # Standard English dictionary       
-
-        self.spell_checker = SpellChecker()
+    def __init__(self, use_prebuilt=True):
+        # Standard English dictionary - only needed without the prebuilt artifact
+        self.spell_checker = None
         
-        # Dynamic patterns learned from data
+        # Patterns learned from the corpora (at build time) and from user feedback; per-request
+        # corrections are memoized in the bounded word_cache instead of growing this dict
         self.learned_patterns = {}
-        self.word_cache = {}  
+        
+        # Corrections of single words (shared across queries) and of whole queries
+        self.word_cache = LRUCache(
+            maxsize=getattr(settings, 'CHATBOT_SPELL_WORD_CACHE_SIZE', 10000),
+            name='spell_words'
+        )
+        self.query_cache = LRUCache(
+            maxsize=getattr(settings, 'CHATBOT_SPELL_QUERY_CACHE_SIZE', 1000),
+            name='spell_queries'
+        )
         self.knowledge_vocabulary = set()
         
         self.stopwords = self.load_stopwords()
@@ -43,19 +60,29 @@ class DynamicSpellCorrector:
         self.correction_stats = {
             'total_corrections': 0,
             'pattern_corrections': 0,
-            'algorithmic_corrections': 0,
-            'cache_hits': 0
+            'algorithmic_corrections': 0
         }
         
-        self.load_comprehensive_vocabulary()
+        self.symspell = self.load_symspell_index() if use_prebuilt else None
+        if self.symspell is None:
+            self.spell_checker = SpellChecker()
+            self.load_comprehensive_vocabulary()
+        
         self.build_dynamic_vocabulary()
-        self.learn_common_patterns()
+        
+        if self.symspell is not None:
+            added = self.symspell.add_words(self.knowledge_vocabulary)
+            self.learned_patterns.update(self.symspell.metadata.get('learned_patterns', {}))
+            print(f"✅ Added {added} knowledge base words, {len(self.learned_patterns)} prebuilt spelling patterns")
+        else:
+            self.learn_common_patterns()
         
         print(f"✅ DynamicSpellCorrector initialized with {len(self.knowledge_vocabulary)} domain words")
     
     def load_comprehensive_vocabulary(self):
         """Load comprehensive vocabulary from multiple sources"""
         try:
+            ensure_nltk_corpora()
             from nltk.corpus import words, brown
             
             english_words = set(words.words())
@@ -98,14 +125,36 @@ class DynamicSpellCorrector:
                 if 'content' in item:
                     self.knowledge_vocabulary.update(self.extract_words(item['content']))
             
-            # Add domain-specific vocabulary to spell checker
-            self.spell_checker.word_frequency.load_words(self.knowledge_vocabulary)
+            # Add domain-specific vocabulary to spell checker (the prebuilt index gets it in __init__)
+            if self.spell_checker is not None:
+                self.spell_checker.word_frequency.load_words(self.knowledge_vocabulary)
             
             print(f"✅ Built vocabulary with {len(self.knowledge_vocabulary)} words from knowledge base")
             
         except Exception as e:
             print(f"⚠️ Could not load knowledge base vocabulary: {e}")
     
+    def load_symspell_index(self):
+        """Load the prebuilt frequency dictionary, candidate index and learned patterns"""
+        path = get_spell_dictionary_path()
+        if not os.path.exists(path):
+            print("⚠️ No spell dictionary artifact - loading NLTK corpora; run `python manage.py build_spell_dictionary` for fast startup")
+            return None
+        
+        try:
+            index = SymSpellIndex.load(path)
+        except Exception as e:
+            print(f"⚠️ Could not load spell dictionary: {e}")
+            return None
+        
+        print(f"✅ Loaded spell dictionary with {len(index)} words")
+        return index
+    
+    def is_known_word(self, word):
+        if self.symspell is not None:
+            return word in self.symspell
+        return word in self.spell_checker
+    
     def extract_words(self, text):
         """Extract meaningful words from text"""
         if not text:
@@ -222,21 +271,24 @@ class DynamicSpellCorrector:
             return text
         
         # Check cache first
-        if text in self.word_cache:
-            self.correction_stats['cache_hits'] += 1
-            return self.word_cache[text]
+        result = self.query_cache.get(text)
+        if result is not None:
+            return result
         
         words = text.split()
         corrected_words = []
         
         for word in words:
-            corrected_word = self.correct_single_word(word)
+            corrected_word = self.word_cache.get(word)
+            if corrected_word is None:
+                corrected_word = self.correct_single_word(word)
+                self.word_cache.set(word, corrected_word)
             corrected_words.append(corrected_word)
         
         result = ' '.join(corrected_words)
         
         # Cache the result
-        self.word_cache[text] = result
+        self.query_cache.set(text, result)
         
         return result
     
@@ -255,9 +307,12 @@ class DynamicSpellCorrector:
         if word_lower in self.knowledge_vocabulary:
             return original_word
         
-        if word_lower in self.spell_checker:
+        if self.is_known_word(word_lower):
             return original_word
         
+        if self.symspell is not None:
+            return self.correct_with_symspell(original_word, word_lower)
+        
         candidates = self.spell_checker.candidates(word_lower)
         
         if not candidates:
@@ -265,8 +320,6 @@ class DynamicSpellCorrector:
             for variant in variants:
                 if variant in self.knowledge_vocabulary or variant in self.spell_checker:
                     print(f"🔧 Dynamic variant: '{original_word}' → '{variant}'")
-                    # Learn this pattern for future use
-                    self.learned_patterns[word_lower] = variant
                     self.correction_stats['algorithmic_corrections'] += 1
                     self.correction_stats['total_corrections'] += 1
                     return variant
@@ -276,14 +329,30 @@ class DynamicSpellCorrector:
         
         if best_candidate and best_candidate != word_lower:
             print(f"🔧 Spell correction: '{original_word}' → '{best_candidate}'")
-            # Learn this pattern for future use
-            self.learned_patterns[word_lower] = best_candidate
             self.correction_stats['algorithmic_corrections'] += 1
             self.correction_stats['total_corrections'] += 1
             return best_candidate
         
         return original_word
     
+    def correct_with_symspell(self, original_word, word_lower):
+        """Closest dictionary words by frequency, preferring knowledge base vocabulary"""
+        matches = self.symspell.lookup(word_lower)
+        if not matches:
+            return original_word
+        
+        best_candidate = next(
+            (candidate for candidate, _, _ in matches if candidate in self.knowledge_vocabulary),
+            matches[0][0]
+        )
+        if best_candidate == word_lower:
+            return original_word
+        
+        print(f"🔧 Spell correction: '{original_word}' → '{best_candidate}'")
+        self.correction_stats['algorithmic_corrections'] += 1
+        self.correction_stats['total_corrections'] += 1
+        return best_candidate
+    
     def find_best_candidate(self, word, candidates):
         """Find the best correction candidate using multiple scoring criteria"""
         if not candidates:
@@ -352,16 +421,29 @@ class DynamicSpellCorrector:
                 if orig != corr and len(orig) > 2 and len(corr) > 2:
                     self.learned_patterns[orig] = corr
                     print(f"📚 Learned from feedback: '{orig}' → '{corr}'")
+            
+            # Cached corrections may predate the new patterns
+            self.clear_caches()
+    
+    def clear_caches(self):
+        """Drop cached word and query corrections (counters are kept)"""
+        self.word_cache.clear()
+        self.query_cache.clear()
     
     def get_correction_stats(self):
         """Get statistics about correction performance"""
+        word_cache = self.word_cache.stats()
+        query_cache = self.query_cache.stats()
         return {
             'total_corrections': self.correction_stats['total_corrections'],
             'pattern_corrections': self.correction_stats['pattern_corrections'],
             'algorithmic_corrections': self.correction_stats['algorithmic_corrections'],
-            'cache_hits': self.correction_stats['cache_hits'],
+            'cache_hits': word_cache['hits'] + query_cache['hits'],
+            'word_cache': word_cache,
+            'query_cache': query_cache,
             'learned_patterns_count': len(self.learned_patterns),
             'knowledge_vocabulary_size': len(self.knowledge_vocabulary),
+            'symspell_dictionary_size': len(self.symspell) if self.symspell is not None else 0,
             'pattern_efficiency': (
                 self.correction_stats['pattern_corrections'] / 
                 max(self.correction_stats['total_corrections'], 1)
@@ -0,0 +1,295 @@
+"""
+Symmetric-delete (SymSpell) spelling candidate index.
+
+Every dictionary word is indexed under each string obtained by deleting up
+to ``max_edit_distance`` characters from its first ``prefix_length``
+characters. A misspelled word generates the same deletes of its own prefix,
+so its candidates are a handful of hash lookups instead of enumerating and
+checking every edit-distance-2 string at query time.
+
+The index is built offline by ``python manage.py build_spell_dictionary``
+and stored as one file of flat arrays (sorted words, counts, sorted CRC32
+of the delete keys with their word ids) behind a small JSON header that
+also carries learned spelling patterns. Loading memory-maps the arrays, so
+it takes milliseconds and every worker shares the same pages. Words
+learned at runtime (new knowledge base vocabulary) go into a small
+in-memory overlay.
+"""
+
+import json
+import zlib
+import numpy as np
+
+try:
+    # Installed with python-levenshtein; the pure-Python distance below is the fallback
+    from rapidfuzz.distance import OSA as _OSA
+except ImportError:
+    _OSA = None
+
+DEFAULT_MAX_EDIT_DISTANCE = 2
+DEFAULT_PREFIX_LENGTH = 7
+
+_MAGIC = b'SYMSPELL1\n'
+# Arrays start on cache-line boundaries so memory-mapped views are aligned
+_ALIGNMENT = 64
+
+
+def delete_variants(word, max_distance):
+    """{variant: deletes} for ``word`` and every string reachable by deleting up to ``max_distance`` characters"""
+    variants = {word: 0}
+    frontier = [word]
+    for level in range(1, max_distance + 1):
+        next_frontier = []
+        for text in frontier:
+            if len(text) < 2:
+                continue
+            for i in range(len(text)):
+                variant = text[:i] + text[i + 1:]
+                if variant not in variants:
+                    variants[variant] = level
+                    next_frontier.append(variant)
+        frontier = next_frontier
+    return variants
+
+
+def _key_hash(key):
+    # crc32 rather than hash(): str hashes are salted per process
+    return zlib.crc32(key.encode('utf-8'))
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance (adjacent transpositions count as one); max_distance + 1 when larger"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+    if _OSA is not None:
+        return _OSA.distance(a, b, score_cutoff=max_distance)
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_minimum = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous_previous is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_minimum = min(row_minimum, value)
+        if row_minimum > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+class SymSpellIndex:
+    """
+    Frequency dictionary with symmetric-delete candidate lookup.
+
+    ``lookup(word)`` returns ``[(candidate, distance, count), ...]`` for the
+    closest dictionary words, most frequent first. Word ids are assigned in
+    descending frequency order, so candidates are verified best-first and
+    ``limit`` stops the search early.
+
+    Words are kept as a sorted fixed-width byte array (binary-searched for
+    membership) rather than a dict, so a loaded index is just memory-mapped
+    arrays shared by every process.
+    """
+
+    def __init__(self, arrays, max_edit_distance=DEFAULT_MAX_EDIT_DISTANCE,
+                 prefix_length=DEFAULT_PREFIX_LENGTH, metadata=None):
+        # sorted_words[rank] / sorted_word_ids[rank]: words in byte order and their ids
+        self.sorted_words = arrays['sorted_words']
+        self.sorted_word_ids = arrays['sorted_word_ids']
+        # word_ranks[word_id]: position of the word in sorted_words
+        self.word_ranks = arrays['word_ranks']
+        self.counts = arrays['counts']
+        self.word_lengths = arrays['word_lengths']
+        self.key_hashes = arrays['key_hashes']
+        self.key_word_ids = arrays['key_word_ids']
+        # Deletes that produced each key from its word - level-1 keys find distance-1 words
+        self.key_levels = arrays['key_levels']
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        # Free-form JSON-serializable data saved with the index (e.g. learned spelling patterns)
+        self.metadata = metadata or {}
+
+        # Runtime additions: word -> count, delete key hash -> [(word, level)]
+        self._extra_counts = {}
+        self._extra_keys = {}
+
+    @classmethod
+    def build(cls, word_counts, max_edit_distance=DEFAULT_MAX_EDIT_DISTANCE, prefix_length=DEFAULT_PREFIX_LENGTH):
+        """Index ``{word: count}`` - words are ordered by descending count"""
+        ordered = sorted(
+            ((word, int(count)) for word, count in word_counts.items() if word and '\0' not in word),
+            key=lambda item: (-item[1], item[0])
+        )
+        words = [word for word, _ in ordered]
+
+        hashes = []
+        levels = []
+        word_ids = []
+        for word_id, word in enumerate(words):
+            variants = delete_variants(word[:prefix_length], max_edit_distance)
+            hashes.extend(_key_hash(key) for key in variants)
+            levels.extend(variants.values())
+            word_ids.extend([word_id] * len(variants))
+
+        encoded = np.array([word.encode('utf-8') for word in words], dtype=bytes)
+        sorted_word_ids = np.argsort(encoded, kind='stable').astype(np.int32)
+        word_ranks = np.empty(len(words), dtype=np.int32)
+        word_ranks[sorted_word_ids] = np.arange(len(words), dtype=np.int32)
+
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        order = np.argsort(hashes, kind='stable')
+        arrays = {
+            'sorted_words': encoded[sorted_word_ids],
+            'sorted_word_ids': sorted_word_ids,
+            'word_ranks': word_ranks,
+            'counts': np.fromiter((count for _, count in ordered), dtype=np.int64, count=len(ordered)),
+            'word_lengths': np.fromiter((len(word) for word in words), dtype=np.int16, count=len(words)),
+            'key_hashes': hashes[order],
+            'key_word_ids': np.asarray(word_ids, dtype=np.int32)[order],
+            'key_levels': np.asarray(levels, dtype=np.uint8)[order],
+        }
+        return cls(arrays, max_edit_distance, prefix_length)
+
+    def save(self, path):
+        """One file: magic, JSON header (dtypes, shapes, offsets, params, metadata), aligned raw arrays"""
+        names = ('sorted_words', 'sorted_word_ids', 'word_ranks', 'counts', 'word_lengths',
+                 'key_hashes', 'key_word_ids', 'key_levels')
+        arrays = {name: np.ascontiguousarray(getattr(self, name)) for name in names}
+
+        offset = 0
+        layout = {}
+        for name, array in arrays.items():
+            layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        header = json.dumps({
+            'arrays': layout,
+            'max_edit_distance': self.max_edit_distance,
+            'prefix_length': self.prefix_length,
+            'metadata': self.metadata,
+        }).encode('utf-8')
+        data_start = -(-(len(_MAGIC) + 4 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+        with open(path, 'wb') as f:
+            f.write(_MAGIC + len(header).to_bytes(4, 'little') + header)
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved index - nothing is copied until pages are touched"""
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not a spell dictionary file")
+            header_length = int.from_bytes(f.read(4), 'little')
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        data_start = -(-(len(_MAGIC) + 4 + header_length) // _ALIGNMENT) * _ALIGNMENT
+
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            shape = tuple(spec['shape'])
+            if not np.prod(shape):
+                arrays[name] = np.empty(shape, dtype=spec['dtype'])
+                continue
+            arrays[name] = np.memmap(path, dtype=spec['dtype'], mode='r', offset=data_start + spec['offset'], shape=shape)
+
+        return cls(arrays, header['max_edit_distance'], header['prefix_length'], header.get('metadata'))
+
+    def __len__(self):
+        return len(self.counts) + len(self._extra_counts)
+
+    def _word_id(self, word):
+        encoded = word.encode('utf-8')
+        if len(encoded) > self.sorted_words.dtype.itemsize or not len(self.sorted_words):
+            return None
+        rank = int(np.searchsorted(self.sorted_words, encoded))
+        if rank < len(self.sorted_words) and self.sorted_words[rank] == encoded:
+            return int(self.sorted_word_ids[rank])
+        return None
+
+    def __contains__(self, word):
+        return word in self._extra_counts or self._word_id(word) is not None
+
+    def count(self, word):
+        word_id = self._word_id(word)
+        if word_id is not None:
+            return int(self.counts[word_id])
+        return self._extra_counts.get(word, 0)
+
+    def add_words(self, words, count=1):
+        """Index words that are not in the dictionary yet (kept in memory only)"""
+        added = 0
+        for word in words:
+            if not word or word in self:
+                continue
+            self._extra_counts[word] = count
+            for key, level in delete_variants(word[:self.prefix_length], self.max_edit_distance).items():
+                self._extra_keys.setdefault(_key_hash(key), []).append((word, level))
+            added += 1
+        return added
+
+    def _candidates(self, word, max_distance):
+        """(word, count) sharing a delete key with ``word`` at up to ``max_distance`` deletes on either side, most frequent first"""
+        variants = [
+            key for key, level in delete_variants(word[:self.prefix_length], self.max_edit_distance).items()
+            if level <= max_distance
+        ]
+        hashes = np.fromiter((_key_hash(key) for key in variants), dtype=np.uint32, count=len(variants))
+        starts = np.searchsorted(self.key_hashes, hashes, side='left')
+        ends = np.searchsorted(self.key_hashes, hashes, side='right')
+
+        spans = [slice(start, end) for start, end in zip(starts.tolist(), ends.tolist()) if start != end]
+        candidates = []
+        if spans:
+            word_ids = np.concatenate([self.key_word_ids[span] for span in spans])
+            levels = np.concatenate([self.key_levels[span] for span in spans])
+            word_ids = word_ids[levels <= max_distance]
+            # Edit distance is at least the length difference
+            word_ids = np.unique(word_ids[np.abs(self.word_lengths[word_ids] - len(word)) <= max_distance])
+            words = np.char.decode(self.sorted_words[self.word_ranks[word_ids]], 'utf-8').tolist()
+            candidates = list(zip(words, self.counts[word_ids].tolist()))
+
+        if self._extra_keys:
+            extra = set()
+            for key_hash in hashes.tolist():
+                extra.update(
+                    candidate for candidate, level in self._extra_keys.get(key_hash, ())
+                    if level <= max_distance and abs(len(candidate) - len(word)) <= max_distance
+                )
+            candidates.extend(sorted(
+                ((candidate, self._extra_counts[candidate]) for candidate in extra), key=lambda item: -item[1]
+            ))
+        return candidates
+
+    def lookup(self, word, max_distance=None, limit=None):
+        """Closest dictionary words within ``max_distance`` edits, most frequent first"""
+        max_distance = self.max_edit_distance if max_distance is None else min(max_distance, self.max_edit_distance)
+        if word in self:
+            return [(word, 0, self.count(word))]
+
+        # Distance-1 words always share a key with at most one delete on each side, so a
+        # distance-1 pass finds every distance-1 word; only if there are none widen to max_distance
+        for distance in sorted({min(1, max_distance), max_distance}):
+            matches = []
+            for candidate, count in self._candidates(word, distance):
+                if edit_distance(word, candidate, distance) <= distance:
+                    matches.append((candidate, distance, count))
+                    if limit and len(matches) >= limit:
+                        break
+
+            if matches:
+                # Runtime additions are appended after the dictionary words
+                matches.sort(key=lambda match: -match[2])
+                return matches
+
+        return []
@@ -1,3 +1,393 @@
-from django.test import TestCase
+import os
+import random
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase
+
+from .artifacts import FAISS_AVAILABLE, make_faiss_index
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .caches import LRUCache
+from .incremental import patch_snapshot
+from .knowledge_index import KnowledgeIndex
+from .pattern_matcher import PatternMatcher
+from .services import IntelligentChatbotService
+from .symspell import SymSpellIndex
+
+
+class SymSpellIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SymSpellIndex.build({'maize': 100, 'maze': 5, 'rice': 50, 'price': 10, 'coffee': 30})
+
+    def test_known_word_is_returned_as_is(self):
+        self.assertEqual(self.index.lookup('rice'), [('rice', 0, 50)])
+
+    def test_lookup_prefers_closest_then_most_frequent(self):
+        self.assertEqual(self.index.lookup('maiz'), [('maize', 1, 100)])
+        self.assertEqual(self.index.lookup('ric'), [('rice', 1, 50)])
+        self.assertEqual(self.index.lookup('cofe'), [('coffee', 2, 30)])
+        self.assertEqual(self.index.lookup('mxze'), [('maze', 1, 5)])
+
+    def test_transposition_counts_as_one_edit(self):
+        self.assertEqual(self.index.lookup('rcie', max_distance=1), [('rice', 1, 50)])
+
+    def test_no_candidate_within_distance(self):
+        self.assertEqual(self.index.lookup('sorghum'), [])
+
+    def test_save_and_load_round_trip(self):
+        self.index.metadata = {'learned_patterns': {'maiz': 'maize'}}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'spell-dictionary.bin')
+            self.index.save(path)
+            loaded = SymSpellIndex.load(path)
+
+            self.assertEqual(len(loaded), len(self.index))
+            self.assertEqual(loaded.metadata, {'learned_patterns': {'maiz': 'maize'}})
+            self.assertEqual(loaded.count('maize'), 100)
+            for word in ('maiz', 'ric', 'cofe', 'rcie', 'sorghum'):
+                self.assertEqual(loaded.lookup(word), self.index.lookup(word))
+
+    def test_load_rejects_other_files(self):
+        with tempfile.NamedTemporaryFile(suffix='.bin') as f:
+            f.write(b'not a dictionary')
+            f.flush()
+            with self.assertRaises(ValueError):
+                SymSpellIndex.load(f.name)
+
+    def test_add_words(self):
+        self.assertEqual(self.index.add_words(['sorghum', 'rice']), 1)
+        self.assertEqual(self.index.add_words(['sorghum']), 0)
+        self.assertIn('sorghum', self.index)
+        self.assertEqual(len(self.index), 6)
+        self.assertEqual(self.index.lookup('sorgum'), [('sorghum', 1, 1)])
+        # Runtime additions are ranked by count together with the dictionary words
+        self.index.add_words(['mice'], count=20)
+        self.assertEqual([match[0] for match in self.index.lookup('mrice')], ['rice', 'mice', 'price'])
+
+
+class BM25Tests(SimpleTestCase):
+    def setUp(self):
+        self.texts = [
+            'maize seed varieties',
+            'rice irrigation guide',
+            'maize post harvest losses in storage',
+            'coffee farming',
+        ]
+        self.index = BM25Index.build(self.texts)
+
+    def test_search_ranks_matching_documents(self):
+        scores, positions = self.index.search('maize')
+        # The shorter document is the better match for the same term count
+        self.assertEqual(positions.tolist(), [0, 2])
+        self.assertGreater(scores[0], scores[1])
+
+    def test_search_without_matches(self):
+        scores, positions = self.index.search('banana')
+        self.assertEqual(len(scores), 0)
+        self.assertEqual(len(positions), 0)
+
+    def test_search_top_k(self):
+        _, positions = self.index.search('maize rice coffee', top_k=2)
+        self.assertEqual(len(positions), 2)
+
+    def test_scores_match_dense_formula(self):
+        index = self.index
+        counts = index.counts.toarray()
+        lengths = counts.sum(axis=1)
+        column = index.vocabulary['maize']
+        frequency = (counts[:, column] > 0).sum()
+        idf = np.log1p((len(self.texts) - frequency + 0.5) / (frequency + 0.5))
+        tf = counts[:, column]
+        expected = idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * lengths / lengths.mean()))
+        np.testing.assert_allclose(index.scores('maize'), expected, rtol=1e-5)
+
+    def test_reciprocal_rank_fusion(self):
+        scores, positions = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+        self.assertEqual(positions.tolist(), [1, 3, 2])
+        np.testing.assert_allclose(scores, [1 / 61 + 1 / 62, 1 / 63 + 1 / 61, 1 / 62])
+
+    def test_reciprocal_rank_fusion_weights_and_padding(self):
+        scores, positions = reciprocal_rank_fusion([[-1, 4], [5]], k=60, weights=[1.0, 0.5])
+        self.assertEqual(positions.tolist(), [4, 5])
+        np.testing.assert_allclose(scores, [1 / 62, 0.5 / 61])
+
+        scores, positions = reciprocal_rank_fusion([[], [-1]])
+        self.assertEqual(len(positions), 0)
+
+
+class MMRTests(SimpleTestCase):
+    def setUp(self):
+        # Only the MMR helpers are exercised - they need no models or knowledge base
+        self.service = IntelligentChatbotService.__new__(IntelligentChatbotService)
+
+    def test_select_mmr_skips_near_duplicates(self):
+        embeddings = np.array([
+            [1.0, 0.0, 0.0],
+            [0.99, 0.1, 0.0],
+            [0.0, 0.0, 1.0],
+        ], dtype='float32')
+        results = [
+            {'id': 'a', 'similarity_score': 0.90},
+            {'id': 'b', 'similarity_score': 0.89},
+            {'id': 'c', 'similarity_score': 0.60},
+        ]
+        selected = self.service._select_mmr(results, 2, embeddings, [0, 1, 2])
+        self.assertEqual([result['id'] for result in selected], ['a', 'c'])
+
+    def test_relevance_is_similarity_without_fusion(self):
+        results = [{'similarity_score': 0.8}, {'similarity_score': 0.5}]
+        np.testing.assert_allclose(self.service._mmr_relevance(results), [0.8, 0.5])
+
+    def test_relevance_follows_fused_rank(self):
+        # A BM25-only hit: best fused score, lowest dense similarity
+        results = [
+            {'similarity_score': 0.3, 'rrf_score': 0.032},
+            {'similarity_score': 0.7, 'rrf_score': 0.016},
+            {'similarity_score': 0.5, 'rrf_score': 0.020},
+        ]
+        relevance = self.service._mmr_relevance(results)
+        self.assertEqual(int(np.argmax(relevance)), 0)
+        self.assertAlmostEqual(float(relevance.max()), 0.7, places=5)
+        self.assertAlmostEqual(float(relevance.min()), 0.3, places=5)
+
+
+class PatternMatcherTests(SimpleTestCase):
+    def test_groups_keep_registration_order(self):
+        matcher = PatternMatcher([
+            ('greeting', 'hello', 'hello'),
+            ('greeting', 'hi', 'hi'),
+            ('topic', 'maize seed', 'maize seed'),
+            ('topic', 'maize', 'maize'),
+            ('topic', 'rice', 'rice'),
+        ])
+        self.assertEqual(len(matcher), 5)
+        self.assertEqual(matcher.match('Hi, looking for MAIZE SEEDS'), {
+            'greeting': [('hi', 'hi')],
+            'topic': [('maize seed', 'maize seed'), ('maize', 'maize')],
+        })
+        self.assertEqual(matcher.match('coffee'), {})
+
+    def test_overlapping_patterns(self):
+        matcher = PatternMatcher([('x', word, word) for word in ('he', 'she', 'hers', 'his')])
+        self.assertEqual(matcher.match('ushers'), {'x': [('he', 'he'), ('she', 'she'), ('hers', 'hers')]})
+
+    def test_empty_patterns_are_ignored(self):
+        matcher = PatternMatcher([('x', 'empty', ''), ('x', 'a', 'a')])
+        self.assertEqual(len(matcher), 1)
+
+    def test_same_result_as_substring_tests(self):
+        rng = random.Random(0)
+        patterns = [''.join(rng.choice('abc ') for _ in range(rng.randint(1, 4))) for _ in range(40)]
+        entries = [('group', index, pattern) for index, pattern in enumerate(patterns)]
+        matcher = PatternMatcher(entries)
+        for _ in range(200):
+            text = ''.join(rng.choice('abcd ') for _ in range(rng.randint(0, 20)))
+            expected = [(label, pattern) for _, label, pattern in entries if pattern in text]
+            self.assertEqual(matcher.match(text).get('group', []), expected)
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_hits_misses_and_eviction(self):
+        cache = LRUCache(maxsize=2, name='test')
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('b', 'missing'), 'missing')
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (3, 1, 1))
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['hit_rate'], 75.0)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(maxsize=4, ttl=5)
+        with mock.patch('chatbot.caches.time.monotonic') as clock:
+            clock.return_value = 100.0
+            cache.set('default', 1)
+            cache.set('longer', 2, ttl=60)
+
+            clock.return_value = 104.0
+            self.assertEqual(cache.get('default'), 1)
+
+            clock.return_value = 106.0
+            self.assertIsNone(cache.get('default'))
+            self.assertEqual(cache.get('longer'), 2)
+
+        self.assertNotIn('default', cache)
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_zero_size_stores_nothing(self):
+        cache = LRUCache(maxsize=0)
+        cache.set('a', 1)
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get('a'))
+
+    def test_clear_keeps_counters(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 1)
+
+
+class KnowledgeIndexFindSourceTests(SimpleTestCase):
+    def setUp(self):
+        self.items = [
+            {'id': 'resource_7', 'actual_id': 7, 'type': 'resource', 'title': 'Maize guide', 'slug': 'maize-guide', 'url': '/resources/maize-guide'},
+            {'id': 'faq_7', 'actual_id': 7, 'type': 'faq', 'title': 'How do I plant maize?'},
+            {'id': 'news_3', 'actual_id': 3, 'type': 'news', 'title': 'Rice prices', 'slug': 'maize-guide'},
+            {'id': 'forum_9', 'actual_id': 9, 'type': 'forum', 'title': 'Coffee pests', 'link': '/forum/9'},
+        ]
+        self.index = KnowledgeIndex(self.items)
+
+    def test_type_and_id(self):
+        self.assertEqual(self.index.find_source(source_id=7, source_type='faq'), 1)
+        self.assertEqual(self.index.find_source(source_id='7', source_type='resource'), 0)
+
+    def test_item_id_without_type(self):
+        self.assertEqual(self.index.find_source(source_id='faq_7'), 1)
+
+    def test_actual_id_collision_broken_by_title(self):
+        self.assertEqual(self.index.find_source(source_id=7), 0)
+        self.assertEqual(self.index.find_source(source_id=7, source_title='How do I plant maize?'), 1)
+
+    def test_slug_and_url(self):
+        self.assertEqual(self.index.find_source(slug='maize-guide'), 0)
+        self.assertEqual(self.index.find_source(slug='maize-guide', source_type='news'), 2)
+        self.assertEqual(self.index.find_source(url='/forum/9'), 3)
+        self.assertEqual(self.index.find_source(source_id=99, source_type='faq', url='/resources/maize-guide'), 0)
+
+    def test_unknown_source(self):
+        self.assertIsNone(self.index.find_source(source_id=99, source_type='faq'))
+        self.assertIsNone(self.index.find_source())
+
+
+def _fake_encode(texts, dimension=16):
+    """Deterministic bag-of-words vectors standing in for the sentence model"""
+    vectors = np.zeros((len(texts), dimension), dtype='float32')
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, sum(map(ord, word)) % dimension] += 1.0
+    return vectors
+
+
+class PatchSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        texts = [
+            'maize seed varieties for dry areas',
+            'rice irrigation guide',
+            'coffee farming basics',
+            'banana wilt disease control',
+            'cassava processing',
+        ]
+        knowledge_data = [
+            {'id': f'resource_{position}', 'actual_id': position, 'type': 'resource', 'title': text.title(), 'raw_text': text}
+            for position, text in enumerate(texts)
+        ]
+        vectorizer = TfidfVectorizer()
+        embeddings = _fake_encode(texts)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        self.snapshot = {
+            'knowledge_data': knowledge_data,
+            'document_texts': list(texts),
+            'tfidf_vectorizer': vectorizer,
+            'knowledge_vectors': vectorizer.fit_transform(texts),
+            'bm25_index': BM25Index.build(texts),
+            'knowledge_embeddings': embeddings,
+            'faiss_index': make_faiss_index(embeddings, mode='flat') if FAISS_AVAILABLE else None,
+        }
+        encode = mock.patch('chatbot.incremental._encode_texts', side_effect=_fake_encode)
+        encode.start()
+        self.addCleanup(encode.stop)
+
+    def _item(self, item_id, text):
+        return {'id': item_id, 'actual_id': int(item_id.split('_')[1]), 'type': 'resource', 'title': text.title(), 'raw_text': text}
+
+    def _patch(self, snapshot):
+        # Replace 1, remove 3 (and an id that does not exist), append 5 and 6
+        upserts = {
+            'resource_1': self._item('resource_1', 'rice irrigation and drainage guide'),
+            'resource_5': self._item('resource_5', 'sorghum harvest storage'),
+            'resource_6': self._item('resource_6', 'maize storage pests'),
+        }
+        return patch_snapshot(snapshot, upserts, ['resource_3', 'resource_99'])
+
+    def assertAligned(self, snapshot):
+        texts = snapshot['document_texts']
+        self.assertEqual(texts, [item['raw_text'] for item in snapshot['knowledge_data']])
+
+        expected_tfidf = snapshot['tfidf_vectorizer'].transform(texts).toarray()
+        np.testing.assert_allclose(snapshot['knowledge_vectors'].toarray(), expected_tfidf, rtol=1e-6)
+
+        rebuilt = BM25Index.build(texts)
+        self.assertEqual(len(snapshot['bm25_index']), len(texts))
+        for query in ('maize', 'rice drainage', 'storage pests', 'banana', 'coffee farming'):
+            np.testing.assert_allclose(snapshot['bm25_index'].scores(query), rebuilt.scores(query), rtol=1e-5)
+
+        expected_embeddings = _fake_encode(texts)
+        expected_embeddings /= np.linalg.norm(expected_embeddings, axis=1, keepdims=True)
+        np.testing.assert_allclose(snapshot['knowledge_embeddings'], expected_embeddings, rtol=1e-6)
+
+        index = snapshot['knowledge_index']
+        for position, item in enumerate(snapshot['knowledge_data']):
+            self.assertEqual(index.find_source(source_id=item['id']), position)
+
+    def test_replace_append_remove(self):
+        original_ids = [item['id'] for item in self.snapshot['knowledge_data']]
+        new_snapshot, summary = self._patch(self.snapshot)
+
+        self.assertEqual(summary, {'updated': 1, 'added': 2, 'removed': 1})
+        self.assertEqual(
+            [item['id'] for item in new_snapshot['knowledge_data']],
+            ['resource_0', 'resource_1', 'resource_2', 'resource_4', 'resource_5', 'resource_6']
+        )
+        self.assertEqual(new_snapshot['knowledge_data'][1]['raw_text'], 'rice irrigation and drainage guide')
+        self.assertAligned(new_snapshot)
+
+        # The served snapshot is never modified in place
+        self.assertEqual([item['id'] for item in self.snapshot['knowledge_data']], original_ids)
+        self.assertEqual(self.snapshot['knowledge_vectors'].shape[0], 5)
+        self.assertEqual(len(self.snapshot['bm25_index']), 5)
+
+    def test_upsert_wins_over_removal(self):
+        item = self._item('resource_2', 'coffee farming and marketing')
+        new_snapshot, summary = patch_snapshot(self.snapshot, {'resource_2': item}, ['resource_2'])
+        self.assertEqual(summary, {'updated': 1, 'added': 0, 'removed': 0})
+        self.assertAligned(new_snapshot)
+
+    def test_nothing_to_change(self):
+        self.assertIsNone(patch_snapshot(self.snapshot, {}, ['resource_99']))
+
+    @skipUnless(FAISS_AVAILABLE, 'faiss is not installed')
+    def test_faiss_ids_follow_positions(self):
+        first, _ = self._patch(self.snapshot)
+        # Patch again on top: drop an appended item and replace one that moved
+        second, _ = patch_snapshot(
+            first, {'resource_4': self._item('resource_4', 'cassava flour processing')}, ['resource_5']
+        )
+
+        for snapshot in (first, second):
+            self.assertAligned(snapshot)
+            embeddings = np.ascontiguousarray(snapshot['knowledge_embeddings'])
+            faiss_index = snapshot['faiss_index']
+            self.assertEqual(faiss_index.ntotal, len(embeddings))
+
+            _, ids = faiss_index.search(embeddings, 1)
+            positions = snapshot['vector_positions'][ids[:, 0]]
+            np.testing.assert_array_equal(positions, np.arange(len(embeddings)))
+
+        # Replaced items keep their vector id; removed ids are never handed out again
+        self.assertEqual(second['next_vector_id'], 7)
+        self.assertNotIn(5, second['vector_ids'].tolist())
+        self.assertEqual(len(set(second['vector_ids'].tolist())), len(second['vector_ids']))
+        self.assertEqual(self.snapshot['faiss_index'].ntotal, 5)
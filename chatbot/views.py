@@ -8,9 +8,8 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from datetime import timedelta
 from .models import ChatSession, ChatMessage
-from .services import chatbot_service
 from appAdmin.models import ResourceMetadata
-from .services import get_chatbot_service 
+from .services import get_chatbot_service, get_model_registry
 from asgiref.sync import sync_to_async
 from .spell_corrector import get_spell_correction_stats
 from django.http import JsonResponse
@@ -26,6 +25,7 @@ def chat_message(request):
         source_click = data.get('source_click', False)
         clicked_resource_id = data.get('clicked_resource_id')
         clicked_resource_type = data.get('clicked_resource_type')
+        clicked_resource_url = data.get('clicked_resource_url')
         
         if not message:
             return JsonResponse({'error': 'Message is required'}, status=400)
@@ -76,28 +76,29 @@ def chat_message(request):
             )
             print(f"Created new session {chat_session.session_id} for user {request.user if request.user.is_authenticated else 'Anonymous'}")
         
+        chatbot_service = get_chatbot_service()
         if source_click and clicked_resource_id:
             bot_response = chatbot_service.generate_source_response(
                 clicked_resource_id, 
-                clicked_resource_type
+                clicked_resource_type,
+                source_url=clicked_resource_url
             )
         else:
             # Regular chatbot processing    
             bot_response = chatbot_service.generate_response(message)
         
-        # Get detailed AI similarity scores using the new method
-        similar_content = chatbot_service.find_similar_content(message, top_k=1)
+        # Similarity scores computed during retrieval travel with the response
+        retrieval = bot_response.get('retrieval') or {}
         ai_scores = {}
         similarity_score = 0.0
         
-        if similar_content:
-            best_match = similar_content[0]
-            similarity_score = best_match['similarity_score']
+        if retrieval.get('candidates'):
+            similarity_score = retrieval['similarity_score']
             ai_scores = {
                 'combined_score': similarity_score,
-                'semantic_score': best_match.get('ai_score', 0.0),
-                'nlp_score': best_match.get('nlp_score', 0.0),
-                'confidence_level': best_match.get('confidence', 'medium')
+                'semantic_score': retrieval.get('faiss_score', 0.0),
+                'nlp_score': retrieval.get('cosine_score', 0.0),
+                'confidence_level': retrieval.get('confidence', 'medium')
             }
         
         # Find matched resource for database storage
@@ -266,9 +267,9 @@ def debug_ai_status(request):
         # Get knowledge base data
         knowledge_data, document_texts, knowledge_vectors, knowledge_embeddings = service._get_knowledge_data()
         
-        # Check AI models status
+        # Check AI models status - optional models are reported, not loaded
         ai_models = service._get_ai_models()
-        nlp_model = service._get_nlp_model()
+        model_registry = get_model_registry()
         
         # Properly check FAISS availability
         faiss_available = False
@@ -284,9 +285,10 @@ def debug_ai_status(request):
             'ai_models_loaded': bool(ai_models),
             'ai_models_available': bool(ai_models and ai_models is not False),
             'sentence_transformer': bool(ai_models and isinstance(ai_models, dict) and 'sentence_transformer' in ai_models),
-            'intent_classifier': bool(ai_models and isinstance(ai_models, dict) and 'intent_classifier' in ai_models),
-            'spacy_model': str(nlp_model) if nlp_model else 'Not loaded',
-            'spacy_available': bool(nlp_model and nlp_model is not False),
+            'intent_classifier': model_registry.is_loaded('intent_classifier'),
+            'spacy_model': 'Loaded' if model_registry.is_loaded('spacy') else 'Not loaded',
+            'spacy_available': model_registry.is_loaded('spacy'),
+            'model_registry': model_registry.stats(),
             'transformers_available': bool(ai_models),
             'embeddings_created': bool(knowledge_embeddings is not None),
             'tfidf_vectors_created': bool(knowledge_vectors is not None),
@@ -327,9 +329,17 @@ def debug_ai_status(request):
         
         # Add cache information
         try:
-            from chatbot.services import _knowledge_base_cache, _json_knowledge_cache
+            from chatbot.services import (
+                _knowledge_base_cache, _json_knowledge_cache,
+                get_query_embedding_cache_stats, get_response_cache_stats
+            )
             ai_status['knowledge_cache_active'] = bool(_knowledge_base_cache)
             ai_status['json_cache_active'] = bool(_json_knowledge_cache)
+            ai_status['query_embedding_cache'] = get_query_embedding_cache_stats()
+            ai_status['response_cache'] = get_response_cache_stats()
+            
+            from chatbot.warmup import get_warmup_timings
+            ai_status['warmup_seconds'] = get_warmup_timings()
         except ImportError:
             ai_status['cache_status'] = 'Could not check cache status'
         
@@ -404,7 +414,6 @@ def refresh_knowledge_base(request):
         # Get fresh knowledge data
         knowledge_data, document_texts, knowledge_vectors, knowledge_embeddings = service._get_knowledge_data()
         ai_models = service._get_ai_models()
-        nlp_model = service._get_nlp_model()
         
         return JsonResponse({
             'success': True, 
@@ -413,7 +422,7 @@ def refresh_knowledge_base(request):
             'documents_loaded': len(document_texts) if document_texts else 0,
             'ai_model_active': bool(ai_models),
             'models_loaded': list(ai_models.keys()) if ai_models and isinstance(ai_models, dict) else [],
-            'spacy_model': str(nlp_model) if nlp_model else 'Not loaded',
+            'spacy_model': 'Loaded' if get_model_registry().is_loaded('spacy') else 'Not loaded',
             'stopwords_loaded': len(service.stopwords) if hasattr(service, 'stopwords') else 0,
             'basic_responses_loaded': len(service.basic_responses.get('greetings', {})) if hasattr(service, 'basic_responses') else 0,
             'local_ai_enabled': True,
@@ -472,7 +481,7 @@ def chat_history(request):
     
 @sync_to_async
 def get_chatbot_response_sync(query):
-    return chatbot_service.generate_intelligent_response(query)
+    return get_chatbot_service().generate_intelligent_response(query)
 
 async def chatbot_response_async(request):
     query = request.POST.get('message', '').strip()
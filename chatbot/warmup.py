@@ -0,0 +1,185 @@
+"""
+Explicit warmup phase for web workers.
+
+Importing the chatbot package loads nothing heavy. kmhub/wsgi.py (and asgi.py)
+call warmup_chatbot() once the application object exists, so gunicorn and
+runserver workers load the spell corrector, knowledge base and models up
+front, while manage.py commands (migrate, collectstatic,
+cleanup_expired_sessions, ...) never touch them.
+
+Under gunicorn.conf.py (preload_app) the warmup runs once, synchronously, in
+the master: model weights, knowledge base arrays and vocabularies are loaded
+before fork and shared copy-on-write by every worker. prepare_for_fork() and
+reinitialize_after_fork() are the gunicorn pre_fork/post_fork hooks.
+"""
+
+import gc
+import os
+import sys
+import time
+import random
+import threading
+import importlib.util
+from django.conf import settings
+
+WARMUP_STEPS = ('spell_corrector', 'knowledge_base', 'ai_models', 'intent_prototypes', 'embeddings')
+
+_warmup_pid = None
+_warmup_lock = threading.Lock()
+_warmup_timings = {}
+# Set when kmhub/wsgi.py or asgi.py loads the app - inherited by forked gunicorn workers
+_serving = False
+
+
+def _warm_spell_corrector():
+    from .spell_corrector import get_spell_corrector
+    get_spell_corrector()
+
+
+def _warm_knowledge_base():
+    from .services import get_chatbot_service, get_knowledge_base_cache
+    get_chatbot_service()
+    get_knowledge_base_cache()
+
+
+def _warm_ai_models():
+    from .services import get_ai_models, get_sidecar_client
+    if get_sidecar_client() is None:  # The sidecar process owns the models
+        get_ai_models()
+
+
+def _warm_intent_prototypes():
+    from .services import get_intent_prototypes
+    get_intent_prototypes()
+
+
+def _warm_embeddings():
+    from .services import get_or_create_ai_cache, get_sidecar_client
+    if get_sidecar_client() is None:
+        get_or_create_ai_cache()
+
+
+_STEP_FUNCTIONS = {
+    'spell_corrector': _warm_spell_corrector,
+    'knowledge_base': _warm_knowledge_base,
+    'ai_models': _warm_ai_models,
+    'intent_prototypes': _warm_intent_prototypes,
+    'embeddings': _warm_embeddings,
+}
+
+
+def get_warmup_steps():
+    """Configured warmup steps, in the order they run"""
+    steps = getattr(settings, 'CHATBOT_WARMUP_STEPS', WARMUP_STEPS)
+    return [step for step in steps if step in _STEP_FUNCTIONS]
+
+
+def run_warmup_steps(steps=None):
+    """Run warmup steps synchronously and return {step: seconds}"""
+    timings = {}
+    for step in steps or get_warmup_steps():
+        start = time.perf_counter()
+        try:
+            _STEP_FUNCTIONS[step]()
+        except Exception as e:
+            print(f"⚠️ Chatbot warmup step '{step}' failed: {e}")
+        timings[step] = round(time.perf_counter() - start, 3)
+        _warmup_timings[step] = timings[step]
+
+    print(f"🔥 Chatbot warmup finished: {timings}")
+    return timings
+
+
+def warmup_chatbot():
+    """
+    Warm the chatbot once per worker process.
+
+    Controlled by CHATBOT_WARMUP_ENABLED, CHATBOT_WARMUP_STEPS and
+    CHATBOT_WARMUP_BACKGROUND (load in a thread so the worker starts
+    accepting requests immediately).
+    """
+    global _warmup_pid, _serving
+
+    _serving = True
+    if not getattr(settings, 'CHATBOT_WARMUP_ENABLED', True):
+        return
+
+    with _warmup_lock:
+        if _warmup_pid == os.getpid():
+            return
+        _warmup_pid = os.getpid()
+
+    if os.environ.get('CHATBOT_PRELOAD_IN_MASTER') == '1':
+        preload_chatbot()
+    elif getattr(settings, 'CHATBOT_WARMUP_BACKGROUND', True):
+        threading.Thread(target=run_warmup_steps, name='chatbot-warmup', daemon=True).start()
+    else:
+        run_warmup_steps()
+
+
+def is_serving_process():
+    """True in web workers (and the gunicorn master); False in manage.py shell and commands"""
+    return _serving
+
+
+def get_warmup_timings():
+    """Seconds spent per warmup step in this process"""
+    return dict(_warmup_timings)
+
+
+def _set_torch_threads(count):
+    torch = sys.modules.get('torch')
+    if torch is None and importlib.util.find_spec('torch') is not None:
+        import torch
+    if torch is not None:
+        torch.set_num_threads(count)
+
+
+def preload_chatbot():
+    """
+    Warm synchronously in the gunicorn master before any worker is forked.
+
+    No background thread may be running at fork time, so the model idle
+    sweeper is paused and torch is kept single-threaded here (its OpenMP
+    pool is not fork-safe); workers get their thread counts in
+    reinitialize_after_fork().
+    """
+    from .services import get_model_registry
+
+    get_model_registry().sweeper_paused = True
+    _set_torch_threads(1)
+    run_warmup_steps()
+
+
+def prepare_for_fork():
+    """gunicorn pre_fork: drop DB connections and freeze the preloaded heap"""
+    from django.db import connections
+
+    # A socket inherited by several workers would interleave their queries
+    connections.close_all()
+
+    # Move everything loaded so far into the permanent generation so the
+    # cyclic GC never writes to (and un-shares) those pages in the workers
+    gc.collect()
+    gc.freeze()
+
+
+def reinitialize_after_fork(worker_count=1):
+    """gunicorn post_fork: per-worker threads and state that must not be inherited"""
+    from .services import get_model_registry
+
+    torch_threads = getattr(settings, 'CHATBOT_TORCH_THREADS', None)
+    if not torch_threads:
+        torch_threads = max(1, (os.cpu_count() or 1) // max(worker_count, 1))
+    if 'torch' in sys.modules:
+        _set_torch_threads(torch_threads)
+
+    faiss = sys.modules.get('faiss')
+    if faiss is not None:
+        faiss.omp_set_num_threads(getattr(settings, 'CHATBOT_FAISS_THREADS', 1))
+
+    # The idle sweeper starts again on the next model lookup in this worker
+    get_model_registry().sweeper_paused = False
+
+    # Forked workers would otherwise pick identical "random" responses
+    random.seed()
@@ -0,0 +1,33 @@
+"""
+Gunicorn settings for kmhub.
+
+preload_app imports kmhub.wsgi in the master, which warms the chatbot there
+(model weights, knowledge base arrays, spell corrector vocabularies) before
+the workers are forked, so they share that memory copy-on-write instead of
+each loading its own copy. Per-worker state is reset in post_fork.
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+preload_app = True
+
+# Read by chatbot.warmup - warm synchronously in the master, not in a thread
+os.environ['CHATBOT_PRELOAD_IN_MASTER'] = '1'
+
+# The Hugging Face tokenizers thread pool does not survive fork
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+
+def pre_fork(server, worker):
+    from chatbot.warmup import prepare_for_fork
+    prepare_for_fork()
+
+
+def post_fork(server, worker):
+    from chatbot.warmup import reinitialize_after_fork
+    reinitialize_after_fork(server.cfg.workers)
+    server.log.info("Worker %s reinitialized after fork", worker.pid)
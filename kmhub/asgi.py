@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kmhub.settings')
 
 application = get_asgi_application()
+
+# Web workers only - management commands never import this module
+from chatbot.warmup import warmup_chatbot
+
+warmup_chatbot()
@@ -264,6 +264,45 @@ SPELL_CORRECTION_LOG = os.path.join(BASE_DIR, 'logs', 'spell_correction.log')
 SPELL_CORRECTION_CACHE_SIZE = 1000
 SPELL_CORRECTION_SAVE_PATTERNS = True
 
+# Chatbot performance tuning
+CHATBOT_QUERY_EMBEDDING_CACHE_SIZE = 2048
+CHATBOT_EMBEDDING_BATCH_WAIT_MS = 5
+CHATBOT_EMBEDDING_BATCH_MAX = 32
+CHATBOT_RESPONSE_CACHE_SIZE = 1000
+CHATBOT_RESPONSE_CACHE_TTL = 3600  # seconds
+CHATBOT_RESPONSE_CACHE_NEGATIVE_TTL = 300  # zero-result answers
+CHATBOT_SPELL_WORD_CACHE_SIZE = 10000  # corrected single words, shared across queries
+CHATBOT_SPELL_QUERY_CACHE_SIZE = 1000  # corrected whole queries
+CHATBOT_INCREMENTAL_UPDATES = True  # patch the knowledge base on model saves/deletes
+CHATBOT_INCREMENTAL_PERSIST_DELAY = 5  # seconds of quiet before writing it to disk
+CHATBOT_KB_RELOAD_CHECK_SECONDS = 10  # how often workers look for a rewritten knowledge_base.json
+CHATBOT_FAISS_INDEX_MODE = 'auto'  # flat | ivf | hnsw | auto (flat up to CHATBOT_FAISS_AUTO_FLAT_MAX items, then ivf)
+CHATBOT_FAISS_AUTO_FLAT_MAX = 50000
+CHATBOT_FAISS_IVF_NLIST = None  # None = 4 * sqrt(items)
+CHATBOT_FAISS_IVF_NPROBE = None  # None = value persisted with the index
+CHATBOT_FAISS_HNSW_M = 32
+CHATBOT_FAISS_HNSW_EF_SEARCH = None  # None = value persisted with the index (64 at build)
+CHATBOT_WARMUP_ENABLED = True  # warm web workers from wsgi.py/asgi.py
+CHATBOT_WARMUP_BACKGROUND = True  # load in a thread so the worker serves requests meanwhile
+CHATBOT_WARMUP_STEPS = ['spell_corrector', 'knowledge_base', 'ai_models', 'intent_prototypes', 'embeddings']
+CHATBOT_MODEL_MEMORY_BUDGET_MB = None  # per worker; None = unlimited, least recently used models unloaded past it
+CHATBOT_MODEL_IDLE_UNLOAD_SECONDS = 1800  # unload models unused this long (0 = never)
+CHATBOT_MODEL_SWEEP_INTERVAL = 60  # seconds between idle checks
+CHATBOT_PIN_SENTENCE_TRANSFORMER = True  # keep the search model resident regardless of idle time
+CHATBOT_INTENT_PROTOTYPE_THRESHOLD = 0.45  # min cosine to chatbot/data/intent-prototypes.json prototypes, else keyword rules
+CHATBOT_INTENT_PROTOTYPE_MIN_MARGIN = 0.02  # required lead over the second-best label
+CHATBOT_TORCH_THREADS = None  # per gunicorn worker; None = CPU count / workers
+CHATBOT_FAISS_THREADS = 1  # per gunicorn worker - single-query searches don't benefit from more
+CHATBOT_SIDECAR_SOCKET = None  # e.g. '/tmp/kmhub-chatbot.sock' - encode/search in `manage.py run_chatbot_sidecar`
+CHATBOT_SIDECAR_TIMEOUT = 5.0  # seconds per sidecar request
+CHATBOT_BM25_K1 = 1.5
+CHATBOT_BM25_B = 0.75
+CHATBOT_HYBRID_DENSE_CANDIDATES = 2  # FAISS candidates per requested result
+CHATBOT_HYBRID_SPARSE_CANDIDATES = 3  # BM25 candidates per requested result
+CHATBOT_RRF_K = 60  # reciprocal-rank fusion constant
+CHATBOT_HYBRID_SEARCH_THREADS = 4  # BM25 searches run alongside query encoding
+CHATBOT_MMR_LAMBDA = 0.7  # result diversity: 1.0 = relevance only, lower = more diverse
+
 # Ensure logs directory exists
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
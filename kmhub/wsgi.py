@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kmhub.settings')
 
 application = get_wsgi_application()
+
+# Web workers only - management commands never import this module
+from chatbot.warmup import warmup_chatbot
+
+warmup_chatbot()